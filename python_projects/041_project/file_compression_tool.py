@@ -1,20 +1,151 @@
 import zlib
 import gzip
+import lzma
 import zipfile
 import tarfile
 import os
+import sys
+import csv
+import argparse
+import time
+import tempfile
+import io
+import math
+from collections import Counter, deque
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 import json
 import shutil
 from tqdm import tqdm
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
 class CompressionAlgorithm:
     GZIP = "gzip"
     ZIP = "zip"
     TAR_GZ = "tar.gz"
     ZLIB = "zlib"
+    ZSTD = "zstd"
+    LZ4 = "lz4"
+    XZ = "xz"
+    AUTO = "auto"
+
+class Objective:
+    FASTEST = "fastest"
+    SMALLEST = "smallest"
+    BALANCED = "balanced"
+
+# Input is split into independent frames of this size for parallel compression
+BLOCK_SIZE = 1024 * 1024
+
+class CompressionBackend:
+    """Compresses one block; by default each block is a frame and concatenated frames form a valid stream"""
+    # Running checksum over the input for trailer(), for formats that need one
+    checksum: Optional[Callable[..., int]] = None
+
+    def __init__(self, name: str, compress: Callable[[bytes, int], bytes],
+                 default_level: int, levels: List[int]):
+        self.name = name
+        self.compress = compress
+        self.default_level = default_level
+        self.levels = levels
+
+    def header(self, level: int) -> bytes:
+        return b''
+
+    def compress_block(self, data: bytes, level: int) -> bytes:
+        return self.compress(data, level)
+
+    def trailer(self, level: int, check: Optional[int]) -> bytes:
+        return b''
+
+class ZlibBackend(CompressionBackend):
+    """zlib allows one stream per file: raw deflate blocks ending in a full flush,
+    wrapped in a single header and adler32 trailer"""
+    checksum = staticmethod(zlib.adler32)
+
+    def __init__(self):
+        super().__init__(CompressionAlgorithm.ZLIB, zlib.compress, 6, [1, 6, 9])
+
+    def header(self, level: int) -> bytes:
+        return zlib.compress(b'', level)[:2]
+
+    def compress_block(self, data: bytes, level: int) -> bytes:
+        # A full flush resets the dictionary, so each block is independent of the previous one
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+    def trailer(self, level: int, check: Optional[int]) -> bytes:
+        # An empty final deflate block ends the stream
+        final_block = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS).flush()
+        return final_block + check.to_bytes(4, 'big')
+
+def _get_backends() -> Dict[str, CompressionBackend]:
+    backends = {
+        CompressionAlgorithm.GZIP: CompressionBackend(
+            CompressionAlgorithm.GZIP,
+            lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+            6, [1, 6, 9]),
+        CompressionAlgorithm.ZLIB: ZlibBackend(),
+        CompressionAlgorithm.XZ: CompressionBackend(
+            CompressionAlgorithm.XZ,
+            lambda data, level: lzma.compress(data, preset=level),
+            6, [0, 6, 9]),
+    }
+    if zstandard is not None:
+        backends[CompressionAlgorithm.ZSTD] = CompressionBackend(
+            CompressionAlgorithm.ZSTD,
+            lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+            3, [1, 3, 9, 19])
+    if lz4_frame is not None:
+        backends[CompressionAlgorithm.LZ4] = CompressionBackend(
+            CompressionAlgorithm.LZ4,
+            lambda data, level: lz4_frame.compress(data, compression_level=level),
+            0, [0, 9, 16])
+    return backends
+
+BACKENDS = _get_backends()
+
+# Directory archiving stores these without deflating them
+INCOMPRESSIBLE_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic",
+    ".mp3", ".aac", ".ogg", ".flac", ".m4a",
+    ".mp4", ".mkv", ".avi", ".mov", ".webm",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".lz4", ".7z", ".rar",
+    ".docx", ".xlsx", ".pptx", ".jar", ".apk", ".pdf"
+}
+ENTROPY_PROBE_SIZE = 64 * 1024
+# Bits per byte above which a probe is treated as already compressed
+ENTROPY_THRESHOLD = 7.5
+# Deflated members larger than this are spooled to disk instead of memory
+SPOOL_MEMORY_LIMIT = 4 * 1024 * 1024
+
+def _byte_entropy(data: bytes) -> float:
+    """Shannon entropy of a byte string in bits per byte"""
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(count / total * math.log2(count / total) for count in Counter(data).values())
+
+# Auto selection compresses this many evenly spaced samples of SAMPLE_SIZE bytes
+SAMPLE_COUNT = 8
+SAMPLE_SIZE = 64 * 1024
+# Balanced objective: minimise compress time plus time to write the output at this rate
+BALANCED_IO_BANDWIDTH = 100 * 1024 * 1024
+
+# Algorithms that need an optional package
+OPTIONAL_ALGORITHMS = (CompressionAlgorithm.ZSTD, CompressionAlgorithm.LZ4)
 
 class CompressionStats:
     def __init__(self):
@@ -23,6 +154,8 @@ class CompressionStats:
         self.compression_ratio: float = 0.0
         self.compression_time: float = 0.0
         self.algorithm: str = ""
+        self.threads: int = 1
+        self.level: Optional[int] = None
         self.timestamp: str = ""
 
     def to_dict(self) -> dict:
@@ -32,16 +165,23 @@ class CompressionStats:
             "compression_ratio": self.compression_ratio,
             "compression_time": self.compression_time,
             "algorithm": self.algorithm,
+            "threads": self.threads,
+            "level": self.level,
             "timestamp": self.timestamp
         }
 
 class FileCompressor:
     def __init__(self):
         self.stats_file = Path("compression_history.json")
+        self.benchmark_file = Path("compression_benchmarks.json")
         self.compression_history: List[Dict] = []
         self.load_history()
 
-    def compress_file(self, input_path: str, algorithm: str = CompressionAlgorithm.GZIP) -> Tuple[str, CompressionStats]:
+    def compress_file(self, input_path: str, algorithm: str = CompressionAlgorithm.GZIP,
+                      threads: int = 1, level: Optional[int] = None,
+                      output_path: Optional[str] = None,
+                      record: bool = True,
+                      objective: str = Objective.BALANCED) -> Tuple[str, CompressionStats]:
         """Compress a file using the specified algorithm"""
         input_path = Path(input_path)
         if not input_path.exists():
@@ -49,20 +189,38 @@ class FileCompressor:
 
         stats = CompressionStats()
         stats.original_size = input_path.stat().st_size
-        stats.algorithm = algorithm
         start_time = datetime.now()
 
-        output_path = str(input_path) + self._get_extension(algorithm)
+        if algorithm == CompressionAlgorithm.AUTO:
+            algorithm, level, _ = self.select_algorithm(str(input_path), objective)
+        stats.algorithm = algorithm
+        stats.level = level
+
+        if output_path is None:
+            output_path = str(input_path) + self._get_extension(algorithm)
 
         try:
-            if algorithm == CompressionAlgorithm.GZIP:
-                self._compress_gzip(input_path, output_path)
+            if algorithm in OPTIONAL_ALGORITHMS and algorithm not in BACKENDS:
+                raise ValueError(f"Compression backend not installed: {algorithm}")
+            # Every block-engine format accepts a series of frames; one thread writes a single stream
+            if algorithm in BACKENDS and threads > 1:
+                stats.threads = threads
+                self._compress_parallel(input_path, output_path, BACKENDS[algorithm],
+                                        stats.threads, level)
+            elif algorithm == CompressionAlgorithm.GZIP:
+                self._compress_gzip(input_path, output_path, level)
             elif algorithm == CompressionAlgorithm.ZIP:
                 self._compress_zip(input_path, output_path)
             elif algorithm == CompressionAlgorithm.TAR_GZ:
                 self._compress_tar_gz(input_path, output_path)
             elif algorithm == CompressionAlgorithm.ZLIB:
-                self._compress_zlib(input_path, output_path)
+                self._compress_zlib(input_path, output_path, level)
+            elif algorithm == CompressionAlgorithm.XZ:
+                self._compress_xz(input_path, output_path, level)
+            elif algorithm == CompressionAlgorithm.ZSTD:
+                self._compress_zstd(input_path, output_path, level)
+            elif algorithm == CompressionAlgorithm.LZ4:
+                self._compress_lz4(input_path, output_path, level)
             else:
                 raise ValueError(f"Unsupported compression algorithm: {algorithm}")
 
@@ -71,8 +229,9 @@ class FileCompressor:
             stats.compression_ratio = (stats.original_size - stats.compressed_size) / stats.original_size * 100
             stats.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            self.compression_history.append(stats.to_dict())
-            self.save_history()
+            if record:
+                self.compression_history.append(stats.to_dict())
+                self.save_history()
 
             return output_path, stats
 
@@ -81,7 +240,8 @@ class FileCompressor:
                 Path(output_path).unlink()
             raise e
 
-    def compress_directory(self, input_dir: str, algorithm: str = CompressionAlgorithm.ZIP) -> Tuple[str, CompressionStats]:
+    def compress_directory(self, input_dir: str, algorithm: str = CompressionAlgorithm.ZIP,
+                           threads: int = 1) -> Tuple[str, CompressionStats]:
         """Compress an entire directory"""
         input_path = Path(input_dir)
         if not input_path.is_dir():
@@ -95,14 +255,16 @@ class FileCompressor:
 
         try:
             if algorithm == CompressionAlgorithm.ZIP:
-                self._compress_directory_zip(input_path, output_path)
+                stats.threads = max(1, threads)
+                stats.original_size = self._compress_directory_zip(input_path, output_path,
+                                                                   stats.threads)
             elif algorithm == CompressionAlgorithm.TAR_GZ:
                 self._compress_directory_tar_gz(input_path, output_path)
+                stats.original_size = self._get_directory_size(input_path)
             else:
                 raise ValueError(f"Unsupported directory compression algorithm: {algorithm}")
 
             stats.compression_time = (datetime.now() - start_time).total_seconds()
-            stats.original_size = self._get_directory_size(input_path)
             stats.compressed_size = Path(output_path).stat().st_size
             stats.compression_ratio = (stats.original_size - stats.compressed_size) / stats.original_size * 100
             stats.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -117,9 +279,9 @@ class FileCompressor:
                 Path(output_path).unlink()
             raise e
 
-    def _compress_gzip(self, input_path: Path, output_path: str):
+    def _compress_gzip(self, input_path: Path, output_path: str, level: Optional[int] = None):
         with open(input_path, 'rb') as f_in:
-            with gzip.open(output_path, 'wb') as f_out:
+            with gzip.open(output_path, 'wb', compresslevel=9 if level is None else level) as f_out:
                 shutil.copyfileobj(f_in, f_out)
 
     def _compress_zip(self, input_path: Path, output_path: str):
@@ -130,20 +292,268 @@ class FileCompressor:
         with tarfile.open(output_path, "w:gz") as tar:
             tar.add(input_path, arcname=input_path.name)
 
-    def _compress_zlib(self, input_path: Path, output_path: str):
-        with open(input_path, 'rb') as f_in:
-            data = f_in.read()
-            compressed_data = zlib.compress(data)
-            with open(output_path, 'wb') as f_out:
-                f_out.write(compressed_data)
-
-    def _compress_directory_zip(self, input_path: Path, output_path: str):
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(input_path):
-                for file in files:
-                    file_path = Path(root) / file
-                    arcname = file_path.relative_to(input_path.parent)
-                    zipf.write(file_path, arcname)
+    def _compress_zlib(self, input_path: Path, output_path: str, level: Optional[int] = None):
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level)
+        with open(input_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
+            for block in iter(lambda: f_in.read(BLOCK_SIZE), b''):
+                f_out.write(compressor.compress(block))
+            f_out.write(compressor.flush())
+
+    def _compress_xz(self, input_path: Path, output_path: str, level: Optional[int] = None):
+        preset = BACKENDS[CompressionAlgorithm.XZ].default_level if level is None else level
+        with open(input_path, 'rb') as f_in, lzma.open(output_path, 'wb', preset=preset) as f_out:
+            shutil.copyfileobj(f_in, f_out, BLOCK_SIZE)
+
+    def _compress_zstd(self, input_path: Path, output_path: str, level: Optional[int] = None):
+        level = BACKENDS[CompressionAlgorithm.ZSTD].default_level if level is None else level
+        with open(input_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
+            zstandard.ZstdCompressor(level=level).copy_stream(f_in, f_out)
+
+    def _compress_lz4(self, input_path: Path, output_path: str, level: Optional[int] = None):
+        level = BACKENDS[CompressionAlgorithm.LZ4].default_level if level is None else level
+        with open(input_path, 'rb') as f_in, \
+                lz4_frame.open(output_path, 'wb', compression_level=level) as f_out:
+            shutil.copyfileobj(f_in, f_out, BLOCK_SIZE)
+
+    def _compress_parallel(self, input_path: Path, output_path: str,
+                           backend: CompressionBackend, threads: int,
+                           level: Optional[int] = None, block_size: int = BLOCK_SIZE):
+        """Compress independent blocks on a worker pool and write them in order"""
+        level = backend.default_level if level is None else level
+        check = backend.checksum(b'') if backend.checksum else None
+        # At most 2 blocks per thread are held in memory at once
+        max_pending = threads * 2
+        pending = deque()
+
+        with open(input_path, 'rb') as f_in, open(output_path, 'wb') as f_out, \
+                ThreadPoolExecutor(max_workers=threads) as executor:
+            f_out.write(backend.header(level))
+            # The first read is kept even when empty so an empty input still gets a valid frame
+            for block in chain([f_in.read(block_size)], iter(lambda: f_in.read(block_size), b'')):
+                if backend.checksum:
+                    check = backend.checksum(block, check)
+                pending.append(executor.submit(backend.compress_block, block, level))
+                if len(pending) >= max_pending:
+                    f_out.write(pending.popleft().result())
+            while pending:
+                f_out.write(pending.popleft().result())
+            f_out.write(backend.trailer(level, check))
+
+    def _read_samples(self, input_path: Path) -> List[bytes]:
+        """Read evenly spaced sample blocks from a file"""
+        size = input_path.stat().st_size
+        if size <= SAMPLE_COUNT * SAMPLE_SIZE:
+            return [input_path.read_bytes()]
+
+        step = (size - SAMPLE_SIZE) // (SAMPLE_COUNT - 1)
+        samples = []
+        with open(input_path, 'rb') as f:
+            for i in range(SAMPLE_COUNT):
+                f.seek(i * step)
+                samples.append(f.read(SAMPLE_SIZE))
+        return samples
+
+    def select_algorithm(self, input_path: str,
+                         objective: str = Objective.BALANCED) -> Tuple[str, int, List[Dict]]:
+        """Pick a backend and level by compressing sampled blocks with each candidate"""
+        samples = self._read_samples(Path(input_path))
+        sample_bytes = sum(len(sample) for sample in samples) or 1
+
+        estimates = []
+        for algorithm, backend in BACKENDS.items():
+            for level in backend.levels:
+                start = time.perf_counter()
+                compressed = sum(len(backend.compress(sample, level)) for sample in samples)
+                elapsed = max(time.perf_counter() - start, 1e-9)
+                ratio = compressed / sample_bytes
+                speed = sample_bytes / elapsed
+                estimates.append({
+                    "algorithm": algorithm,
+                    "level": level,
+                    "ratio": ratio,
+                    "speed": speed,
+                    # Seconds per input byte to compress and write the result
+                    "cost": 1 / speed + ratio / BALANCED_IO_BANDWIDTH
+                })
+
+        key = {
+            Objective.FASTEST: lambda e: (-e["speed"], e["ratio"]),
+            Objective.SMALLEST: lambda e: (e["ratio"], -e["speed"]),
+            Objective.BALANCED: lambda e: e["cost"]
+        }.get(objective)
+        if key is None:
+            raise ValueError(f"Unknown objective: {objective}")
+
+        best = min(estimates, key=key)
+        return best["algorithm"], best["level"], estimates
+
+    def benchmark_matrix(self, corpus_dir: str, output_path: str = "compression_matrix.csv") -> List[Dict]:
+        """Compress every file of a corpus with each backend and level and write a comparison table"""
+        corpus = Path(corpus_dir)
+        if not corpus.is_dir():
+            raise NotADirectoryError(f"Not a directory: {corpus_dir}")
+
+        files = [Path(root) / name for root, _, names in os.walk(corpus) for name in names]
+        totals = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch = str(Path(tmp) / "out")
+            for file_path in files:
+                original_size = file_path.stat().st_size
+                for algorithm, backend in BACKENDS.items():
+                    for level in backend.levels:
+                        start = time.perf_counter()
+                        self._compress_parallel(file_path, scratch, backend, 1, level)
+                        elapsed = time.perf_counter() - start
+                        row = totals.setdefault((algorithm, level), [0, 0, 0.0])
+                        row[0] += original_size
+                        row[1] += os.path.getsize(scratch)
+                        row[2] += elapsed
+
+        results = []
+        for (algorithm, level), (original, compressed, elapsed) in totals.items():
+            results.append({
+                "algorithm": algorithm,
+                "level": level,
+                "files": len(files),
+                "original_size": original,
+                "compressed_size": compressed,
+                "compression_ratio": round((original - compressed) / original * 100, 2) if original else 0.0,
+                "compression_time": round(elapsed, 3),
+                "mb_per_second": round(original / elapsed / (1024 * 1024), 2) if elapsed else 0.0
+            })
+        results.sort(key=lambda r: (r["algorithm"], r["level"]))
+
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]) if results else ["algorithm"])
+            writer.writeheader()
+            writer.writerows(results)
+        return results
+
+    def benchmark_backends(self, input_path: str,
+                           thread_counts: Optional[List[int]] = None) -> List[CompressionStats]:
+        """Compress a file with every available backend at each thread count"""
+        input_path = Path(input_path)
+        if thread_counts is None:
+            cpus = os.cpu_count() or 1
+            thread_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for algorithm in BACKENDS:
+                for threads in thread_counts:
+                    output_path = str(Path(tmp) / (input_path.name + self._get_extension(algorithm)))
+                    # Force the block engine even at one thread so rows are comparable
+                    start = time.perf_counter()
+                    self._compress_parallel(input_path, output_path, BACKENDS[algorithm], threads)
+                    elapsed = time.perf_counter() - start
+
+                    stats = CompressionStats()
+                    stats.algorithm = algorithm
+                    stats.threads = threads
+                    stats.original_size = input_path.stat().st_size
+                    stats.compressed_size = Path(output_path).stat().st_size
+                    stats.compression_time = elapsed
+                    stats.compression_ratio = (
+                        (stats.original_size - stats.compressed_size) / stats.original_size * 100
+                        if stats.original_size else 0.0)
+                    stats.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    results.append(stats)
+                    os.remove(output_path)
+
+        with open(self.benchmark_file, 'w') as f:
+            json.dump([stats.to_dict() for stats in results], f, indent=4)
+        return results
+
+    def _compress_directory_zip(self, input_path: Path, output_path: str, threads: int = 1) -> int:
+        """Archive a directory in one walk, deflating members in parallel; returns the original size"""
+        members = []
+        original_size = 0
+        for root, _, files in os.walk(input_path):
+            for file in files:
+                file_path = Path(root) / file
+                members.append((file_path, str(file_path.relative_to(input_path.parent))))
+                original_size += file_path.stat().st_size
+
+        spool_dir = str(Path(output_path).parent)
+        # At most 2 members per thread are held in memory at once
+        max_pending = threads * 2
+        pending = deque()
+
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf, \
+                ThreadPoolExecutor(max_workers=threads) as executor:
+            for file_path, arcname in members:
+                pending.append((file_path, arcname,
+                                executor.submit(self._deflate_member, file_path, spool_dir)))
+                if len(pending) >= max_pending:
+                    self._write_member(zipf, *pending.popleft())
+            while pending:
+                self._write_member(zipf, *pending.popleft())
+
+        return original_size
+
+    def _is_incompressible(self, file_path: Path) -> bool:
+        """Detect already-compressed files by extension or an entropy probe"""
+        if file_path.suffix.lower() in INCOMPRESSIBLE_EXTENSIONS:
+            return True
+        with open(file_path, 'rb') as f:
+            probe = f.read(ENTROPY_PROBE_SIZE)
+        return _byte_entropy(probe) > ENTROPY_THRESHOLD
+
+    def _deflate_member(self, file_path: Path, spool_dir: str) -> Optional[dict]:
+        """Raw-deflate a file for a zip member; returns None if it should be stored"""
+        if self._is_incompressible(file_path):
+            return None
+
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        crc = 0
+        file_size = 0
+        out = io.BytesIO()
+        spool = None
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                crc = zlib.crc32(block, crc)
+                file_size += len(block)
+                out.write(compressor.compress(block))
+                if spool is None and out.tell() > SPOOL_MEMORY_LIMIT:
+                    spool = tempfile.NamedTemporaryFile(dir=spool_dir, suffix='.spool', delete=False)
+                    spool.write(out.getvalue())
+                    out = spool
+            out.write(compressor.flush())
+
+        result = {"crc": crc, "file_size": file_size, "compress_size": out.tell(),
+                  "data": None, "spool": None}
+        if spool is None:
+            result["data"] = out.getvalue()
+        else:
+            spool.close()
+            result["spool"] = spool.name
+        return result
+
+    def _write_member(self, zipf: zipfile.ZipFile, file_path: Path, arcname: str, future):
+        """Append a member to the archive, either stored or from pre-deflated data"""
+        result = future.result()
+        if result is None:
+            zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+            return
+
+        zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.file_size = result["file_size"]
+        zinfo.compress_size = result["compress_size"]
+        zinfo.CRC = result["crc"]
+        zip64 = max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+
+        zinfo.header_offset = zipf.fp.tell()
+        zipf.fp.write(zinfo.FileHeader(zip64))
+        if result["spool"]:
+            with open(result["spool"], 'rb') as spool:
+                shutil.copyfileobj(spool, zipf.fp, BLOCK_SIZE)
+            os.unlink(result["spool"])
+        else:
+            zipf.fp.write(result["data"])
+        zipf.filelist.append(zinfo)
+        zipf.NameToInfo[zinfo.filename] = zinfo
+        zipf.start_dir = zipf.fp.tell()
 
     def _compress_directory_tar_gz(self, input_path: Path, output_path: str):
         with tarfile.open(output_path, "w:gz") as tar:
@@ -154,7 +564,10 @@ class FileCompressor:
             CompressionAlgorithm.GZIP: ".gz",
             CompressionAlgorithm.ZIP: ".zip",
             CompressionAlgorithm.TAR_GZ: ".tar.gz",
-            CompressionAlgorithm.ZLIB: ".zlib"
+            CompressionAlgorithm.ZLIB: ".zlib",
+            CompressionAlgorithm.ZSTD: ".zst",
+            CompressionAlgorithm.LZ4: ".lz4",
+            CompressionAlgorithm.XZ: ".xz"
         }[algorithm]
 
     def _get_directory_size(self, directory: Path) -> int:
@@ -180,7 +593,32 @@ class FileCompressor:
             except json.JSONDecodeError:
                 self.compression_history = []
 
+def print_matrix(results: List[Dict]):
+    print(f"\n{'Algorithm':<10} {'Level':>6} {'Compressed':>14} {'Ratio':>8} {'Time (s)':>10} {'MB/s':>8}")
+    print("-" * 61)
+    for row in results:
+        print(f"{row['algorithm']:<10} {row['level']:>6} {row['compressed_size']:>14,} "
+              f"{row['compression_ratio']:>7.2f}% {row['compression_time']:>10.3f} {row['mb_per_second']:>8}")
+
+def run_cli(argv: List[str]):
+    parser = argparse.ArgumentParser(description="File Compression Tool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    benchmark = subparsers.add_parser("benchmark", help="Run the algorithm x level matrix over a corpus")
+    benchmark.add_argument("corpus", help="Directory of files to compress")
+    benchmark.add_argument("-o", "--output", default="compression_matrix.csv",
+                           help="CSV file for the comparison table")
+    args = parser.parse_args(argv)
+
+    if args.command == "benchmark":
+        results = FileCompressor().benchmark_matrix(args.corpus, args.output)
+        print_matrix(results)
+        print(f"\nComparison table saved to {args.output}")
+
 def main():
+    if len(sys.argv) > 1:
+        run_cli(sys.argv[1:])
+        return
+
     compressor = FileCompressor()
     
     while True:
@@ -188,9 +626,11 @@ def main():
         print("1. Compress File")
         print("2. Compress Directory")
         print("3. View Compression History")
-        print("4. Exit")
+        print("4. Benchmark Backends")
+        print("5. Benchmark Matrix")
+        print("6. Exit")
         
-        choice = input("\nEnter your choice (1-4): ")
+        choice = input("\nEnter your choice (1-6): ")
         
         if choice == "1":
             file_path = input("Enter file path: ")
@@ -199,19 +639,49 @@ def main():
             print("2. ZIP")
             print("3. TAR.GZ")
             print("4. ZLIB")
+            print("5. ZSTD")
+            print("6. LZ4")
+            print("7. XZ")
+            print("8. Auto")
             
-            algo_choice = input("Choose algorithm (1-4): ")
+            algo_choice = input("Choose algorithm (1-8): ")
             algorithm = {
                 "1": CompressionAlgorithm.GZIP,
                 "2": CompressionAlgorithm.ZIP,
                 "3": CompressionAlgorithm.TAR_GZ,
-                "4": CompressionAlgorithm.ZLIB
+                "4": CompressionAlgorithm.ZLIB,
+                "5": CompressionAlgorithm.ZSTD,
+                "6": CompressionAlgorithm.LZ4,
+                "7": CompressionAlgorithm.XZ,
+                "8": CompressionAlgorithm.AUTO
             }.get(algo_choice, CompressionAlgorithm.GZIP)
+
+            objective = Objective.BALANCED
+            if algorithm == CompressionAlgorithm.AUTO:
+                print("\nObjectives:")
+                print("1. Fastest")
+                print("2. Smallest")
+                print("3. Balanced")
+                objective = {
+                    "1": Objective.FASTEST,
+                    "2": Objective.SMALLEST,
+                    "3": Objective.BALANCED
+                }.get(input("Choose objective (1-3): "), Objective.BALANCED)
+
+            threads = 1
+            if algorithm in BACKENDS or algorithm == CompressionAlgorithm.AUTO:
+                try:
+                    threads = int(input("Number of threads (default 1): ") or 1)
+                except ValueError:
+                    threads = 1
             
             try:
-                output_path, stats = compressor.compress_file(file_path, algorithm)
+                output_path, stats = compressor.compress_file(file_path, algorithm, threads,
+                                                              objective=objective)
                 print(f"\nCompression completed!")
                 print(f"Output file: {output_path}")
+                if algorithm == CompressionAlgorithm.AUTO:
+                    print(f"Selected: {stats.algorithm} (level {stats.level})")
                 print(f"Original size: {stats.original_size:,} bytes")
                 print(f"Compressed size: {stats.compressed_size:,} bytes")
                 print(f"Compression ratio: {stats.compression_ratio:.2f}%")
@@ -230,9 +700,16 @@ def main():
                 "1": CompressionAlgorithm.ZIP,
                 "2": CompressionAlgorithm.TAR_GZ
             }.get(algo_choice, CompressionAlgorithm.ZIP)
+
+            threads = 1
+            if algorithm == CompressionAlgorithm.ZIP:
+                try:
+                    threads = int(input("Number of threads (default 1): ") or 1)
+                except ValueError:
+                    threads = 1
             
             try:
-                output_path, stats = compressor.compress_directory(dir_path, algorithm)
+                output_path, stats = compressor.compress_directory(dir_path, algorithm, threads)
                 print(f"\nCompression completed!")
                 print(f"Output file: {output_path}")
                 print(f"Original size: {stats.original_size:,} bytes")
@@ -260,6 +737,32 @@ def main():
                 print("-" * 40)
         
         elif choice == "4":
+            file_path = input("Enter file path: ")
+            try:
+                results = compressor.benchmark_backends(file_path)
+            except Exception as e:
+                print(f"Error: {e}")
+                continue
+
+            print(f"\n{'Algorithm':<10} {'Threads':>8} {'Compressed':>14} {'Ratio':>8} {'Time (s)':>10}")
+            print("-" * 54)
+            for stats in results:
+                print(f"{stats.algorithm:<10} {stats.threads:>8} {stats.compressed_size:>14,} "
+                      f"{stats.compression_ratio:>7.2f}% {stats.compression_time:>10.3f}")
+            print(f"\nResults saved to {compressor.benchmark_file}")
+
+        elif choice == "5":
+            corpus = input("Enter corpus directory: ")
+            try:
+                results = compressor.benchmark_matrix(corpus)
+            except Exception as e:
+                print(f"Error: {e}")
+                continue
+
+            print_matrix(results)
+            print("\nComparison table saved to compression_matrix.csv")
+
+        elif choice == "6":
             print("Thank you for using File Compression Tool!")
             break
         
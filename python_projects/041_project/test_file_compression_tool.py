@@ -0,0 +1,100 @@
+import unittest
+import gzip
+import io
+import lzma
+import os
+import random
+import tempfile
+import zlib
+from pathlib import Path
+from file_compression_tool import (FileCompressor, CompressionAlgorithm, Objective, BACKENDS,
+                                   BLOCK_SIZE, zstandard, lz4_frame)
+
+def decompress(algorithm, data):
+    """Decompress every frame of a file written by the block engine"""
+    if algorithm == CompressionAlgorithm.GZIP:
+        return gzip.decompress(data)
+    if algorithm == CompressionAlgorithm.XZ:
+        return lzma.decompress(data)
+    if algorithm == CompressionAlgorithm.ZLIB:
+        decompressor = zlib.decompressobj()
+        out = decompressor.decompress(data)
+        # Trailing bytes would mean a second stream that zlib.decompress silently ignores
+        if not decompressor.eof or decompressor.unused_data:
+            raise ValueError("not a single zlib stream")
+        return out
+    if algorithm == CompressionAlgorithm.ZSTD:
+        reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+        return reader.read()
+    if algorithm == CompressionAlgorithm.LZ4:
+        out = b''
+        while data:
+            decompressor = lz4_frame.LZ4FrameDecompressor()
+            out += decompressor.decompress(data)
+            data = decompressor.unused_data
+        return out
+    raise ValueError(algorithm)
+
+class TestFileCompressor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.compressor = FileCompressor()
+        rng = random.Random(0)
+        words = [b"alpha", b"beta", b"gamma", b"delta", b"\n", b" ", b"0123456789"]
+        # Several blocks of compressible text, then a random tail that is not block aligned
+        text = b"".join(rng.choice(words) for _ in range(BLOCK_SIZE // 2))
+        self.data = text + os.urandom(BLOCK_SIZE // 3)
+        self.input_path = Path(self.tmp.name) / "input.bin"
+        self.input_path.write_bytes(self.data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def round_trip(self, algorithm, threads, level=None):
+        output_path, stats = self.compressor.compress_file(
+            str(self.input_path), algorithm, threads, level,
+            output_path=str(self.input_path) + ".out", record=False)
+        return decompress(stats.algorithm, Path(output_path).read_bytes()), stats
+
+    def test_block_engine_round_trip(self):
+        self.assertGreater(len(self.data), BLOCK_SIZE * 2)
+        for algorithm in BACKENDS:
+            for threads in (1, 4):
+                with self.subTest(algorithm=algorithm, threads=threads):
+                    restored, _ = self.round_trip(algorithm, threads)
+                    self.assertEqual(restored, self.data)
+
+    def test_single_thread_honours_level(self):
+        for algorithm, backend in BACKENDS.items():
+            for level in (min(backend.levels), max(backend.levels)):
+                with self.subTest(algorithm=algorithm, level=level):
+                    restored, stats = self.round_trip(algorithm, 1, level)
+                    self.assertEqual(restored, self.data)
+                    self.assertEqual(stats.threads, 1)
+                    self.assertEqual(stats.level, level)
+
+    def test_auto_single_thread_round_trip(self):
+        for objective in (Objective.FASTEST, Objective.SMALLEST, Objective.BALANCED):
+            with self.subTest(objective=objective):
+                output_path, stats = self.compressor.compress_file(
+                    str(self.input_path), CompressionAlgorithm.AUTO, 1, objective=objective,
+                    output_path=str(self.input_path) + ".out", record=False)
+                self.assertEqual(stats.threads, 1)
+                self.assertEqual(decompress(stats.algorithm, Path(output_path).read_bytes()), self.data)
+
+    def test_zlib_multi_block_is_one_stream(self):
+        output_path, _ = self.compressor.compress_file(
+            str(self.input_path), CompressionAlgorithm.ZLIB, 4,
+            output_path=str(self.input_path) + ".zlib", record=False)
+        self.assertEqual(zlib.decompress(Path(output_path).read_bytes()), self.data)
+
+    def test_empty_file(self):
+        self.input_path.write_bytes(b"")
+        output_path = str(self.input_path) + ".out"
+        for algorithm, backend in BACKENDS.items():
+            with self.subTest(algorithm=algorithm):
+                self.compressor._compress_parallel(self.input_path, output_path, backend, 2)
+                self.assertEqual(decompress(algorithm, Path(output_path).read_bytes()), b"")
+
+if __name__ == "__main__":
+    unittest.main()
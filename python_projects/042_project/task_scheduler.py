@@ -1,7 +1,7 @@
 import schedule
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 import json
 from pathlib import Path
 import subprocess
@@ -10,6 +10,15 @@ import logging
 from enum import Enum
 import sys
 import signal
+import heapq
+import itertools
+import random
+import os
+import tempfile
+import socket
+import socketserver
+import argparse
+from collections import deque
 
 class TaskPriority(Enum):
     LOW = 1
@@ -78,13 +87,240 @@ class Task:
         task.max_retries = data["max_retries"]
         return task
 
-class TaskScheduler:
+# Failed tasks with retries left run again after this delay
+RETRY_DELAY = timedelta(seconds=60)
+# Tasks refused by a full lane are offered again after this many seconds
+ADMISSION_RETRY_SECONDS = 1.0
+# Upper bound on one scheduler sleep so shutdown is noticed
+MAX_SLEEP_SECONDS = 60.0
+# Coordinator/worker protocol defaults
+DEFAULT_COORDINATOR_PORT = 9500
+DEFAULT_LEASE_SECONDS = 30.0
+WORKER_POLL_SECONDS = 0.5
+
+class TimerQueue:
+    """Min-heap of deadlines; pop_due sleeps until the earliest one instead of polling"""
+
     def __init__(self):
+        self.heap: List[tuple] = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def push(self, deadline: float, key: str, token: Any = None):
+        """Arm a timer; the token is handed back on expiry so callers can detect stale entries"""
+        with self.condition:
+            sequence = next(self.counter)
+            heapq.heappush(self.heap, (deadline, sequence, key, token))
+            # Only a new earliest deadline changes how long the scheduler should sleep
+            if self.heap[0][1] == sequence:
+                self.condition.notify()
+
+    def pop_due(self) -> List[tuple]:
+        """Block until at least one deadline has passed; return every due (key, token)"""
+        with self.condition:
+            while not self.closed:
+                now = time.time()
+                if self.heap and self.heap[0][0] <= now:
+                    due = []
+                    while self.heap and self.heap[0][0] <= now:
+                        _, _, key, token = heapq.heappop(self.heap)
+                        due.append((key, token))
+                    return due
+                timeout = self.heap[0][0] - now if self.heap else MAX_SLEEP_SECONDS
+                self.condition.wait(min(timeout, MAX_SLEEP_SECONDS))
+            return []
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+class WorkerPool:
+    """Fixed worker threads fed from per-priority lanes with a capacity limit per lane"""
+
+    # Weighted round robin so low priority work is slowed, not starved
+    LANE_WEIGHTS = {TaskPriority.HIGH: 4, TaskPriority.MEDIUM: 2, TaskPriority.LOW: 1}
+
+    def __init__(self, workers: int = 8, lane_capacity: int = 1000):
+        self.lanes = {priority: deque() for priority in TaskPriority}
+        self.lane_capacity = lane_capacity
+        self.order = [priority for priority, weight in self.LANE_WEIGHTS.items() for _ in range(weight)]
+        self.position = 0
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.rejected = 0
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, priority: TaskPriority, fn, *args) -> bool:
+        """Queue work on its priority lane; False if the lane is full"""
+        with self.condition:
+            lane = self.lanes[priority]
+            if self.stopping or len(lane) >= self.lane_capacity:
+                self.rejected += 1
+                return False
+            lane.append((fn, args))
+            self.condition.notify()
+            return True
+
+    def _next_job(self):
+        for offset in range(len(self.order)):
+            lane = self.lanes[self.order[(self.position + offset) % len(self.order)]]
+            if lane:
+                self.position = (self.position + offset + 1) % len(self.order)
+                return lane.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None:
+                    if self.stopping:
+                        return
+                    self.condition.wait()
+                    job = self._next_job()
+            fn, args = job
+            try:
+                fn(*args)
+            except Exception as e:
+                logging.error(f"Worker error: {e}")
+
+    def pending(self) -> int:
+        with self.condition:
+            return sum(len(lane) for lane in self.lanes.values())
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work; workers finish what is already queued"""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+class TaskJournal:
+    """Atomic JSON snapshot plus an append-only journal of task upserts and deletes"""
+
+    def __init__(self, snapshot_path: Path, journal_path: Path, min_compact_records: int = 1000,
+                 fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.min_compact_records = min_compact_records
+        self.fsync = fsync
+        # Reentrant: the SIGINT handler compacts on the main thread, which may be inside _append
+        self.lock = threading.RLock()
+        self.journal = None
+        self.records = 0
+        self.snapshot_size = 0
+
+    def recover(self) -> Dict[str, dict]:
+        """Snapshot state with the journal replayed on top; a torn last line is ignored"""
+        state: Dict[str, dict] = {}
+        if self.snapshot_path.exists():
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    state = json.load(f)
+            except json.JSONDecodeError:
+                logging.error("Error loading tasks file")
+        self.snapshot_size = len(state)
+
+        replayed = 0
+        if self.journal_path.exists():
+            valid_bytes = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        record = json.loads(line)
+                    except ValueError:
+                        logging.warning("Ignoring incomplete journal record")
+                        break
+                    if record["op"] == "put":
+                        state[record["task"]["name"]] = record["task"]
+                    elif record["op"] == "delete":
+                        state.pop(record["name"], None)
+                    replayed += 1
+                    valid_bytes += len(line)
+            # Drop a torn tail so new records start on a clean line
+            if valid_bytes != self.journal_path.stat().st_size:
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+        self.records = replayed
+        if replayed:
+            logging.info(f"Recovered {len(state)} tasks, replayed {replayed} journal records")
+        return state
+
+    def _append(self, record: dict) -> bool:
+        """Write one record; True when the journal is due for compaction"""
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with self.lock:
+            if self.journal is None:
+                self.journal = open(self.journal_path, 'a')
+            self.journal.write(line)
+            self.journal.flush()
+            if self.fsync:
+                os.fsync(self.journal.fileno())
+            self.records += 1
+            # Compacting after as many records as the snapshot holds keeps the cost O(1) amortized
+            return self.records >= max(self.min_compact_records, self.snapshot_size)
+
+    def put(self, task_data: dict) -> bool:
+        return self._append({"op": "put", "task": task_data})
+
+    def delete(self, name: str) -> bool:
+        return self._append({"op": "delete", "name": name})
+
+    def compact(self, snapshot: Callable[[], Dict[str, dict]]):
+        """Atomically replace the snapshot, then truncate the journal"""
+        with self.lock:
+            # Taken under the lock: a record appended after this point goes to the new journal,
+            # and one appended before it is already reflected in the snapshot
+            state = snapshot()
+            fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_path.parent or ".",
+                                            prefix=self.snapshot_path.name, suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            # Replaying records over the new snapshot is idempotent, so a crash here loses nothing
+            if self.journal is not None:
+                self.journal.close()
+            self.journal = open(self.journal_path, 'w')
+            self.records = 0
+            self.snapshot_size = len(state)
+
+    def close(self):
+        with self.lock:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+
+class TaskScheduler:
+    def __init__(self, max_workers: int = 8, lane_capacity: int = 1000):
         self.tasks: Dict[str, Task] = {}
         self.running_tasks: Set[str] = set()
+        # Tasks handed to the backend but not finished yet, and tasks waiting on dependencies
+        self.queued_tasks: Set[str] = set()
+        self.blocked_tasks: Set[str] = set()
+        self.state_lock = threading.Lock()
+        self.timers = TimerQueue()
+        self.max_workers = max_workers
+        self.lane_capacity = lane_capacity
+        self.backend = None
         self.file_path = Path("tasks.json")
+        self.journal_path = Path("tasks.journal")
         self.log_file = Path("scheduler.log")
         self.setup_logging()
+        self.journal = TaskJournal(self.file_path, self.journal_path)
         self.load_tasks()
         self.running = True
         signal.signal(signal.SIGINT, self.handle_shutdown)
@@ -109,7 +345,7 @@ class TaskScheduler:
 
         task = Task(name, command, priority)
         self.tasks[name] = task
-        self.save_tasks()
+        self.persist_task(task)
         logging.info(f"Added task: {name}")
         return True
 
@@ -122,7 +358,8 @@ class TaskScheduler:
         task.frequency = frequency
         task.custom_schedule = custom_schedule
         self.calculate_next_run(task)
-        self.save_tasks()
+        self.schedule_task(task)
+        self.persist_task(task)
         logging.info(f"Updated schedule for task: {name}")
         return True
 
@@ -141,7 +378,7 @@ class TaskScheduler:
             return False
 
         self.tasks[task_name].dependencies.add(dependency_name)
-        self.save_tasks()
+        self.persist_task(self.tasks[task_name])
         logging.info(f"Added dependency {dependency_name} to task {task_name}")
         return True
 
@@ -186,21 +423,18 @@ class TaskScheduler:
             # Not implemented in this basic version
             pass
 
-    def execute_task(self, task: Task):
-        if task.name in self.running_tasks:
-            return
+    def dependencies_met(self, task: Task) -> bool:
+        return all(self.tasks[dep].status == TaskStatus.COMPLETED
+                   for dep in task.dependencies if dep in self.tasks)
 
-        # Check dependencies
-        for dep in task.dependencies:
-            if dep not in self.tasks:
-                continue
-            if self.tasks[dep].status != TaskStatus.COMPLETED:
-                task.status = TaskStatus.BLOCKED
-                return
+    def schedule_task(self, task: Task):
+        """Put the task's next run on the timer heap; superseded entries are skipped when popped"""
+        if task.next_run:
+            self.timers.push(task.next_run.timestamp(), task.name, task.next_run.timestamp())
 
-        self.running_tasks.add(task.name)
-        task.status = TaskStatus.RUNNING
-        task.last_run = datetime.now()
+    def execute_task(self, task: Task):
+        if not self.start_task(task):
+            return
 
         try:
             process = subprocess.run(
@@ -210,67 +444,576 @@ class TaskScheduler:
                 text=True,
                 timeout=3600  # 1 hour timeout
             )
-
-            if process.returncode == 0:
-                task.status = TaskStatus.COMPLETED
-                task.error_message = ""
-                task.retry_count = 0
-                logging.info(f"Task {task.name} completed successfully")
-            else:
-                task.status = TaskStatus.FAILED
-                task.error_message = process.stderr
-                task.retry_count += 1
-                logging.error(f"Task {task.name} failed: {task.error_message}")
+            self.record_result(task, process.returncode, process.stderr)
 
         except Exception as e:
+            self.record_result(task, None, str(e))
+
+        finally:
+            self.finish_task(task)
+
+    def start_task(self, task: Task) -> bool:
+        """Mark a task running if it is not already and its dependencies have completed"""
+        with self.state_lock:
+            if task.name in self.running_tasks:
+                return False
+
+            # Check dependencies
+            if not self.dependencies_met(task):
+                task.status = TaskStatus.BLOCKED
+                self.blocked_tasks.add(task.name)
+                self.queued_tasks.discard(task.name)
+                return False
+
+            self.running_tasks.add(task.name)
+        task.status = TaskStatus.RUNNING
+        task.last_run = datetime.now()
+        return True
+
+    def record_result(self, task: Task, returncode: Optional[int], error: str):
+        """Apply a run's outcome; a None return code means the command could not be run"""
+        if returncode == 0:
+            task.status = TaskStatus.COMPLETED
+            task.error_message = ""
+            task.retry_count = 0
+            logging.info(f"Task {task.name} completed successfully")
+        elif returncode is not None:
             task.status = TaskStatus.FAILED
-            task.error_message = str(e)
+            task.error_message = error
             task.retry_count += 1
-            logging.error(f"Error executing task {task.name}: {e}")
+            logging.error(f"Task {task.name} failed: {task.error_message}")
+        else:
+            task.status = TaskStatus.FAILED
+            task.error_message = error
+            task.retry_count += 1
+            logging.error(f"Error executing task {task.name}: {error}")
 
-        finally:
-            self.running_tasks.remove(task.name)
+    def finish_task(self, task: Task):
+        with self.state_lock:
+            self.running_tasks.discard(task.name)
+            self.queued_tasks.discard(task.name)
+        self.reschedule(task)
+        self.persist_task(task)
+        if task.status == TaskStatus.COMPLETED:
+            self.release_dependents(task.name)
+
+    def reschedule(self, task: Task):
+        """Compute the next run after an execution and arm its timer"""
+        if task.status == TaskStatus.FAILED and task.retry_count < task.max_retries:
+            task.next_run = datetime.now() + RETRY_DELAY
+        elif task.frequency == TaskFrequency.ONCE:
+            task.next_run = None
+        else:
             self.calculate_next_run(task)
-            self.save_tasks()
+        self.schedule_task(task)
 
-    def run_scheduler(self):
-        while self.running:
-            now = datetime.now()
-            
-            # Sort tasks by priority
-            pending_tasks = sorted(
-                [task for task in self.tasks.values() if task.next_run and task.next_run <= now],
-                key=lambda x: x.priority.value,
-                reverse=True
-            )
+    def release_dependents(self, name: str):
+        """Re-offer blocked tasks that were waiting on a task that just completed"""
+        with self.state_lock:
+            ready = [self.tasks[blocked] for blocked in self.blocked_tasks
+                     if blocked in self.tasks and name in self.tasks[blocked].dependencies]
+            for task in ready:
+                self.blocked_tasks.discard(task.name)
+        for task in ready:
+            if task.next_run:
+                self.timers.push(time.time(), task.name, task.next_run.timestamp())
 
-            for task in pending_tasks:
-                if task.retry_count >= task.max_retries:
-                    continue
-                
-                thread = threading.Thread(target=self.execute_task, args=(task,))
-                thread.start()
+    def dispatch(self, name: str, run_at: float):
+        """Hand a due task to the backend, or defer it when its lane is full"""
+        task = self.tasks.get(name)
+        if task is None or task.next_run is None or task.next_run.timestamp() != run_at:
+            return  # Superseded by a newer schedule
+        if task.retry_count >= task.max_retries:
+            return
+
+        with self.state_lock:
+            if name in self.queued_tasks or name in self.running_tasks:
+                return
+            if not self.dependencies_met(task):
+                task.status = TaskStatus.BLOCKED
+                self.blocked_tasks.add(name)
+                return
+            self.blocked_tasks.discard(name)
+            self.queued_tasks.add(name)
+
+        if not self.backend.submit(task):
+            with self.state_lock:
+                self.queued_tasks.discard(name)
+            self.timers.push(time.time() + ADMISSION_RETRY_SECONDS, name, run_at)
+
+    def run_scheduler(self, backend=None):
+        """Sleep until the earliest deadline, then dispatch every due task to the backend"""
+        self.backend = backend or LocalBackend(self)
+        self.backend.start()
+        self.timers = TimerQueue()
+        for task in self.tasks.values():
+            self.schedule_task(task)
 
-            time.sleep(1)
+        try:
+            while self.running:
+                for name, run_at in self.timers.pop_due():
+                    self.dispatch(name, run_at)
+        finally:
+            self.timers.close()
+            self.backend.stop()
+
+    def stop_scheduler(self):
+        self.running = False
+        self.timers.close()
+
+    def persist_task(self, task: Task):
+        """Journal one task's state; compacts into tasks.json when the journal grows"""
+        if self.journal.put(task.to_dict()):
+            self.save_tasks()
 
     def save_tasks(self):
-        data = {name: task.to_dict() for name, task in self.tasks.items()}
-        with open(self.file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        """Write an atomic snapshot of every task and truncate the journal"""
+        self.journal.compact(lambda: {name: task.to_dict() for name, task in list(self.tasks.items())})
 
     def load_tasks(self):
-        if not self.file_path.exists():
+        data = self.journal.recover()
+        self.tasks = {name: Task.from_dict(task_data) for name, task_data in data.items()}
+        for task in self.tasks.values():
+            # A task that was running when the process died is run again
+            if task.status == TaskStatus.RUNNING:
+                task.status = TaskStatus.PENDING
+
+class LocalBackend:
+    """Runs due tasks in this process on the bounded worker pool"""
+
+    def __init__(self, scheduler: TaskScheduler):
+        self.scheduler = scheduler
+        self.pool: Optional[WorkerPool] = None
+
+    def start(self):
+        self.pool = WorkerPool(self.scheduler.max_workers, self.scheduler.lane_capacity)
+
+    def submit(self, task: Task) -> bool:
+        return self.pool.submit(task.priority, self.scheduler.execute_task, task)
+
+    def stop(self):
+        self.pool.shutdown(wait=False)
+
+class Lease:
+    __slots__ = ("lease_id", "task", "worker", "expires")
+
+    def __init__(self, lease_id: str, task: Task, worker: str, expires: float):
+        self.lease_id = lease_id
+        self.task = task
+        self.worker = worker
+        self.expires = expires
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    """One worker connection: a JSON request per line, answered with a JSON reply per line"""
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = self.server.backend.handle(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {"error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+class CoordinatorBackend:
+    """Leases due tasks to remote workers; a lease not renewed by heartbeat is re-queued"""
+
+    def __init__(self, scheduler: TaskScheduler, host: str = "127.0.0.1",
+                 port: int = DEFAULT_COORDINATOR_PORT, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.scheduler = scheduler
+        self.host = host
+        self.port = port
+        self.lease_seconds = lease_seconds
+        self.lanes = {priority: deque() for priority in TaskPriority}
+        self.order = [priority for priority, weight in WorkerPool.LANE_WEIGHTS.items() for _ in range(weight)]
+        self.position = 0
+        self.lock = threading.Lock()
+        self.leases: Dict[str, Lease] = {}
+        self.workers: Dict[str, dict] = {}
+        self.lease_ids = itertools.count(1)
+        self.stopping = threading.Event()
+        self.server: Optional[_CoordinatorServer] = None
+        self.rejected = 0
+        self.requeued = 0
+
+    def start(self):
+        self.stopping.clear()
+        self.server = _CoordinatorServer((self.host, self.port), _CoordinatorHandler)
+        self.server.backend = self
+        self.host, self.port = self.server.server_address[:2]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._reap_expired, daemon=True).start()
+        logging.info(f"Coordinator listening on {self.host}:{self.port}")
+
+    def submit(self, task: Task) -> bool:
+        """Queue a due task for the next lease request; False if its lane is full"""
+        with self.lock:
+            lane = self.lanes[task.priority]
+            if self.stopping.is_set() or len(lane) >= self.scheduler.lane_capacity:
+                self.rejected += 1
+                return False
+            lane.append(task)
+            return True
+
+    def _next_task(self) -> Optional[Task]:
+        for offset in range(len(self.order)):
+            lane = self.lanes[self.order[(self.position + offset) % len(self.order)]]
+            if lane:
+                self.position = (self.position + offset + 1) % len(self.order)
+                return lane.popleft()
+        return None
+
+    def handle(self, message: dict) -> dict:
+        kind = message["type"]
+        worker = str(message.get("worker", ""))
+        if kind == "hello":
+            with self.lock:
+                self.workers[worker] = {"slots": int(message.get("slots", 1)), "seen": time.time()}
+            logging.info(f"Worker {worker} joined with {message.get('slots', 1)} slots")
+            return {"ok": True, "lease_seconds": self.lease_seconds}
+        if kind == "lease":
+            return {"leases": self.grant(worker, int(message.get("slots", 1)))}
+        if kind == "heartbeat":
+            return {"unknown": self.renew(worker, message.get("leases", []))}
+        if kind == "complete":
+            self.complete(message["lease_id"], message.get("returncode"), message.get("error", ""))
+            return {"ok": True}
+        return {"error": f"Unknown message type: {kind}"}
+
+    def grant(self, worker: str, slots: int) -> List[dict]:
+        """Lease up to slots queued tasks whose dependencies have completed"""
+        granted = []
+        while len(granted) < slots:
+            with self.lock:
+                task = self._next_task()
+            if task is None:
+                break
+            # Dependency gating happens here, so it holds however many nodes run tasks
+            if not self.scheduler.start_task(task):
+                continue
+            lease_id = f"{worker}-{next(self.lease_ids)}"
+            with self.lock:
+                self.leases[lease_id] = Lease(lease_id, task, worker, time.time() + self.lease_seconds)
+                if worker in self.workers:
+                    self.workers[worker]["seen"] = time.time()
+            granted.append({"lease_id": lease_id, "name": task.name, "command": task.command})
+            logging.info(f"Leased task {task.name} to {worker}")
+        return granted
+
+    def renew(self, worker: str, lease_ids: List[str]) -> List[str]:
+        """Extend the worker's leases; returns the ids it no longer holds"""
+        unknown = []
+        expires = time.time() + self.lease_seconds
+        with self.lock:
+            if worker in self.workers:
+                self.workers[worker]["seen"] = time.time()
+            for lease_id in lease_ids:
+                lease = self.leases.get(lease_id)
+                if lease is None or lease.worker != worker:
+                    unknown.append(lease_id)
+                else:
+                    lease.expires = expires
+        return unknown
+
+    def complete(self, lease_id: str, returncode: Optional[int], error: str):
+        with self.lock:
+            lease = self.leases.pop(lease_id, None)
+        if lease is None:
+            # The lease expired and the task was handed to another worker
+            logging.warning(f"Ignoring result for expired lease {lease_id}")
             return
+        self.scheduler.record_result(lease.task, returncode, error)
+        self.scheduler.finish_task(lease.task)
+
+    def _reap_expired(self):
+        interval = min(1.0, self.lease_seconds / 3)
+        while not self.stopping.wait(interval):
+            now = time.time()
+            with self.lock:
+                expired = [lease for lease in self.leases.values() if lease.expires <= now]
+                for lease in expired:
+                    del self.leases[lease.lease_id]
+            for lease in expired:
+                self.requeue(lease)
+
+    def requeue(self, lease: Lease):
+        """Put a task whose worker went silent back at the front of its lane"""
+        task = lease.task
+        with self.scheduler.state_lock:
+            self.scheduler.running_tasks.discard(task.name)
+            task.status = TaskStatus.PENDING
+        with self.lock:
+            self.lanes[task.priority].appendleft(task)
+            self.requeued += 1
+        logging.warning(f"Lease {lease.lease_id} on {lease.worker} expired, re-queued task {task.name}")
+
+    def stop(self):
+        self.stopping.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+class TaskWorker:
+    """Execution node that leases tasks from a coordinator and runs them as local processes"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_COORDINATOR_PORT,
+                 slots: int = 4, worker_id: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.slots = slots
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = DEFAULT_LEASE_SECONDS
+        self.lock = threading.Lock()
+        # lease id -> process (None until it has started)
+        self.running: Dict[str, Optional[subprocess.Popen]] = {}
+        # Results are kept until the coordinator acknowledges them
+        self.done: deque = deque()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
 
+    def run(self):
+        """Serve the coordinator until stopped, reconnecting with backoff"""
+        backoff = 0.5
+        while not self.stopped.is_set():
+            try:
+                with socket.create_connection((self.host, self.port), timeout=10) as sock:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    reader = sock.makefile('rb')
+                    hello = self._request(sock, reader, {"type": "hello", "slots": self.slots})
+                    self.lease_seconds = hello.get("lease_seconds", self.lease_seconds)
+                    logging.info(f"Worker {self.worker_id} connected to {self.host}:{self.port}")
+                    backoff = 0.5
+                    self._session(sock, reader)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Coordinator connection lost: {e}")
+                self.stopped.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _request(self, sock: socket.socket, reader, message: dict) -> dict:
+        message["worker"] = self.worker_id
+        sock.sendall((json.dumps(message) + "\n").encode())
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("coordinator closed the connection")
+        return json.loads(line)
+
+    def _session(self, sock: socket.socket, reader):
+        last_heartbeat = time.time()
+        while not self.stopped.is_set():
+            while self.done:
+                self._request(sock, reader, dict(self.done[0], type="complete"))
+                self.done.popleft()
+
+            with self.lock:
+                free = self.slots - len(self.running)
+            if free > 0:
+                reply = self._request(sock, reader, {"type": "lease", "slots": free})
+                for lease in reply.get("leases", []):
+                    self._start(lease)
+
+            if time.time() - last_heartbeat >= self.lease_seconds / 3:
+                with self.lock:
+                    held = list(self.running)
+                reply = self._request(sock, reader, {"type": "heartbeat", "leases": held})
+                for lease_id in reply.get("unknown", []):
+                    self._abandon(lease_id)
+                last_heartbeat = time.time()
+
+            self.wakeup.wait(WORKER_POLL_SECONDS)
+            self.wakeup.clear()
+
+    def _start(self, lease: dict):
+        with self.lock:
+            self.running[lease["lease_id"]] = None
+        threading.Thread(target=self._execute, args=(lease,), daemon=True).start()
+
+    def _execute(self, lease: dict):
+        lease_id = lease["lease_id"]
+        returncode, error = None, ""
+        try:
+            # Its own session, so the whole process group can be killed, not just the shell
+            process = subprocess.Popen(lease["command"], shell=True, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.PIPE, text=True, start_new_session=True)
+            with self.lock:
+                self.running[lease_id] = process
+            try:
+                _, error = process.communicate(timeout=3600)  # 1 hour timeout
+                returncode = process.returncode
+            except subprocess.TimeoutExpired:
+                self._kill(process)
+                process.communicate()
+                error = "Timed out after 3600 seconds"
+        except Exception as e:
+            error = str(e)
+        finally:
+            with self.lock:
+                self.running.pop(lease_id, None)
+            self.done.append({"lease_id": lease_id, "returncode": returncode, "error": error})
+            self.wakeup.set()
+            logging.info(f"Task {lease['name']} finished with exit code {returncode}")
+
+    def _abandon(self, lease_id: str):
+        """Kill a task whose lease the coordinator has already given to another worker"""
+        with self.lock:
+            process = self.running.get(lease_id)
+        if process is not None:
+            logging.warning(f"Lease {lease_id} was revoked, killing its process group")
+            self._kill(process)
+
+    @staticmethod
+    def _kill(process: subprocess.Popen):
+        """Kill the task's process group; children of a compound command outlive the shell"""
         try:
-            with open(self.file_path, 'r') as f:
-                data = json.load(f)
-                self.tasks = {name: Task.from_dict(task_data) 
-                            for name, task_data in data.items()}
-        except json.JSONDecodeError:
-            logging.error("Error loading tasks file")
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
+
+def benchmark_scheduler(task_count: int = 100000, spread: float = 2.0, workers: int = 8) -> Dict:
+    """Scheduling overhead and dispatch latency of the heap scheduler versus the old scan-and-sort loop"""
+    rng = random.Random(42)
+    priorities = list(TaskPriority)
+    tasks = []
+    for i in range(task_count):
+        task = Task(f"task_{i}", "true", rng.choice(priorities))
+        task.next_run = datetime.now() + timedelta(seconds=0.5 + rng.random() * spread)
+        tasks.append(task)
+
+    # One iteration of the previous polling loop: scan every task and sort the due ones
+    now = datetime.now() + timedelta(seconds=spread + 1)
+    start = time.perf_counter()
+    sorted([task for task in tasks if task.next_run and task.next_run <= now],
+           key=lambda x: x.priority.value, reverse=True)
+    scan_seconds = time.perf_counter() - start
+
+    timers = TimerQueue()
+    pool = WorkerPool(workers, lane_capacity=task_count)
+    latencies: List[float] = []
+    latency_lock = threading.Lock()
+    done = threading.Event()
+
+    def run(deadline: float):
+        latency = time.time() - deadline
+        with latency_lock:
+            latencies.append(latency)
+            if len(latencies) == task_count:
+                done.set()
+
+    start = time.perf_counter()
+    for task in tasks:
+        timers.push(task.next_run.timestamp(), task.name, task.next_run.timestamp())
+    push_seconds = time.perf_counter() - start
+
+    priority_of = {task.name: task.priority for task in tasks}
+    dispatch_seconds = 0.0
+    wakeups = 0
+    while not done.is_set():
+        due = timers.pop_due()
+        wakeups += 1
+        start = time.perf_counter()
+        for name, deadline in due:
+            pool.submit(priority_of[name], run, deadline)
+        dispatch_seconds += time.perf_counter() - start
+        if len(timers) == 0:
+            break
+    done.wait(60)
+    pool.shutdown()
+
+    latencies.sort()
+    return {
+        "tasks": task_count,
+        "workers": workers,
+        "push_us_per_task": push_seconds / task_count * 1e6,
+        "dispatch_us_per_task": dispatch_seconds / task_count * 1e6,
+        "scheduler_wakeups": wakeups,
+        "p50_latency_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_latency_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "max_latency_ms": latencies[-1] * 1000,
+        "legacy_scan_ms_per_tick": scan_seconds * 1000
+    }
+
+def benchmark_persistence(task_counts=(100, 1000, 10000), completions: int = 20000) -> List[Dict]:
+    """Persistence cost per task completion: whole-file rewrite versus journal append"""
+    results = []
+    for count in task_counts:
+        tasks = {f"task_{i}": Task(f"task_{i}", "true") for i in range(count)}
+        names = list(tasks)
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot = Path(tmp) / "tasks.json"
+
+            # Previous behaviour: re-serialize every task on each completion
+            rewrites = max(5, min(completions, 200000 // count))
+            start = time.perf_counter()
+            for i in range(rewrites):
+                data = {name: task.to_dict() for name, task in tasks.items()}
+                with open(snapshot, 'w') as f:
+                    json.dump(data, f, indent=4)
+            rewrite_seconds = (time.perf_counter() - start) / rewrites
+
+            journal = TaskJournal(snapshot, Path(tmp) / "tasks.journal")
+            journal.compact(lambda: {name: task.to_dict() for name, task in tasks.items()})
+            compactions = 0
+            start = time.perf_counter()
+            for i in range(completions):
+                task = tasks[names[i % count]]
+                task.status = TaskStatus.COMPLETED
+                if journal.put(task.to_dict()):
+                    journal.compact(lambda: {name: task.to_dict() for name, task in tasks.items()})
+                    compactions += 1
+            journal_seconds = (time.perf_counter() - start) / completions
+            journal.close()
+
+        results.append({
+            "tasks": count,
+            "rewrite_us": rewrite_seconds * 1e6,
+            "journal_us": journal_seconds * 1e6,
+            "compactions": compactions,
+            "speedup": rewrite_seconds / journal_seconds if journal_seconds else 0.0
+        })
+    return results
+
+def run_cli(argv: List[str]):
+    parser = argparse.ArgumentParser(description="Task Scheduler")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    coordinator = subparsers.add_parser("coordinator", help="Run the scheduler and lease tasks to workers")
+    coordinator.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_COORDINATOR_PORT)
+    coordinator.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                             help="How long a lease lasts without a heartbeat")
+    worker = subparsers.add_parser("worker", help="Run tasks leased from a coordinator")
+    worker.add_argument("--host", default="127.0.0.1", help="Coordinator address")
+    worker.add_argument("--port", type=int, default=DEFAULT_COORDINATOR_PORT)
+    worker.add_argument("--slots", type=int, default=4, help="Tasks to run at once")
+    worker.add_argument("--id", default=None, help="Worker name (default: host-pid)")
+    args = parser.parse_args(argv)
+
+    if args.command == "coordinator":
+        scheduler = TaskScheduler()
+        print(f"Coordinator listening on {args.host}:{args.port} (Press Ctrl+C to stop)")
+        scheduler.run_scheduler(CoordinatorBackend(scheduler, args.host, args.port, args.lease_seconds))
+    elif args.command == "worker":
+        logging.basicConfig(filename="worker.log", level=logging.INFO,
+                            format='%(asctime)s - %(levelname)s - %(message)s')
+        task_worker = TaskWorker(args.host, args.port, args.slots, args.id)
+        print(f"Worker {task_worker.worker_id} serving {args.host}:{args.port} (Press Ctrl+C to stop)")
+        try:
+            task_worker.run()
+        except KeyboardInterrupt:
+            task_worker.stop()
 
 def main():
+    if len(sys.argv) > 1:
+        run_cli(sys.argv[1:])
+        return
+
     scheduler = TaskScheduler()
     
     while True:
@@ -281,9 +1024,11 @@ def main():
         print("4. List Tasks")
         print("5. View Task Details")
         print("6. Start Scheduler")
-        print("7. Exit")
+        print("7. Benchmark Scheduler")
+        print("8. Benchmark State Persistence")
+        print("9. Exit")
         
-        choice = input("\nEnter your choice (1-7): ")
+        choice = input("\nEnter your choice (1-9): ")
         
         if choice == "1":
             name = input("Enter task name: ")
@@ -363,13 +1108,36 @@ def main():
                 print("Task not found!")
         
         elif choice == "6":
+            backend = None
+            if input("Run tasks on remote workers? (y/n): ").lower() == "y":
+                port = int(input(f"Coordinator port (default {DEFAULT_COORDINATOR_PORT}): ")
+                           or DEFAULT_COORDINATOR_PORT)
+                backend = CoordinatorBackend(scheduler, port=port)
+                print(f"Start workers with: python task_scheduler.py worker --port {port}")
             print("Starting scheduler... (Press Ctrl+C to stop)")
             try:
-                scheduler.run_scheduler()
+                scheduler.run_scheduler(backend)
             except KeyboardInterrupt:
                 print("\nStopping scheduler...")
         
         elif choice == "7":
+            count = int(input("Number of tasks (default 100000): ") or "100000")
+            result = benchmark_scheduler(count)
+            print(f"\nScheduled {result['tasks']} tasks on {result['workers']} workers")
+            print(f"Heap push: {result['push_us_per_task']:.2f} us/task")
+            print(f"Dispatch: {result['dispatch_us_per_task']:.2f} us/task "
+                  f"({result['scheduler_wakeups']} wakeups)")
+            print(f"Dispatch latency p50/p99/max: {result['p50_latency_ms']:.2f} / "
+                  f"{result['p99_latency_ms']:.2f} / {result['max_latency_ms']:.2f} ms")
+            print(f"Old scan-and-sort loop: {result['legacy_scan_ms_per_tick']:.2f} ms per 1s tick")
+
+        elif choice == "8":
+            print(f"\n{'Tasks':>8} {'Rewrite (us)':>14} {'Journal (us)':>14} {'Compactions':>12} {'Speedup':>8}")
+            for row in benchmark_persistence():
+                print(f"{row['tasks']:>8} {row['rewrite_us']:>14.1f} {row['journal_us']:>14.1f} "
+                      f"{row['compactions']:>12} {row['speedup']:>7.1f}x")
+
+        elif choice == "9":
             print("Thank you for using Task Scheduler!")
             scheduler.save_tasks()
             break
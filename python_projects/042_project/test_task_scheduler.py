@@ -0,0 +1,272 @@
+import unittest
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from task_scheduler import (TaskScheduler, TaskStatus, TaskPriority, TimerQueue, WorkerPool,
+                            CoordinatorBackend, ADMISSION_RETRY_SECONDS)
+
+SCRIPT = str(Path(__file__).resolve().parent / "task_scheduler.py")
+
+def wait_for(condition, timeout: float = 20.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+def python_command(code: str) -> str:
+    """Shell command running Python code; the trailing '&& true' keeps sh as the parent process"""
+    return f'"{sys.executable}" -c "{code}" && true'
+
+class TestTimerQueue(unittest.TestCase):
+    def test_pop_due_returns_due_entries_in_deadline_order(self):
+        timers = TimerQueue()
+        now = time.time()
+        timers.push(now - 1, "b", 2)
+        timers.push(now - 2, "a", 1)
+        timers.push(now + 60, "later", 3)
+        self.assertEqual(timers.pop_due(), [("a", 1), ("b", 2)])
+        self.assertEqual(len(timers), 1)
+
+    def test_pop_due_sleeps_until_deadline(self):
+        timers = TimerQueue()
+        start = time.time()
+        timers.push(start + 0.2, "task")
+        self.assertEqual(timers.pop_due(), [("task", None)])
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_earlier_deadline_wakes_sleeping_pop(self):
+        timers = TimerQueue()
+        timers.push(time.time() + 30, "late")
+        result = []
+        waiter = threading.Thread(target=lambda: result.extend(timers.pop_due()))
+        waiter.start()
+        time.sleep(0.1)
+        timers.push(time.time() + 0.1, "early")
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(result, [("early", None)])
+
+    def test_close_unblocks_pop(self):
+        timers = TimerQueue()
+        threading.Timer(0.1, timers.close).start()
+        self.assertEqual(timers.pop_due(), [])
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.pool = WorkerPool(workers=1, lane_capacity=2)
+
+    def tearDown(self):
+        self.release.set()
+        self.pool.shutdown()
+
+    def block_worker(self):
+        """Occupy the single worker so later submissions stay queued"""
+        def blocker():
+            self.started.set()
+            self.release.wait(10)
+        self.assertTrue(self.pool.submit(TaskPriority.HIGH, blocker))
+        self.assertTrue(self.started.wait(5))
+
+    def test_runs_submitted_work(self):
+        done = threading.Event()
+        self.assertTrue(self.pool.submit(TaskPriority.LOW, done.set))
+        self.assertTrue(done.wait(5))
+
+    def test_full_lane_rejects_without_blocking_other_lanes(self):
+        self.block_worker()
+        self.assertTrue(self.pool.submit(TaskPriority.LOW, time.time))
+        self.assertTrue(self.pool.submit(TaskPriority.LOW, time.time))
+        self.assertFalse(self.pool.submit(TaskPriority.LOW, time.time))
+        self.assertEqual(self.pool.rejected, 1)
+        self.assertTrue(self.pool.submit(TaskPriority.HIGH, time.time))
+        self.assertEqual(self.pool.pending(), 3)
+
+    def test_low_priority_is_not_starved(self):
+        self.pool.lane_capacity = 10
+        self.block_worker()
+        order = []
+        for _ in range(8):
+            self.pool.submit(TaskPriority.HIGH, order.append, "high")
+        for _ in range(2):
+            self.pool.submit(TaskPriority.LOW, order.append, "low")
+        self.release.set()
+        self.pool.shutdown()
+        self.assertEqual(len(order), 10)
+        # Weights 4:2:1 with the medium lane empty: low runs after at most 4 high jobs
+        self.assertLess(order.index("low"), 5)
+        self.assertEqual(order.count("low"), 2)
+
+    def test_shutdown_rejects_new_work(self):
+        self.pool.shutdown()
+        self.assertFalse(self.pool.submit(TaskPriority.HIGH, time.time))
+
+class RecordingBackend:
+    def __init__(self, accept: bool = True):
+        self.accept = accept
+        self.submitted = []
+
+    def submit(self, task) -> bool:
+        self.submitted.append(task.name)
+        return self.accept
+
+class TestDispatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.scheduler = TaskScheduler()
+        self.scheduler.add_task("job", "true")
+        self.task = self.scheduler.tasks["job"]
+
+    def tearDown(self):
+        self.scheduler.journal.close()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_superseded_timer_entry_is_skipped(self):
+        self.scheduler.backend = RecordingBackend()
+        old = datetime.now()
+        self.task.next_run = old
+        self.scheduler.schedule_task(self.task)
+        # Rescheduling leaves the old heap entry in place; its token no longer matches
+        self.task.next_run = datetime.fromtimestamp(old.timestamp() + 60)
+        self.scheduler.schedule_task(self.task)
+        self.assertEqual(len(self.scheduler.timers), 2)
+
+        self.scheduler.dispatch("job", old.timestamp())
+        self.assertEqual(self.scheduler.backend.submitted, [])
+        self.scheduler.dispatch("job", self.task.next_run.timestamp())
+        self.assertEqual(self.scheduler.backend.submitted, ["job"])
+        self.assertIn("job", self.scheduler.queued_tasks)
+
+    def test_queued_task_is_not_dispatched_twice(self):
+        self.scheduler.backend = RecordingBackend()
+        self.task.next_run = datetime.now()
+        run_at = self.task.next_run.timestamp()
+        self.scheduler.dispatch("job", run_at)
+        self.scheduler.dispatch("job", run_at)
+        self.assertEqual(self.scheduler.backend.submitted, ["job"])
+
+    def test_full_lane_defers_dispatch(self):
+        self.scheduler.backend = RecordingBackend(accept=False)
+        self.task.next_run = datetime.now()
+        run_at = self.task.next_run.timestamp()
+        before = time.time()
+        self.scheduler.dispatch("job", run_at)
+        self.assertNotIn("job", self.scheduler.queued_tasks)
+        # Re-armed with the same token so the retry is not mistaken for a superseded entry
+        deadline, _, key, token = self.scheduler.timers.heap[0]
+        self.assertEqual((key, token), ("job", run_at))
+        self.assertGreaterEqual(deadline, before + ADMISSION_RETRY_SECONDS)
+
+    def test_unmet_dependency_blocks_dispatch(self):
+        self.scheduler.backend = RecordingBackend()
+        self.scheduler.add_task("setup", "true")
+        self.scheduler.add_dependency("job", "setup")
+        self.task.next_run = datetime.now()
+        self.scheduler.dispatch("job", self.task.next_run.timestamp())
+        self.assertEqual(self.scheduler.backend.submitted, [])
+        self.assertEqual(self.task.status, TaskStatus.BLOCKED)
+        self.assertIn("job", self.scheduler.blocked_tasks)
+
+    def test_shutdown_signal_while_journal_is_locked(self):
+        # SIGINT can arrive while the main thread is inside TaskJournal._append
+        self.task.status = TaskStatus.COMPLETED
+        with self.scheduler.journal.lock:
+            with self.assertRaises(SystemExit):
+                self.scheduler.handle_shutdown(signal.SIGINT, None)
+        self.assertEqual(self.scheduler.journal.recover()["job"]["status"], TaskStatus.COMPLETED.value)
+
+class TestCoordinatorWorkers(unittest.TestCase):
+    """A coordinator in this process leasing tasks to separate worker processes"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.scheduler = TaskScheduler()
+        self.workers = []
+        self.thread = None
+
+    def tearDown(self):
+        for worker in self.workers:
+            if worker.poll() is None:
+                os.kill(worker.pid, signal.SIGCONT)
+                worker.kill()
+            worker.wait()
+        if self.thread is not None:
+            self.scheduler.stop_scheduler()
+            self.thread.join(10)
+        self.scheduler.journal.close()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def add_task(self, name: str, command: str, *dependencies: str):
+        self.scheduler.add_task(name, command)
+        for dependency in dependencies:
+            self.scheduler.add_dependency(name, dependency)
+        self.scheduler.tasks[name].next_run = datetime.now()
+
+    def start_coordinator(self, lease_seconds: float):
+        self.backend = CoordinatorBackend(self.scheduler, port=0, lease_seconds=lease_seconds)
+        self.thread = threading.Thread(target=self.scheduler.run_scheduler, args=(self.backend,),
+                                       daemon=True)
+        self.thread.start()
+        self.assertTrue(wait_for(lambda: self.backend.server is not None))
+
+    def start_worker(self, worker_id: str) -> subprocess.Popen:
+        worker = subprocess.Popen(
+            [sys.executable, SCRIPT, "worker", "--port", str(self.backend.port),
+             "--slots", "2", "--id", worker_id],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.workers.append(worker)
+        return worker
+
+    def status(self, name: str) -> TaskStatus:
+        return self.scheduler.tasks[name].status
+
+    def test_dependencies_gate_leases_across_workers(self):
+        self.add_task("first", python_command("import time; time.sleep(1); open('first.txt', 'w').close()"))
+        self.add_task("second", python_command(
+            "import os; assert os.path.exists('first.txt'); open('second.txt', 'w').close()"), "first")
+        self.start_coordinator(lease_seconds=5)
+        self.start_worker("w1")
+        self.start_worker("w2")
+
+        self.assertTrue(wait_for(lambda: self.status("second") == TaskStatus.COMPLETED))
+        self.assertEqual(self.status("first"), TaskStatus.COMPLETED)
+        self.assertTrue(Path("second.txt").exists())
+
+    def test_expired_lease_is_requeued_and_stale_run_killed(self):
+        # The Python child outlives sh if only the shell is killed, and would append a second line
+        self.add_task("slow", python_command(
+            "import time; open('runs.log', 'a').write('start\\n'); time.sleep(6); "
+            "open('runs.log', 'a').write('finish\\n')"))
+        self.start_coordinator(lease_seconds=1.5)
+        first = self.start_worker("w1")
+        self.assertTrue(wait_for(lambda: Path("runs.log").exists()))
+
+        # A stopped worker sends no heartbeats, so its lease expires and the task is re-queued
+        os.kill(first.pid, signal.SIGSTOP)
+        self.assertTrue(wait_for(lambda: self.backend.requeued == 1))
+        self.start_worker("w2")
+        self.assertTrue(wait_for(lambda: Path("runs.log").read_text().count("start") == 2))
+
+        # On resuming, w1 learns the lease is gone and kills its run before it finishes
+        os.kill(first.pid, signal.SIGCONT)
+        self.assertTrue(wait_for(lambda: self.status("slow") == TaskStatus.COMPLETED))
+        time.sleep(1)
+        self.assertEqual(Path("runs.log").read_text().splitlines(), ["start", "start", "finish"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,82 @@ from pygments.util import ClassNotFound
 import sqlite3
 from dataclasses import dataclass, asdict
 import re
+import random
+import tempfile
+import time
+import threading
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+SEARCH_PAGE_SIZE = 20
+# Prepared statements kept per pooled connection
+STATEMENT_CACHE_SIZE = 256
+# ANSI markers around matched terms in search excerpts
+MATCH_START = "\033[1;33m"
+MATCH_END = "\033[0m"
+# bm25 weights for title, description, code and identifier sub-words
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 1.0)
+
+DEFAULT_FORMATTER = "terminal"
+PRERENDER_BATCH_SIZE = 200
+
+IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+IDENTIFIER_PARTS = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+QUERY_TERM_PATTERN = re.compile(r'\w+')
+# The tokenizer drops punctuation, so "c++" would become the prefix query "c"*
+QUERY_PUNCTUATION = re.compile(r'[^\w\s]')
+
+def code_identifiers(code: str) -> str:
+    """Sub-words of camelCase and snake_case identifiers, so 'user' finds getUserName"""
+    if not code:
+        return ""
+    words = []
+    for identifier in dict.fromkeys(IDENTIFIER_PATTERN.findall(code)):
+        parts = IDENTIFIER_PARTS.findall(identifier)
+        if len(parts) > 1:
+            words.append(" ".join(part.lower() for part in parts))
+    return " ".join(words)
+
+@lru_cache(maxsize=None)
+def lexer_class(language: str) -> Optional[type]:
+    """Lexer class for a language alias or display name (e.g. 'c++'), None if unknown"""
+    try:
+        return lexers.find_lexer_class_by_name(language)
+    except ClassNotFound:
+        pass
+    for name, aliases, _, _ in lexers.get_all_lexers():
+        if name.lower() == language and aliases:
+            return lexers.find_lexer_class_by_name(aliases[0])
+    return None
+
+def render_code(code: str, language: str, formatter_name: str = DEFAULT_FORMATTER) -> str:
+    """Apply syntax highlighting; only unknown languages pay for guess_lexer"""
+    cls = lexer_class(language.lower())
+    if cls is not None:
+        lexer = cls()
+    else:
+        try:
+            lexer = lexers.guess_lexer(code)
+        except ClassNotFound:
+            lexer = lexers.TextLexer()
+    return highlight(code, lexer, formatters.get_formatter_by_name(formatter_name))
+
+def _render_batch(rows: List[tuple], formatter_name: str) -> List[tuple]:
+    """Process pool entry point: (id, updated_at, code, language) -> (id, updated_at, output)"""
+    return [(snippet_id, updated_at, render_code(code, language, formatter_name))
+            for snippet_id, updated_at, code, language in rows]
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query of quoted words; the last one may be a prefix.
+    Empty when the text contains punctuation, which the index cannot match exactly"""
+    if QUERY_PUNCTUATION.search(text):
+        return ""
+    terms = [f'"{term}"' for term in QUERY_TERM_PATTERN.findall(text)]
+    if terms:
+        # snake_case words stay one quoted phrase, so their parts must be adjacent
+        terms[-1] += "*"
+    return " ".join(terms)
 
 @dataclass
 class CodeSnippet:
@@ -30,9 +106,60 @@ class CodeSnippet:
         data['tags'] = set(data['tags'])  # Convert list back to set
         return cls(**data)
 
+@dataclass
+class SearchHit:
+    snippet: CodeSnippet
+    score: float
+    excerpt: str
+
+class ConnectionPool:
+    """One long-lived WAL-mode connection per thread, each with its own statement cache"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections: List[sqlite3.Connection] = []
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Used by the search index triggers
+            conn.create_function("code_identifiers", 1, code_identifiers, deterministic=True)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def release(self):
+        """Close the calling thread's connection, e.g. before a worker thread exits"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            return
+        del self.local.conn
+        with self.lock:
+            if conn in self.connections:
+                self.connections.remove(conn)
+        conn.close()
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
+        self.local = threading.local()
+
 class SnippetManager:
-    def __init__(self):
-        self.db_path = Path("snippets.db")
+    def __init__(self, db_path: str = "snippets.db"):
+        self.db_path = Path(db_path)
+        self.pool = ConnectionPool(self.db_path)
+        self.fts_enabled = False
+        self.prerender_thread: Optional[threading.Thread] = None
+        self.prerender_progress = {"done": 0, "total": 0, "seconds": 0.0}
         self.setup_database()
 
     def setup_database(self):
@@ -71,12 +198,108 @@ class SnippetManager:
                 PRIMARY KEY (snippet_id, tag_id)
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_snippet_tags_tag ON snippet_tags (tag_id, snippet_id)')
+
+        # Rendered highlighting, valid while updated_at matches the snippet's
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS highlights (
+                snippet_id INTEGER NOT NULL,
+                formatter TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                output TEXT NOT NULL,
+                PRIMARY KEY (snippet_id, formatter)
+            )
+        ''')
+        # updated_at only has one-second resolution, so edits drop the cached output too
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS highlights_invalidate AFTER UPDATE OF code, language ON snippets BEGIN
+                DELETE FROM highlights WHERE snippet_id = old.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS highlights_delete AFTER DELETE ON snippets BEGIN
+                DELETE FROM highlights WHERE snippet_id = old.id;
+            END
+        ''')
         
+        self.fts_enabled = self.setup_search_index(cursor)
         conn.commit()
-        conn.close()
+
+    def setup_search_index(self, cursor) -> bool:
+        """Create the FTS5 index and the triggers that keep it in sync with snippets"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'snippets_fts'")
+        row = cursor.fetchone()
+        if row is not None and "content=" not in row[0]:
+            # Earlier versions stored a second copy of every snippet inside the index
+            cursor.execute('DROP TABLE snippets_fts')
+            for trigger in ('snippets_fts_insert', 'snippets_fts_update', 'snippets_fts_delete'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            row = None
+        try:
+            # External content: the index keeps only its terms and reads text from snippets
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS snippets_fts USING fts5(
+                    title, description, code, identifiers, prefix='2 3',
+                    content='snippets_fts_content', content_rowid='id'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            print("SQLite was built without FTS5, falling back to LIKE search")
+            return False
+
+        # identifiers are derived from the code, so the content view computes them on read
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS snippets_fts_content AS
+            SELECT id, title, description, code, code_identifiers(code) AS identifiers FROM snippets
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS snippets_fts_insert AFTER INSERT ON snippets BEGIN
+                INSERT INTO snippets_fts (rowid, title, description, code, identifiers)
+                VALUES (new.id, new.title, new.description, new.code, code_identifiers(new.code));
+            END
+        ''')
+        # An external-content index is told the old values to remove, then the new ones
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS snippets_fts_update AFTER UPDATE OF title, description, code
+            ON snippets BEGIN
+                INSERT INTO snippets_fts (snippets_fts, rowid, title, description, code, identifiers)
+                VALUES ('delete', old.id, old.title, old.description, old.code, code_identifiers(old.code));
+                INSERT INTO snippets_fts (rowid, title, description, code, identifiers)
+                VALUES (new.id, new.title, new.description, new.code, code_identifiers(new.code));
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS snippets_fts_delete AFTER DELETE ON snippets BEGIN
+                INSERT INTO snippets_fts (snippets_fts, rowid, title, description, code, identifiers)
+                VALUES ('delete', old.id, old.title, old.description, old.code, code_identifiers(old.code));
+            END
+        ''')
+
+        if row is None:
+            # Index snippets stored before the search index existed
+            cursor.execute("INSERT INTO snippets_fts (snippets_fts) VALUES ('rebuild')")
+        return True
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        return self.pool.get()
+
+    def close(self):
+        self.pool.close()
+
+    def load_tags(self, cursor, snippet_ids: List[int]) -> Dict[int, Set[str]]:
+        """Tags for many snippets with a single query"""
+        tags = {snippet_id: set() for snippet_id in snippet_ids}
+        if not tags:
+            return tags
+        # The id list is bound as one JSON parameter so the statement text never changes
+        cursor.execute('''
+            SELECT st.snippet_id, t.name FROM snippet_tags st
+            JOIN tags t ON t.id = st.tag_id
+            WHERE st.snippet_id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(list(tags)),))
+        for snippet_id, name in cursor.fetchall():
+            tags[snippet_id].add(name)
+        return tags
 
     def add_snippet(self, title: str, code: str, language: str, description: str = "", tags: Set[str] = None) -> bool:
         """Add a new code snippet"""
@@ -126,48 +349,37 @@ class SnippetManager:
             print(f"Error adding snippet: {e}")
             conn.rollback()
             return False
-            
+
         finally:
-            conn.close()
+            # The pooled connection outlives this call; never leave a write transaction open
+            if conn.in_transaction:
+                conn.rollback()
 
     def get_snippet(self, snippet_id: int) -> Optional[CodeSnippet]:
         """Retrieve a snippet by ID"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        try:
-            # Get snippet
-            cursor.execute('''
-                SELECT id, title, code, language, description, created_at, updated_at
-                FROM snippets WHERE id = ?
-            ''', (snippet_id,))
-            
-            row = cursor.fetchone()
-            if not row:
-                return None
-            
-            # Get tags for snippet
-            cursor.execute('''
-                SELECT t.name FROM tags t
-                JOIN snippet_tags st ON t.id = st.tag_id
-                WHERE st.snippet_id = ?
-            ''', (snippet_id,))
-            
-            tags = {row[0] for row in cursor.fetchall()}
-            
-            return CodeSnippet(
-                id=row[0],
-                title=row[1],
-                code=row[2],
-                language=row[3],
-                description=row[4],
-                tags=tags,
-                created_at=row[5],
-                updated_at=row[6]
-            )
-            
-        finally:
-            conn.close()
+        # Get snippet
+        cursor.execute('''
+            SELECT id, title, code, language, description, created_at, updated_at
+            FROM snippets WHERE id = ?
+        ''', (snippet_id,))
+        
+        row = cursor.fetchone()
+        if not row:
+            return None
+        
+        return CodeSnippet(
+            id=row[0],
+            title=row[1],
+            code=row[2],
+            language=row[3],
+            description=row[4],
+            tags=self.load_tags(cursor, [snippet_id])[snippet_id],
+            created_at=row[5],
+            updated_at=row[6]
+        )
 
     def update_snippet(self, snippet_id: int, title: str = None, code: str = None,
                       language: str = None, description: str = None, tags: Set[str] = None) -> bool:
@@ -225,9 +437,11 @@ class SnippetManager:
             print(f"Error updating snippet: {e}")
             conn.rollback()
             return False
-            
+
         finally:
-            conn.close()
+            # The pooled connection outlives this call; never leave a write transaction open
+            if conn.in_transaction:
+                conn.rollback()
 
     def delete_snippet(self, snippet_id: int) -> bool:
         """Delete a snippet"""
@@ -253,98 +467,361 @@ class SnippetManager:
             print(f"Error deleting snippet: {e}")
             conn.rollback()
             return False
-            
+
         finally:
-            conn.close()
+            # The pooled connection outlives this call; never leave a write transaction open
+            if conn.in_transaction:
+                conn.rollback()
+
+    def search_snippets(self, query: str = "", tags: Set[str] = None,
+                        page: int = 1, page_size: int = SEARCH_PAGE_SIZE) -> List[SearchHit]:
+        """Search snippets by text and/or tags, best matches first"""
+        match = fts_query(query) if self.fts_enabled else ""
+        if query and not match:
+            # Operators and other punctuation are not indexed, scan for them instead
+            return self.search_snippets_like(query, tags, page, page_size)
 
-    def search_snippets(self, query: str = "", tags: Set[str] = None) -> List[CodeSnippet]:
-        """Search snippets by text and/or tags"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        try:
+        conditions = []
+        params = []
+
+        if match:
+            base_query = f'''
+                SELECT s.id, bm25(snippets_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) AS score
+                FROM snippets_fts
+                JOIN snippets s ON s.id = snippets_fts.rowid
+            '''
+            conditions.append('snippets_fts MATCH ?')
+            params.append(match)
+            order = 'score'
+        else:
             base_query = '''
-                SELECT DISTINCT s.id, s.title, s.code, s.language, s.description, 
-                       s.created_at, s.updated_at
+                SELECT s.id, s.title, s.code, s.language, s.description,
+                       s.created_at, s.updated_at, 0.0, ''
                 FROM snippets s
             '''
-            
-            conditions = []
-            params = []
-            
-            if query:
-                conditions.append('''
-                    (s.title LIKE ? OR s.code LIKE ? OR s.description LIKE ?)
-                ''')
-                query = f"%{query}%"
-                params.extend([query, query, query])
-            
-            if tags:
-                base_query += '''
-                    JOIN snippet_tags st ON s.id = st.snippet_id
-                    JOIN tags t ON st.tag_id = t.id
-                '''
-                placeholders = ','.join('?' * len(tags))
-                conditions.append(f't.name IN ({placeholders})')
-                params.extend(tags)
-            
-            if conditions:
-                base_query += ' WHERE ' + ' AND '.join(conditions)
-            
-            cursor.execute(base_query, params)
-            rows = cursor.fetchall()
-            
-            snippets = []
-            for row in rows:
-                # Get tags for each snippet
-                cursor.execute('''
-                    SELECT t.name FROM tags t
-                    JOIN snippet_tags st ON t.id = st.tag_id
-                    WHERE st.snippet_id = ?
-                ''', (row[0],))
-                
-                tags = {tag[0] for tag in cursor.fetchall()}
-                
-                snippet = CodeSnippet(
-                    id=row[0],
-                    title=row[1],
-                    code=row[2],
-                    language=row[3],
-                    description=row[4],
-                    tags=tags,
-                    created_at=row[5],
-                    updated_at=row[6]
-                )
-                snippets.append(snippet)
-            
-            return snippets
-            
-        finally:
-            conn.close()
+            order = 's.updated_at DESC, s.id DESC'
+
+        if tags:
+            placeholders = ','.join('?' * len(tags))
+            conditions.append(f'''
+                s.id IN (SELECT st.snippet_id FROM snippet_tags st
+                         JOIN tags t ON st.tag_id = t.id
+                         WHERE t.name IN ({placeholders}))
+            ''')
+            params.extend(tags)
+
+        if conditions:
+            base_query += ' WHERE ' + ' AND '.join(conditions)
+        base_query += f' ORDER BY {order} LIMIT ? OFFSET ?'
+        params.extend([page_size, (page - 1) * page_size])
+
+        if match:
+            # snippet() reads the text back through the content view, so only build it for
+            # the page; ranking alone needs nothing but the index
+            base_query = f'''
+                SELECT s.id, s.title, s.code, s.language, s.description,
+                       s.created_at, s.updated_at, page.score,
+                       snippet(snippets_fts, -1, ?, ?, '...', 16)
+                FROM ({base_query}) AS page
+                JOIN snippets_fts ON snippets_fts.rowid = page.id
+                JOIN snippets s ON s.id = page.id
+                WHERE snippets_fts MATCH ?
+                ORDER BY page.score
+            '''
+            params = [MATCH_START, MATCH_END] + params + [match]
+
+        cursor.execute(base_query, params)
+        return self._hits_from_rows(cursor, cursor.fetchall())
+
+    def search_snippets_like(self, query: str = "", tags: Set[str] = None,
+                             page: int = 1, page_size: int = SEARCH_PAGE_SIZE) -> List[SearchHit]:
+        """Substring search that scans every snippet; used when the index cannot help"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        base_query = '''
+            SELECT DISTINCT s.id, s.title, s.code, s.language, s.description, 
+                   s.created_at, s.updated_at, 0.0, ''
+            FROM snippets s
+        '''
+        
+        conditions = []
+        params = []
+        
+        if query:
+            conditions.append('''
+                (s.title LIKE ? OR s.code LIKE ? OR s.description LIKE ?)
+            ''')
+            query = f"%{query}%"
+            params.extend([query, query, query])
+        
+        if tags:
+            base_query += '''
+                JOIN snippet_tags st ON s.id = st.snippet_id
+                JOIN tags t ON st.tag_id = t.id
+            '''
+            placeholders = ','.join('?' * len(tags))
+            conditions.append(f't.name IN ({placeholders})')
+            params.extend(tags)
+        
+        if conditions:
+            base_query += ' WHERE ' + ' AND '.join(conditions)
+        base_query += ' ORDER BY s.updated_at DESC, s.id DESC LIMIT ? OFFSET ?'
+        params.extend([page_size, (page - 1) * page_size])
+        
+        cursor.execute(base_query, params)
+        return self._hits_from_rows(cursor, cursor.fetchall())
+
+    def _hits_from_rows(self, cursor, rows) -> List[SearchHit]:
+        hits = []
+        tags = self.load_tags(cursor, [row[0] for row in rows])
+        for row in rows:
+            snippet = CodeSnippet(
+                id=row[0],
+                title=row[1],
+                code=row[2],
+                language=row[3],
+                description=row[4],
+                tags=tags[row[0]],
+                created_at=row[5],
+                updated_at=row[6]
+            )
+            hits.append(SearchHit(snippet, row[7], row[8]))
+        
+        return hits
 
     def get_all_tags(self) -> List[str]:
         """Get all existing tags"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        cursor.execute('SELECT name FROM tags ORDER BY name')
+        return [row[0] for row in cursor.fetchall()]
+
+    def highlight_code(self, code: str, language: str, formatter_name: str = DEFAULT_FORMATTER) -> str:
+        """Apply syntax highlighting to code"""
+        return render_code(code, language, formatter_name)
+
+    def render_snippet(self, snippet: CodeSnippet, formatter_name: str = DEFAULT_FORMATTER) -> str:
+        """Highlighted code from the cache, rendered and stored on a miss"""
+        conn = self.get_connection()
+        row = conn.execute(
+            'SELECT output FROM highlights WHERE snippet_id = ? AND formatter = ? AND updated_at = ?',
+            (snippet.id, formatter_name, snippet.updated_at)).fetchone()
+        if row:
+            return row[0]
+
+        output = self.highlight_code(snippet.code, snippet.language, formatter_name)
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO highlights (snippet_id, formatter, updated_at, output) '
+                         'VALUES (?, ?, ?, ?)', (snippet.id, formatter_name, snippet.updated_at, output))
+        return output
+
+    def prerender_highlights(self, formatter_name: str = DEFAULT_FORMATTER, workers: Optional[int] = None,
+                             batch_size: int = PRERENDER_BATCH_SIZE) -> Dict:
+        """Render every snippet without a current cache entry on a process pool"""
+        conn = self.get_connection()
+        stale = [row[0] for row in conn.execute('''
+            SELECT s.id FROM snippets s
+            LEFT JOIN highlights h ON h.snippet_id = s.id AND h.formatter = ?
+            WHERE h.updated_at IS NULL OR h.updated_at != s.updated_at
+        ''', (formatter_name,))]
+        progress = {"done": 0, "total": len(stale), "seconds": 0.0}
+        self.prerender_progress = progress
+        start = time.perf_counter()
+        workers = workers or os.cpu_count() or 1
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            for offset in range(0, len(stale), batch_size):
+                rows = conn.execute(
+                    'SELECT id, updated_at, code, language FROM snippets '
+                    'WHERE id IN (SELECT value FROM json_each(?))',
+                    (json.dumps(stale[offset:offset + batch_size]),)).fetchall()
+                pending.append(executor.submit(_render_batch, rows, formatter_name))
+                # Keep a few batches in flight so code bodies are not all held in memory
+                while len(pending) > workers * 2:
+                    self._store_rendered(conn, pending.pop(0).result(), formatter_name, progress)
+            for future in pending:
+                self._store_rendered(conn, future.result(), formatter_name, progress)
+
+        progress["seconds"] = time.perf_counter() - start
+        return progress
+
+    def _store_rendered(self, conn, rendered: List[tuple], formatter_name: str, progress: Dict):
+        with conn:
+            # Skip snippets edited while their batch was rendering
+            conn.executemany('''
+                INSERT OR REPLACE INTO highlights (snippet_id, formatter, updated_at, output)
+                SELECT id, ?, updated_at, ? FROM snippets WHERE id = ? AND updated_at = ?
+            ''', [(formatter_name, output, snippet_id, updated_at) for snippet_id, updated_at, output in rendered])
+        progress["done"] += len(rendered)
+
+    def start_prerender(self, formatter_name: str = DEFAULT_FORMATTER) -> bool:
+        """Run prerender_highlights in a background thread; False if one is already running"""
+        if self.prerender_thread and self.prerender_thread.is_alive():
+            return False
+        self.prerender_progress = {"done": 0, "total": 0, "seconds": 0.0}
+        self.prerender_thread = threading.Thread(target=self._run_prerender, args=(formatter_name,),
+                                                 daemon=True)
+        self.prerender_thread.start()
+        return True
+
+    def _run_prerender(self, formatter_name: str):
         try:
-            cursor.execute('SELECT name FROM tags ORDER BY name')
-            return [row[0] for row in cursor.fetchall()]
+            self.prerender_highlights(formatter_name)
+        except Exception as e:
+            # Nobody joins this thread; leave the error where the menu can report it
+            self.prerender_progress["error"] = str(e)
         finally:
+            self.pool.release()
+
+# Ordered roughly by how common they are in real code; sampled with Zipf weights
+BENCHMARK_WORDS = """
+get set value data result name list item index count user file path error config
+request response key type id node buffer size string table query handler session
+parse read write load save update delete create find check init close open start
+stop run send receive cache token stream queue event message client server socket
+timeout retry lock thread worker task job batch filter map reduce sort merge split
+format encode decode hash sign verify auth password email address port host url
+header body cookie status code line column row record field schema model view
+render template image pixel color font width height offset length limit page
+cursor transaction commit rollback migrate backup restore archive compress
+extract upload download resize crop rotate scale normalize tokenize stem vector
+matrix tensor gradient optimizer scheduler epoch metric accuracy precision recall
+""".split()
+BENCHMARK_LANGUAGES = ["python", "javascript", "go", "rust", "java"]
+BENCHMARK_TAGS = ["util", "network", "io", "parsing", "db", "async", "cli", "test"]
+
+BENCHMARK_WEIGHTS = [1.0 / rank for rank in range(1, len(BENCHMARK_WORDS) + 1)]
+
+def random_identifier(rng: random.Random) -> str:
+    words = rng.choices(BENCHMARK_WORDS, BENCHMARK_WEIGHTS, k=rng.randint(1, 3))
+    if rng.random() < 0.5:
+        return words[0] + "".join(word.capitalize() for word in words[1:])
+    return "_".join(words)
+
+def seed_snippets(manager: SnippetManager, count: int, seed: int = 0):
+    """Bulk-insert synthetic snippets with tags for benchmarks"""
+    rng = random.Random(seed)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = manager.get_connection()
+    cursor = conn.cursor()
+    cursor.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)', [(tag,) for tag in BENCHMARK_TAGS])
+    cursor.execute('SELECT name, id FROM tags')
+    tag_ids = dict(cursor.fetchall())
+    for _ in range(count):
+        lines = [f"{random_identifier(rng)} = {random_identifier(rng)}({random_identifier(rng)}, {rng.randint(0, 999)})"
+                 for _ in range(rng.randint(5, 30))]
+        cursor.execute('''
+            INSERT INTO snippets (title, code, language, description, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (random_identifier(rng).replace("_", " "), "\n".join(lines), rng.choice(BENCHMARK_LANGUAGES),
+              " ".join(rng.choices(BENCHMARK_WORDS, BENCHMARK_WEIGHTS, k=6)), now, now))
+        snippet_id = cursor.lastrowid
+        cursor.executemany('INSERT INTO snippet_tags (snippet_id, tag_id) VALUES (?, ?)',
+                           [(snippet_id, tag_ids[tag]) for tag in rng.sample(BENCHMARK_TAGS, 2)])
+    conn.commit()
+
+def benchmark_search(snippet_count: int = 20000,
+                     queries=("value", "socketTimeout", "retry_count", "parse config", "gradientOptimizer"),
+                     repeats: int = 5) -> List[Dict]:
+    """Median latency of the first result page through the FTS5 index and through LIKE scans"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SnippetManager(str(Path(tmp) / "benchmark.db"))
+        seed_snippets(manager, snippet_count)
+
+        def median_ms(search, query):
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                search(query)
+                times.append((time.perf_counter() - start) * 1000)
+            return sorted(times)[len(times) // 2]
+
+        for query in queries:
+            fts_ms = median_ms(manager.search_snippets, query)
+            like_ms = median_ms(manager.search_snippets_like, query)
+            conn = manager.get_connection()
+            matches = conn.execute('SELECT count(*) FROM snippets_fts WHERE snippets_fts MATCH ?',
+                                   (fts_query(query),)).fetchone()[0]
+            results.append({
+                "query": query,
+                "snippets": snippet_count,
+                "matches": matches,
+                "fts_ms": fts_ms,
+                "like_ms": like_ms,
+                "speedup": like_ms / fts_ms if fts_ms else 0.0
+            })
+        manager.close()
+    return results
+
+def benchmark_database_access(snippet_count: int = 5000, lookups: int = 1000, repeats: int = 5) -> Dict:
+    """Median search and lookup latency with a connection per call and per-row tag queries versus the pool"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SnippetManager(str(Path(tmp) / "benchmark.db"))
+        seed_snippets(manager, snippet_count)
+        rng = random.Random(1)
+        ids = [rng.randint(1, snippet_count) for _ in range(lookups)]
+        columns = 'id, title, code, language, description, created_at, updated_at'
+        tag_query = '''
+            SELECT t.name FROM tags t
+            JOIN snippet_tags st ON t.id = st.tag_id
+            WHERE st.snippet_id = ?
+        '''
+
+        def per_call_search():
+            conn = sqlite3.connect(manager.db_path)
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT {columns} FROM snippets ORDER BY updated_at DESC, id DESC LIMIT ?',
+                           (snippet_count,))
+            for row in cursor.fetchall():
+                cursor.execute(tag_query, (row[0],))
+                CodeSnippet(*row[:5], {tag[0] for tag in cursor.fetchall()}, row[5], row[6])
             conn.close()
 
-    def highlight_code(self, code: str, language: str) -> str:
-        """Apply syntax highlighting to code"""
-        try:
-            lexer = lexers.get_lexer_by_name(language.lower())
-        except ClassNotFound:
-            try:
-                lexer = lexers.guess_lexer(code)
-            except ClassNotFound:
-                lexer = lexers.get_lexer_by_name('text')
-        
-        formatter = formatters.TerminalFormatter()
-        return highlight(code, lexer, formatter)
+        def per_call_lookup(snippet_id):
+            conn = sqlite3.connect(manager.db_path)
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT {columns} FROM snippets WHERE id = ?', (snippet_id,))
+            row = cursor.fetchone()
+            cursor.execute(tag_query, (snippet_id,))
+            CodeSnippet(*row[:5], {tag[0] for tag in cursor.fetchall()}, row[5], row[6])
+            conn.close()
+
+        def per_row_tags(snippet_ids):
+            cursor = manager.get_connection().cursor()
+            for snippet_id in snippet_ids:
+                cursor.execute(tag_query, (snippet_id,))
+                cursor.fetchall()
+
+        all_ids = list(range(1, snippet_count + 1))
+        cases = {
+            "search_per_call_ms": per_call_search,
+            "search_pooled_ms": lambda: manager.search_snippets("", None, 1, snippet_count),
+            # Tag loading on its own, which is the part batching changes
+            "tags_per_row_ms": lambda: per_row_tags(all_ids),
+            "tags_batched_ms": lambda: manager.load_tags(manager.get_connection().cursor(), all_ids),
+            "lookup_per_call_ms": lambda: [per_call_lookup(i) for i in ids],
+            "lookup_pooled_ms": lambda: [manager.get_snippet(i) for i in ids],
+        }
+        # Interleave the cases so drift affects each one equally, then take medians
+        times = {name: [] for name in cases}
+        for _ in range(repeats):
+            for name, fn in cases.items():
+                start = time.perf_counter()
+                fn()
+                times[name].append((time.perf_counter() - start) * 1000)
+        result = {name: sorted(values)[len(values) // 2] for name, values in times.items()}
+        result["lookup_per_call_us"] = result.pop("lookup_per_call_ms") * 1000 / lookups
+        result["lookup_pooled_us"] = result.pop("lookup_pooled_ms") * 1000 / lookups
+        result["snippets"] = snippet_count
+        manager.close()
+    return result
 
 def main():
     manager = SnippetManager()
@@ -357,9 +834,12 @@ def main():
         print("4. Delete Snippet")
         print("5. Search Snippets")
         print("6. List All Tags")
-        print("7. Exit")
+        print("7. Benchmark Search")
+        print("8. Benchmark Database Access")
+        print("9. Pre-render Highlighting")
+        print("10. Exit")
         
-        choice = input("\nEnter your choice (1-7): ")
+        choice = input("\nEnter your choice (1-10): ")
         
         if choice == "1":
             title = input("Enter snippet title: ")
@@ -392,7 +872,7 @@ def main():
                 print(f"Created: {snippet.created_at}")
                 print(f"Updated: {snippet.updated_at}")
                 print("\nCode:")
-                print(manager.highlight_code(snippet.code, snippet.language))
+                print(manager.render_snippet(snippet))
             else:
                 print("Snippet not found!")
         
@@ -440,17 +920,25 @@ def main():
             tags_input = input("Enter tags to filter by (comma-separated, optional): ")
             tags = {tag.strip() for tag in tags_input.split(",")} if tags_input else None
             
-            snippets = manager.search_snippets(query, tags)
-            if snippets:
-                print(f"\nFound {len(snippets)} snippets:")
-                for snippet in snippets:
+            page = 1
+            while True:
+                hits = manager.search_snippets(query, tags, page)
+                if not hits:
+                    print("No snippets found!" if page == 1 else "No more results.")
+                    break
+                print(f"\nPage {page}:")
+                for hit in hits:
+                    snippet = hit.snippet
                     print(f"\nID: {snippet.id}")
                     print(f"Title: {snippet.title}")
                     print(f"Language: {snippet.language}")
                     print(f"Tags: {', '.join(snippet.tags)}")
+                    if hit.excerpt:
+                        print(f"Match: {' '.join(hit.excerpt.split())}")
                     print("-" * 30)
-            else:
-                print("No snippets found!")
+                if len(hits) < SEARCH_PAGE_SIZE or input("Next page? (y/n): ").lower() != 'y':
+                    break
+                page += 1
         
         elif choice == "6":
             tags = manager.get_all_tags()
@@ -462,7 +950,38 @@ def main():
                 print("No tags found!")
         
         elif choice == "7":
+            count = int(input("Number of snippets to seed (default 20000): ") or "20000")
+            print(f"\n{'Query':<18} {'Matches':>8} {'FTS5 (ms)':>10} {'LIKE (ms)':>10} {'Speedup':>8}")
+            for row in benchmark_search(count):
+                print(f"{row['query']:<18} {row['matches']:>8} {row['fts_ms']:>10.2f} "
+                      f"{row['like_ms']:>10.2f} {row['speedup']:>7.1f}x")
+
+        elif choice == "8":
+            count = int(input("Number of snippets to seed (default 5000): ") or "5000")
+            result = benchmark_database_access(count)
+            print(f"\nSearch returning all {result['snippets']} snippets: "
+                  f"{result['search_per_call_ms']:.1f} ms per-call, {result['search_pooled_ms']:.1f} ms pooled")
+            print(f"  of which tag loading: {result['tags_per_row_ms']:.1f} ms per-row, "
+                  f"{result['tags_batched_ms']:.1f} ms batched")
+            print(f"Snippet lookup: {result['lookup_per_call_us']:.1f} us per-call, "
+                  f"{result['lookup_pooled_us']:.1f} us pooled")
+
+        elif choice == "9":
+            last = manager.prerender_progress
+            if manager.prerender_thread and not manager.prerender_thread.is_alive():
+                if "error" in last:
+                    print(f"Last run failed after {last['done']}/{last['total']} snippets: {last['error']}")
+                else:
+                    print(f"Last run rendered {last['done']} snippets in {last['seconds']:.1f}s")
+            if manager.start_prerender():
+                print("Pre-rendering highlighting in the background...")
+            else:
+                progress = manager.prerender_progress
+                print(f"Pre-render running: {progress['done']}/{progress['total']} snippets")
+
+        elif choice == "10":
             print("Thank you for using Code Snippet Manager!")
+            manager.close()
             break
         
         else:
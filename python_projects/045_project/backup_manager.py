@@ -11,11 +11,308 @@ import time
 import threading
 from queue import Queue
 import zipfile
+import zlib
+import sqlite3
+import random
+import tempfile
+import io
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 class BackupType:
     FULL = "full"
     INCREMENTAL = "incremental"
     DIFFERENTIAL = "differential"
+    DEDUP = "dedup"
+
+# Content-defined chunking parameters (FastCDC-style gear hash)
+CHUNK_MIN_SIZE = 16 * 1024
+CHUNK_AVG_BITS = 16  # ~64 KB average chunk
+CHUNK_MAX_SIZE = 256 * 1024
+CHUNK_READ_SIZE = 1024 * 1024
+_GEAR_TABLE = np.array([random.Random(0x5EED + i).getrandbits(64) for i in range(256)], dtype=np.uint64)
+
+def _gear_candidates(buf, avg_bits: int) -> np.ndarray:
+    """Offsets in buf where the gear hash of the 64 bytes ending there has its top bits clear"""
+    # h[i] = sum(gear[buf[i - k]] << k for k < 64), built by doubling the window
+    # so the whole buffer is hashed with a handful of vector operations
+    h = _GEAR_TABLE[np.frombuffer(buf, dtype=np.uint8)]
+    span = 1
+    while span < 64:
+        h[span:] += h[:-span] << np.uint64(span)
+        span *= 2
+    mask = np.uint64(((1 << avg_bits) - 1) << (64 - avg_bits))
+    return np.flatnonzero((h & mask) == 0)
+
+def _find_chunk_boundary(candidates: np.ndarray, start: int, end: int, min_size: int,
+                         max_size: int) -> int:
+    """Return the end offset of the chunk that begins at start"""
+    limit = min(end, start + max_size)
+    if limit - start <= min_size:
+        return limit
+    k = np.searchsorted(candidates, start + min_size)
+    if k < len(candidates) and candidates[k] < limit:
+        return int(candidates[k]) + 1
+    return limit
+
+def chunk_stream(f, min_size: int = CHUNK_MIN_SIZE, avg_bits: int = CHUNK_AVG_BITS,
+                 max_size: int = CHUNK_MAX_SIZE):
+    """Split a binary stream into content-defined chunks"""
+    buf = bytearray()
+    eof = False
+    while not eof:
+        data = f.read(CHUNK_READ_SIZE)
+        if data:
+            buf += data
+        else:
+            eof = True
+        if len(buf) < max_size and not (eof and buf):
+            continue
+        candidates = _gear_candidates(buf, avg_bits)
+        start = 0
+        while len(buf) - start >= max_size or (eof and start < len(buf)):
+            cut = _find_chunk_boundary(candidates, start, len(buf), min_size, max_size)
+            yield bytes(buf[start:cut])
+            start = cut
+        del buf[:start]
+
+# Compressed members up to this size are passed back from workers in memory
+SPOOL_MEMORY_LIMIT = 4 * 1024 * 1024
+COMPRESS_LEVEL = 6
+
+def _hash_file_worker(file_path: str) -> str:
+    """Calculate SHA-256 of a file in a pool worker"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _deflate_file_worker(file_path: str, spool_dir: str) -> dict:
+    """Hash and raw-deflate a file in a pool worker, spooling large output to disk"""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+    hasher = hashlib.sha256()
+    crc = 0
+    file_size = 0
+    out = io.BytesIO()
+    spool = None
+
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                out.write(compressor.compress(chunk))
+                if spool is None and out.tell() > SPOOL_MEMORY_LIMIT:
+                    spool = tempfile.NamedTemporaryFile(dir=spool_dir, suffix='.spool', delete=False)
+                    spool.write(out.getvalue())
+                    out = spool
+            out.write(compressor.flush())
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    result = {"sha256": hasher.hexdigest(), "crc": crc, "file_size": file_size,
+              "compress_size": out.tell(), "data": None, "spool": None}
+    if spool is None:
+        result["data"] = out.getvalue()
+    else:
+        spool.close()
+        result["spool"] = spool.name
+    return result
+
+class IOBudget:
+    """Counting budget of worker slots shared by concurrently running jobs"""
+
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self.available = self.slots
+        self.condition = threading.Condition()
+
+    def acquire(self, count: int) -> int:
+        count = min(max(1, count), self.slots)
+        with self.condition:
+            self.condition.wait_for(lambda: self.available >= count)
+            self.available -= count
+        return count
+
+    def release(self, count: int):
+        with self.condition:
+            self.available += count
+            self.condition.notify_all()
+
+class ChunkStore:
+    """Content-addressed block store: each chunk is stored once under its SHA-256"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self._chunk_path(digest).exists()
+
+    def put(self, data: bytes, compress: bool = True):
+        """Store a chunk if it is new; returns (digest, bytes_written)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if path.exists():
+            return digest, 0
+
+        payload = b'R' + data
+        if compress:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                payload = b'Z' + packed
+
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return digest, len(payload)
+
+    def get(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), 'rb') as f:
+            payload = f.read()
+        data = zlib.decompress(payload[1:]) if payload[:1] == b'Z' else payload[1:]
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest} is corrupt")
+        return data
+
+class TrackedHashes(dict):
+    """Dict of backed-up file hashes that remembers which entries changed"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.dirty: Set[str] = set()
+
+    def __setitem__(self, key: str, value: str):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+
+class BackupCatalog:
+    """SQLite catalog holding per-file state for all jobs"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_index (
+                    job TEXT NOT NULL,
+                    rel_path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    PRIMARY KEY (job, rel_path)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    job TEXT NOT NULL,
+                    rel_path TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    PRIMARY KEY (job, rel_path)
+                ) WITHOUT ROWID
+            """)
+
+    def load_index(self, job_name: str) -> Dict[str, list]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT rel_path, size, mtime_ns, inode, hash FROM file_index WHERE job = ?",
+                (job_name,))
+            return {row[0]: list(row[1:]) for row in rows}
+
+    def load_hashes(self, job_name: str) -> TrackedHashes:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT rel_path, hash FROM file_hashes WHERE job = ?", (job_name,))
+            return TrackedHashes(rows.fetchall())
+
+    def commit(self, job_name: str, index_rows: List[tuple], deleted: Set[str],
+               hashes: Dict[str, str]):
+        """Apply one run's changes in a single transaction"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO file_index VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_name, *row) for row in index_rows])
+            self.conn.executemany(
+                "DELETE FROM file_index WHERE job = ? AND rel_path = ?",
+                [(job_name, rel_path) for rel_path in deleted])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?)",
+                [(job_name, rel_path, file_hash) for rel_path, file_hash in hashes.items()])
+
+    def delete_job(self, job_name: str):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM file_index WHERE job = ?", (job_name,))
+            self.conn.execute("DELETE FROM file_hashes WHERE job = ?", (job_name,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class FileIndex:
+    """Stat index (size, mtime_ns, inode, hash) used to skip re-hashing unchanged files"""
+
+    def __init__(self, catalog: BackupCatalog, job_name: str):
+        self.catalog = catalog
+        self.job_name = job_name
+        self.entries = catalog.load_index(job_name)
+        self.dirty: Set[str] = set()
+        self.deleted: Set[str] = set()
+        self.hashed = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _stat_key(st: os.stat_result) -> list:
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+    def lookup(self, rel_path: str, st: os.stat_result) -> Optional[str]:
+        """Return the cached hash if the file's stat tuple is unchanged"""
+        entry = self.entries.get(rel_path)
+        if entry and entry[:3] == self._stat_key(st):
+            return entry[3]
+        return None
+
+    def update(self, rel_path: str, st: os.stat_result, file_hash: str):
+        entry = self._stat_key(st) + [file_hash]
+        if self.entries.get(rel_path) != entry:
+            self.entries[rel_path] = entry
+            self.dirty.add(rel_path)
+
+    def prune(self, seen: Set[str]):
+        """Drop entries for files that no longer exist in the source"""
+        for rel_path in set(self.entries) - seen:
+            del self.entries[rel_path]
+            self.dirty.discard(rel_path)
+            self.deleted.add(rel_path)
+
+    def save(self, hashes: Optional[Dict[str, str]] = None):
+        """Write changed index rows and backed-up hashes to the catalog"""
+        if isinstance(hashes, TrackedHashes):
+            changed = {rel_path: hashes[rel_path] for rel_path in hashes.dirty}
+            hashes.dirty.clear()
+        else:
+            changed = hashes or {}
+        self.catalog.commit(
+            self.job_name,
+            [(rel_path, *self.entries[rel_path]) for rel_path in self.dirty],
+            self.deleted,
+            changed)
+        self.dirty.clear()
+        self.deleted.clear()
 
 class BackupJob:
     def __init__(self, source: str, destination: str, name: str, backup_type: str = BackupType.FULL):
@@ -27,7 +324,11 @@ class BackupJob:
         self.compress = True
         self.exclude_patterns: List[str] = []
         self.last_backup: Optional[str] = None
+        # Loaded from the catalog while a backup runs
         self.file_hashes: Dict[str, str] = {}
+        self.paranoid = False
+        self.last_scan: Dict[str, int] = {}
+        self.workers = 1
 
     def to_dict(self) -> dict:
         return {
@@ -39,7 +340,9 @@ class BackupJob:
             "compress": self.compress,
             "exclude_patterns": self.exclude_patterns,
             "last_backup": self.last_backup,
-            "file_hashes": self.file_hashes
+            "paranoid": self.paranoid,
+            "last_scan": self.last_scan,
+            "workers": self.workers
         }
 
     @classmethod
@@ -49,20 +352,32 @@ class BackupJob:
         job.compress = data["compress"]
         job.exclude_patterns = data["exclude_patterns"]
         job.last_backup = data["last_backup"]
-        job.file_hashes = data["file_hashes"]
+        job.paranoid = data.get("paranoid", False)
+        job.last_scan = data.get("last_scan", {})
+        job.workers = data.get("workers", 1)
         return job
 
 class BackupManager:
-    def __init__(self):
+    def __init__(self, max_concurrent_jobs: int = 2, io_budget: Optional[int] = None):
         self.jobs: Dict[str, BackupJob] = {}
         self.config_file = Path("backup_config.json")
+        self.catalog_file = Path("backup_catalog.db")
         self.log_file = Path("backup.log")
+        self.config_lock = threading.Lock()
         self.setup_logging()
+        self.catalog = BackupCatalog(self.catalog_file)
         self.load_config()
         self.running = True
         self.backup_queue = Queue()
-        self.worker_thread = threading.Thread(target=self._process_backup_queue)
-        self.worker_thread.start()
+        self.running_jobs: Set[str] = set()
+        self.running_lock = threading.Lock()
+        self.io_budget = IOBudget(io_budget or os.cpu_count() or 1)
+        self.worker_threads = [
+            threading.Thread(target=self._process_backup_queue)
+            for _ in range(max(1, max_concurrent_jobs))
+        ]
+        for thread in self.worker_threads:
+            thread.start()
 
     def setup_logging(self):
         logging.basicConfig(
@@ -83,12 +398,39 @@ class BackupManager:
                     }
             except json.JSONDecodeError:
                 logging.error("Error loading config file")
+                return
+
+            if self._migrate_to_catalog(data):
+                self.save_config()
+
+    def _migrate_to_catalog(self, data: dict) -> bool:
+        """Move per-file state from older JSON configs and index files into the catalog"""
+        migrated = False
+        for name, job_data in data.items():
+            index_file = self.config_file.parent / f"{name}_file_index.json"
+            if "file_hashes" not in job_data and not index_file.exists():
+                continue
+
+            index_rows = []
+            if index_file.exists():
+                try:
+                    with open(index_file, 'r') as f:
+                        index_rows = [(rel_path, *entry) for rel_path, entry in json.load(f).items()]
+                except json.JSONDecodeError:
+                    logging.error(f"Error loading file index {index_file}, skipping")
+
+            self.catalog.commit(name, index_rows, set(), job_data.get("file_hashes", {}))
+            index_file.unlink(missing_ok=True)
+            migrated = True
+            logging.info(f"Migrated file catalog for job {name}")
+        return migrated
 
     def save_config(self):
         """Save backup configuration to file"""
-        data = {name: job.to_dict() for name, job in self.jobs.items()}
-        with open(self.config_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        with self.config_lock:
+            data = {name: job.to_dict() for name, job in self.jobs.items()}
+            with open(self.config_file, 'w') as f:
+                json.dump(data, f, indent=4)
 
     def add_job(self, source: str, destination: str, name: str,
                 backup_type: str = BackupType.FULL) -> bool:
@@ -114,6 +456,7 @@ class BackupManager:
             return False
 
         del self.jobs[name]
+        self.catalog.delete_job(name)
         self.save_config()
         logging.info(f"Removed backup job: {name}")
         return True
@@ -126,13 +469,125 @@ class BackupManager:
                 hasher.update(chunk)
         return hasher.hexdigest()
 
+    def _get_file_hash(self, job: BackupJob, index: FileIndex,
+                       file_path: Path, rel_path: str) -> str:
+        """Return the file hash, re-hashing only when its stat tuple changed"""
+        st = file_path.stat()
+        if not job.paranoid:
+            cached = index.lookup(rel_path, st)
+            if cached is not None:
+                index.skipped += 1
+                return cached
+
+        file_hash = self._calculate_file_hash(file_path)
+        index.update(rel_path, st, file_hash)
+        index.hashed += 1
+        return file_hash
+
+    def _scan_hashes(self, job: BackupJob, index: FileIndex,
+                     pool: Optional[ProcessPoolExecutor] = None) -> list:
+        """Walk the source and return (file_path, rel_path, hash) for every file"""
+        files = []
+        for root, _, filenames in os.walk(job.source):
+            for file in filenames:
+                file_path = Path(root) / file
+                if self._should_backup_file(str(file_path), job):
+                    files.append((file_path, str(file_path.relative_to(job.source))))
+
+        if pool is None:
+            return [(file_path, rel_path, self._get_file_hash(job, index, file_path, rel_path))
+                    for file_path, rel_path in files]
+
+        hashes = {}
+        misses = []
+        for file_path, rel_path in files:
+            st = file_path.stat()
+            cached = None if job.paranoid else index.lookup(rel_path, st)
+            if cached is not None:
+                hashes[rel_path] = cached
+                index.skipped += 1
+            else:
+                misses.append((file_path, rel_path, st))
+
+        computed = pool.map(_hash_file_worker, [str(m[0]) for m in misses], chunksize=16)
+        for (file_path, rel_path, st), file_hash in zip(misses, computed):
+            index.update(rel_path, st, file_hash)
+            index.hashed += 1
+            hashes[rel_path] = file_hash
+
+        return [(file_path, rel_path, hashes[rel_path]) for file_path, rel_path in files]
+
+    def _write_zip(self, job: BackupJob, files: list, zip_path: Path,
+                   pool: Optional[ProcessPoolExecutor] = None, slots: int = 1) -> Dict[str, str]:
+        """Write (file_path, rel_path) pairs to a zip, compressing members in the pool if given"""
+        hashes = {}
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            if pool is None:
+                for file_path, rel_path in files:
+                    zipf.write(file_path, rel_path)
+                return hashes
+
+            # Keep a bounded number of members in flight per pool slot; write them in order
+            pending = deque()
+            try:
+                for file_path, rel_path in files:
+                    pending.append((file_path, rel_path,
+                                    pool.submit(_deflate_file_worker, str(file_path),
+                                                str(job.destination))))
+                    if len(pending) >= slots * 2:
+                        hashes.update(self._write_precompressed(zipf, *pending[0]))
+                        pending.popleft()
+                while pending:
+                    hashes.update(self._write_precompressed(zipf, *pending[0]))
+                    pending.popleft()
+            finally:
+                # Only non-empty after an error: drop the spool files of members not written
+                for _, _, future in pending:
+                    if future.cancel():
+                        continue
+                    try:
+                        result = future.result()
+                    except Exception:
+                        continue
+                    if result["spool"]:
+                        Path(result["spool"]).unlink(missing_ok=True)
+        return hashes
+
+    def _write_precompressed(self, zipf: zipfile.ZipFile, file_path: Path,
+                             rel_path: str, future) -> Dict[str, str]:
+        """Append an already deflated member to an open zip archive"""
+        result = future.result()
+        try:
+            zinfo = zipfile.ZipInfo.from_file(file_path, rel_path)
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            zinfo.file_size = result["file_size"]
+            zinfo.compress_size = result["compress_size"]
+            zinfo.CRC = result["crc"]
+            zip64 = max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+
+            zinfo.header_offset = zipf.fp.tell()
+            zipf.fp.write(zinfo.FileHeader(zip64))
+            if result["spool"]:
+                with open(result["spool"], 'rb') as spool:
+                    shutil.copyfileobj(spool, zipf.fp, 1024 * 1024)
+            else:
+                zipf.fp.write(result["data"])
+        finally:
+            if result["spool"]:
+                os.unlink(result["spool"])
+        zipf.filelist.append(zinfo)
+        zipf.NameToInfo[zinfo.filename] = zinfo
+        zipf.start_dir = zipf.fp.tell()
+        return {rel_path: result["sha256"]}
+
     def _should_backup_file(self, file_path: str, job: BackupJob) -> bool:
         """Check if file should be backed up based on exclusion patterns"""
         return not any(pattern in file_path for pattern in job.exclude_patterns)
 
     def _create_backup_name(self, job: BackupJob) -> str:
         """Create backup directory/file name with timestamp"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Microseconds keep runs within the same second apart; fixed width keeps names sortable
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         return f"{job.name}_{timestamp}"
 
     def _process_backup_queue(self):
@@ -147,68 +602,108 @@ class BackupManager:
 
     def _execute_backup(self, job: BackupJob):
         """Execute a backup job"""
+        # Worker threads share one queue; two runs of a job would overwrite each other's index
+        with self.running_lock:
+            if job.name in self.running_jobs:
+                logging.warning(f"Backup for {job.name} is already running; skipped")
+                return
+            self.running_jobs.add(job.name)
         try:
             backup_name = self._create_backup_name(job)
             backup_path = job.destination / backup_name
+            index = FileIndex(self.catalog, job.name)
+            job.file_hashes = self.catalog.load_hashes(job.name)
 
-            if job.backup_type == BackupType.FULL:
-                self._full_backup(job, backup_path)
-            elif job.backup_type == BackupType.INCREMENTAL:
-                self._incremental_backup(job, backup_path)
-            elif job.backup_type == BackupType.DIFFERENTIAL:
-                self._differential_backup(job, backup_path)
+            slots = self.io_budget.acquire(job.workers)
+            pool = ProcessPoolExecutor(max_workers=slots) if slots > 1 else None
+            try:
+                if job.backup_type == BackupType.FULL:
+                    self._full_backup(job, backup_path, index, pool, slots)
+                elif job.backup_type == BackupType.INCREMENTAL:
+                    self._incremental_backup(job, backup_path, index, pool, slots)
+                elif job.backup_type == BackupType.DIFFERENTIAL:
+                    self._differential_backup(job, backup_path, index, pool, slots)
+                elif job.backup_type == BackupType.DEDUP:
+                    self._dedup_backup(job, backup_path, index)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+                self.io_budget.release(slots)
 
+            index.save(job.file_hashes)
+            job.file_hashes = {}
+            job.last_scan = {"hashed": index.hashed, "skipped": index.skipped}
+            logging.info(f"Scan for {job.name}: {index.hashed} files hashed, "
+                         f"{index.skipped} unchanged files skipped")
             job.last_backup = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.save_config()
             logging.info(f"Backup completed: {job.name}")
 
         except Exception as e:
             logging.error(f"Backup failed for {job.name}: {e}")
+        finally:
+            with self.running_lock:
+                self.running_jobs.discard(job.name)
 
-    def _full_backup(self, job: BackupJob, backup_path: Path):
+    def _full_backup(self, job: BackupJob, backup_path: Path, index: FileIndex,
+                     pool: Optional[ProcessPoolExecutor] = None, slots: int = 1):
         """Perform full backup"""
-        if job.compress:
+        seen = set()
+        if job.compress and pool is not None:
+            files = []
+            for root, _, filenames in os.walk(job.source):
+                for file in filenames:
+                    file_path = Path(root) / file
+                    if self._should_backup_file(str(file_path), job):
+                        files.append((file_path, str(file_path.relative_to(job.source))))
+            # Members are hashed while being compressed, so the index is refreshed for free
+            hashes = self._write_zip(job, files, Path(str(backup_path) + '.zip'), pool, slots)
+            for file_path, rel_path in files:
+                index.update(rel_path, file_path.stat(), hashes[rel_path])
+                index.hashed += 1
+                job.file_hashes[rel_path] = hashes[rel_path]
+                seen.add(rel_path)
+        elif job.compress:
             with zipfile.ZipFile(str(backup_path) + '.zip', 'w',
                                zipfile.ZIP_DEFLATED) as zipf:
                 for root, _, files in os.walk(job.source):
                     for file in files:
                         file_path = Path(root) / file
                         if self._should_backup_file(str(file_path), job):
-                            rel_path = file_path.relative_to(job.source)
+                            rel_path = str(file_path.relative_to(job.source))
                             zipf.write(file_path, rel_path)
-                            job.file_hashes[str(rel_path)] = self._calculate_file_hash(file_path)
+                            job.file_hashes[rel_path] = self._get_file_hash(
+                                job, index, file_path, rel_path)
+                            seen.add(rel_path)
         else:
             shutil.copytree(job.source, backup_path)
             for root, _, files in os.walk(job.source):
                 for file in files:
                     file_path = Path(root) / file
                     if self._should_backup_file(str(file_path), job):
-                        rel_path = file_path.relative_to(job.source)
-                        job.file_hashes[str(rel_path)] = self._calculate_file_hash(file_path)
+                        rel_path = str(file_path.relative_to(job.source))
+                        job.file_hashes[rel_path] = self._get_file_hash(
+                            job, index, file_path, rel_path)
+                        seen.add(rel_path)
+        index.prune(seen)
 
-    def _incremental_backup(self, job: BackupJob, backup_path: Path):
+    def _incremental_backup(self, job: BackupJob, backup_path: Path, index: FileIndex,
+                            pool: Optional[ProcessPoolExecutor] = None, slots: int = 1):
         """Perform incremental backup"""
         changed_files = []
+        seen = set()
         
-        for root, _, files in os.walk(job.source):
-            for file in files:
-                file_path = Path(root) / file
-                if not self._should_backup_file(str(file_path), job):
-                    continue
-                    
-                rel_path = str(file_path.relative_to(job.source))
-                current_hash = self._calculate_file_hash(file_path)
-                
-                if rel_path not in job.file_hashes or job.file_hashes[rel_path] != current_hash:
-                    changed_files.append((file_path, rel_path))
-                    job.file_hashes[rel_path] = current_hash
+        for file_path, rel_path, current_hash in self._scan_hashes(job, index, pool):
+            seen.add(rel_path)
+
+            if rel_path not in job.file_hashes or job.file_hashes[rel_path] != current_hash:
+                changed_files.append((file_path, rel_path))
+                job.file_hashes[rel_path] = current_hash
 
+        index.prune(seen)
         if changed_files:
             if job.compress:
-                with zipfile.ZipFile(str(backup_path) + '.zip', 'w',
-                                   zipfile.ZIP_DEFLATED) as zipf:
-                    for file_path, rel_path in changed_files:
-                        zipf.write(file_path, rel_path)
+                self._write_zip(job, changed_files, Path(str(backup_path) + '.zip'), pool, slots)
             else:
                 backup_path.mkdir(parents=True)
                 for file_path, rel_path in changed_files:
@@ -216,28 +711,22 @@ class BackupManager:
                     dest_path.parent.mkdir(parents=True, exist_ok=True)
                     shutil.copy2(file_path, dest_path)
 
-    def _differential_backup(self, job: BackupJob, backup_path: Path):
+    def _differential_backup(self, job: BackupJob, backup_path: Path, index: FileIndex,
+                             pool: Optional[ProcessPoolExecutor] = None, slots: int = 1):
         """Perform differential backup"""
         changed_files = []
+        seen = set()
         
-        for root, _, files in os.walk(job.source):
-            for file in files:
-                file_path = Path(root) / file
-                if not self._should_backup_file(str(file_path), job):
-                    continue
-                    
-                rel_path = str(file_path.relative_to(job.source))
-                current_hash = self._calculate_file_hash(file_path)
-                
-                if rel_path not in job.file_hashes or job.file_hashes[rel_path] != current_hash:
-                    changed_files.append((file_path, rel_path))
+        for file_path, rel_path, current_hash in self._scan_hashes(job, index, pool):
+            seen.add(rel_path)
+
+            if rel_path not in job.file_hashes or job.file_hashes[rel_path] != current_hash:
+                changed_files.append((file_path, rel_path))
 
+        index.prune(seen)
         if changed_files:
             if job.compress:
-                with zipfile.ZipFile(str(backup_path) + '.zip', 'w',
-                                   zipfile.ZIP_DEFLATED) as zipf:
-                    for file_path, rel_path in changed_files:
-                        zipf.write(file_path, rel_path)
+                self._write_zip(job, changed_files, Path(str(backup_path) + '.zip'), pool, slots)
             else:
                 backup_path.mkdir(parents=True)
                 for file_path, rel_path in changed_files:
@@ -245,6 +734,236 @@ class BackupManager:
                     dest_path.parent.mkdir(parents=True, exist_ok=True)
                     shutil.copy2(file_path, dest_path)
 
+    def _dedup_backup(self, job: BackupJob, backup_path: Path, index: FileIndex) -> dict:
+        """Perform deduplicated backup into the job's chunk store"""
+        store = ChunkStore(job.destination / "chunks")
+        manifest_dir = job.destination / "manifests"
+        manifest_dir.mkdir(parents=True, exist_ok=True)
+
+        # Files whose stat tuple is unchanged reuse the previous snapshot's chunk list
+        previous_files = {}
+        previous = sorted(manifest_dir.glob("*.json"))
+        if previous:
+            with open(previous[-1], 'r') as f:
+                previous_files = json.load(f)["files"]
+
+        files = {}
+        stats = {"files": 0, "chunks": 0, "new_chunks": 0,
+                 "bytes_read": 0, "bytes_written": 0}
+
+        for root, _, filenames in os.walk(job.source):
+            for file in filenames:
+                file_path = Path(root) / file
+                if not self._should_backup_file(str(file_path), job):
+                    continue
+
+                rel_path = str(file_path.relative_to(job.source))
+                st = file_path.stat()
+                cached = None if job.paranoid else index.lookup(rel_path, st)
+                entry = previous_files.get(rel_path)
+                if cached is not None and entry and entry["sha256"] == cached:
+                    files[rel_path] = entry
+                    job.file_hashes[rel_path] = cached
+                    index.skipped += 1
+                    stats["files"] += 1
+                    stats["chunks"] += len(entry["chunks"])
+                    continue
+
+                hasher = hashlib.sha256()
+                chunks = []
+                size = 0
+                with open(file_path, 'rb') as f:
+                    for chunk in chunk_stream(f):
+                        hasher.update(chunk)
+                        digest, written = store.put(chunk, job.compress)
+                        chunks.append(digest)
+                        size += len(chunk)
+                        stats["chunks"] += 1
+                        if written:
+                            stats["new_chunks"] += 1
+                            stats["bytes_written"] += written
+
+                files[rel_path] = {"size": size, "sha256": hasher.hexdigest(),
+                                   "chunks": chunks}
+                job.file_hashes[rel_path] = files[rel_path]["sha256"]
+                index.update(rel_path, st, files[rel_path]["sha256"])
+                index.hashed += 1
+                stats["files"] += 1
+                stats["bytes_read"] += size
+
+        index.prune(set(files))
+        manifest = {
+            "job": job.name,
+            "source": str(job.source),
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "files": files,
+            "stats": stats
+        }
+        manifest_path = manifest_dir / (backup_path.name + ".json")
+        tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+        logging.info(f"Dedup snapshot {manifest_path.name}: {stats['new_chunks']}/"
+                     f"{stats['chunks']} new chunks, {stats['bytes_written']} bytes written")
+        return stats
+
+    def list_snapshots(self, job_name: str) -> List[str]:
+        """List deduplicated snapshots of a job, oldest first"""
+        if job_name not in self.jobs:
+            logging.error(f"Job {job_name} not found")
+            return []
+
+        manifest_dir = self.jobs[job_name].destination / "manifests"
+        if not manifest_dir.exists():
+            return []
+        return sorted(p.stem for p in manifest_dir.glob("*.json"))
+
+    def restore_snapshot(self, job_name: str, snapshot: str, target: str) -> bool:
+        """Reassemble a deduplicated snapshot into the target directory"""
+        if job_name not in self.jobs:
+            logging.error(f"Job {job_name} not found")
+            return False
+
+        job = self.jobs[job_name]
+        manifest_path = job.destination / "manifests" / f"{snapshot}.json"
+        if not manifest_path.exists():
+            logging.error(f"Snapshot {snapshot} not found for job {job_name}")
+            return False
+
+        try:
+            self._restore_manifest(manifest_path, ChunkStore(job.destination / "chunks"),
+                                   Path(target))
+        except (OSError, ValueError, zlib.error) as e:
+            logging.error(f"Restore of {snapshot} failed: {e}")
+            return False
+
+        logging.info(f"Restored snapshot {snapshot} to {target}")
+        return True
+
+    def _restore_manifest(self, manifest_path: Path, store: ChunkStore, target: Path):
+        """Write every file of a manifest from its chunks"""
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+        for rel_path, entry in manifest["files"].items():
+            dest_path = target / rel_path
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            hasher = hashlib.sha256()
+            with open(dest_path, 'wb') as f:
+                for digest in entry["chunks"]:
+                    data = store.get(digest)
+                    hasher.update(data)
+                    f.write(data)
+            if hasher.hexdigest() != entry["sha256"]:
+                raise ValueError(f"Restored file {rel_path} does not match its manifest")
+
+    def benchmark_dedup(self, file_count: int = 20, file_size: int = 1024 * 1024,
+                        edited_files: int = 5) -> dict:
+        """Compare the zip incremental path with dedup on a synthetic tree with small edits"""
+        results = {}
+        rng = random.Random(42)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            source = tmp / "source"
+            source.mkdir()
+            for i in range(file_count):
+                (source / f"file_{i:04d}.bin").write_bytes(rng.randbytes(file_size))
+
+            def edit_tree():
+                for i in rng.sample(range(file_count), min(edited_files, file_count)):
+                    path = source / f"file_{i:04d}.bin"
+                    data = bytearray(path.read_bytes())
+                    offset = rng.randrange(len(data))
+                    data[offset:offset] = b"edit"
+                    path.write_bytes(bytes(data))
+
+            def dir_size(path: Path) -> int:
+                return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+            jobs = {
+                "zip": (BackupJob(str(source), str(tmp / "zip"), "bench_zip",
+                                  BackupType.INCREMENTAL), self._incremental_backup),
+                "dedup": (BackupJob(str(source), str(tmp / "dedup"), "bench_dedup",
+                                    BackupType.DEDUP), self._dedup_backup)
+            }
+            for job, _ in jobs.values():
+                job.destination.mkdir()
+            catalog = BackupCatalog(tmp / "catalog.db")
+
+            for run in ("initial", "after_edit"):
+                if run == "after_edit":
+                    edit_tree()
+                for mode, (job, backup) in jobs.items():
+                    before = dir_size(job.destination)
+                    start = time.perf_counter()
+                    index = FileIndex(catalog, job.name)
+                    backup(job, job.destination / f"{job.name}_{run}", index)
+                    index.save()
+                    elapsed = time.perf_counter() - start
+                    results[f"{mode}_{run}"] = {
+                        "bytes_written": dir_size(job.destination) - before,
+                        "seconds": round(elapsed, 3)
+                    }
+            catalog.close()
+
+        return results
+
+    def benchmark_chunking(self, size: int = 32 * 1024 * 1024) -> dict:
+        """Measure content-defined chunking throughput on random data"""
+        data = random.Random(7).randbytes(size)
+        start = time.perf_counter()
+        sizes = [len(chunk) for chunk in chunk_stream(io.BytesIO(data))]
+        elapsed = time.perf_counter() - start
+        return {
+            "chunks": len(sizes),
+            "avg_chunk_kb": round(size / len(sizes) / 1024, 1),
+            "mb_per_second": round(size / (1024 * 1024) / elapsed, 1)
+        }
+
+    def benchmark_parallel(self, file_count: int = 64, file_size: int = 2 * 1024 * 1024,
+                           worker_counts: Optional[List[int]] = None) -> dict:
+        """Measure full compressed backup throughput as the worker count grows"""
+        cpus = os.cpu_count() or 1
+        if worker_counts is None:
+            worker_counts = sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1)))
+
+        results = {}
+        rng = random.Random(42)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            source = tmp / "source"
+            source.mkdir()
+            words = [bytes(rng.choices(b"abcdefghijklmnopqrstuvwxyz", k=8)) for _ in range(512)]
+            for i in range(file_count):
+                text = b" ".join(rng.choices(words, k=file_size // 9))
+                (source / f"file_{i:04d}.txt").write_bytes(text[:file_size])
+            total = file_count * file_size
+            catalog = BackupCatalog(tmp / "catalog.db")
+
+            for workers in worker_counts:
+                job = BackupJob(str(source), str(tmp / f"dest_{workers}"), f"bench_{workers}")
+                job.workers = workers
+                job.destination.mkdir()
+                index = FileIndex(catalog, job.name)
+                pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+                try:
+                    start = time.perf_counter()
+                    self._full_backup(job, job.destination / "backup", index, pool, workers)
+                    elapsed = time.perf_counter() - start
+                finally:
+                    if pool is not None:
+                        pool.shutdown()
+                results[workers] = {
+                    "seconds": round(elapsed, 3),
+                    "mb_per_second": round(total / elapsed / (1024 * 1024), 1)
+                }
+            catalog.close()
+
+        return results
+
     def run_backup(self, job_name: str) -> bool:
         """Queue a backup job for execution"""
         if job_name not in self.jobs:
@@ -286,6 +1005,32 @@ class BackupManager:
         logging.info(f"Compression {'enabled' if compress else 'disabled'} for job {job_name}")
         return True
 
+    def set_workers(self, job_name: str, workers: int) -> bool:
+        """Set the number of hashing/compression worker processes for a job"""
+        if job_name not in self.jobs:
+            logging.error(f"Job {job_name} not found")
+            return False
+
+        if workers < 1:
+            logging.error(f"Invalid worker count {workers} for job {job_name}")
+            return False
+
+        self.jobs[job_name].workers = workers
+        self.save_config()
+        logging.info(f"Workers set to {workers} for job {job_name}")
+        return True
+
+    def set_paranoid(self, job_name: str, paranoid: bool) -> bool:
+        """Force re-hashing of every file instead of trusting the stat index"""
+        if job_name not in self.jobs:
+            logging.error(f"Job {job_name} not found")
+            return False
+
+        self.jobs[job_name].paranoid = paranoid
+        self.save_config()
+        logging.info(f"Paranoid mode {'enabled' if paranoid else 'disabled'} for job {job_name}")
+        return True
+
     def add_exclude_pattern(self, job_name: str, pattern: str) -> bool:
         """Add file exclusion pattern to a job"""
         if job_name not in self.jobs:
@@ -313,8 +1058,10 @@ class BackupManager:
     def shutdown(self):
         """Shutdown the backup manager"""
         self.running = False
-        self.worker_thread.join()
+        for thread in self.worker_threads:
+            thread.join()
         self.save_config()
+        self.catalog.close()
         logging.info("Backup manager shutdown")
 
 def main():
@@ -330,9 +1077,12 @@ def main():
             print("5. Set Schedule")
             print("6. Set Compression")
             print("7. Manage Exclusions")
-            print("8. Exit")
+            print("8. Restore Snapshot")
+            print("9. Benchmarks")
+            print("10. Set Workers")
+            print("11. Exit")
             
-            choice = input("\nEnter your choice (1-8): ")
+            choice = input("\nEnter your choice (1-11): ")
             
             if choice == "1":
                 name = input("Enter job name: ")
@@ -342,12 +1092,14 @@ def main():
                 print("1. Full")
                 print("2. Incremental")
                 print("3. Differential")
-                backup_type = input("Choose backup type (1-3): ")
+                print("4. Deduplicated")
+                backup_type = input("Choose backup type (1-4): ")
                 
                 backup_types = {
                     "1": BackupType.FULL,
                     "2": BackupType.INCREMENTAL,
-                    "3": BackupType.DIFFERENTIAL
+                    "3": BackupType.DIFFERENTIAL,
+                    "4": BackupType.DEDUP
                 }
                 
                 if manager.add_job(source, destination, name,
@@ -379,6 +1131,11 @@ def main():
                     print(f"Schedule: {job.schedule}")
                     print(f"Compression: {'Enabled' if job.compress else 'Disabled'}")
                     print(f"Last backup: {job.last_backup or 'Never'}")
+                    if job.last_scan:
+                        print(f"Last scan: {job.last_scan['hashed']} hashed, "
+                              f"{job.last_scan['skipped']} skipped")
+                    print(f"Paranoid mode: {'Enabled' if job.paranoid else 'Disabled'}")
+                    print(f"Workers: {job.workers}")
                     if job.exclude_patterns:
                         print(f"Exclusions: {', '.join(job.exclude_patterns)}")
                     print("-" * 30)
@@ -418,6 +1175,11 @@ def main():
                     print("Compression setting updated!")
                 else:
                     print("Failed to update compression setting!")
+                    continue
+
+                paranoid = input("Re-hash every file on each run (paranoid mode)? (y/n): ").lower() == 'y'
+                if manager.set_paranoid(name, paranoid):
+                    print("Paranoid mode updated!")
             
             elif choice == "7":
                 name = input("Enter job name: ")
@@ -455,6 +1217,70 @@ def main():
                         print("No exclusion patterns found!")
             
             elif choice == "8":
+                name = input("Enter job name: ")
+                snapshots = manager.list_snapshots(name)
+                if not snapshots:
+                    print("No snapshots found!")
+                    continue
+
+                print("\nSnapshots:")
+                for i, snapshot in enumerate(snapshots, 1):
+                    print(f"{i}. {snapshot}")
+
+                try:
+                    number = int(input("Choose snapshot: "))
+                except ValueError:
+                    number = 0
+                if not 1 <= number <= len(snapshots):
+                    print("Invalid snapshot!")
+                    continue
+                snapshot = snapshots[number - 1]
+
+                target = input("Enter restore path: ")
+                if manager.restore_snapshot(name, snapshot, target):
+                    print("Snapshot restored successfully!")
+                else:
+                    print("Failed to restore snapshot!")
+
+            elif choice == "9":
+                print("\n1. Dedup vs zip incremental")
+                print("2. Parallel compression scaling")
+
+                sub_choice = input("Enter choice (1-2): ")
+
+                if sub_choice == "1":
+                    print("Running benchmark...")
+                    results = manager.benchmark_dedup()
+                    print(f"\n{'Run':<20} {'Bytes written':>15} {'Seconds':>10}")
+                    print("-" * 47)
+                    for run, result in results.items():
+                        print(f"{run:<20} {result['bytes_written']:>15,} {result['seconds']:>10}")
+                    chunking = manager.benchmark_chunking()
+                    print(f"\nChunking: {chunking['mb_per_second']} MB/s, "
+                          f"{chunking['chunks']} chunks averaging {chunking['avg_chunk_kb']} KB")
+
+                elif sub_choice == "2":
+                    print("Running benchmark...")
+                    results = manager.benchmark_parallel()
+                    print(f"\n{'Workers':<10} {'Seconds':>10} {'MB/s':>10}")
+                    print("-" * 32)
+                    for workers, result in results.items():
+                        print(f"{workers:<10} {result['seconds']:>10} {result['mb_per_second']:>10}")
+
+            elif choice == "10":
+                name = input("Enter job name: ")
+                try:
+                    workers = int(input("Enter number of worker processes: "))
+                except ValueError:
+                    print("Invalid number!")
+                    continue
+
+                if manager.set_workers(name, workers):
+                    print("Workers updated!")
+                else:
+                    print("Failed to update workers!")
+
+            elif choice == "11":
                 print("Thank you for using Backup Manager!")
                 manager.shutdown()
                 break
@@ -1,11 +1,23 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, ParameterGrid, ParameterSampler
+from sklearn.base import clone
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
 import joblib
 from pathlib import Path
 import json
+import hashlib
+import shutil
+import time
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed, Future
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import queue
+import threading
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
@@ -17,8 +29,168 @@ class ModelType:
     REGRESSION = "regression"
     CLUSTERING = "clustering"
 
+# Rows per chunk in streaming mode
+STREAM_CHUNK_ROWS = 100000
+# Holdout membership is decided per row from a content hash bucket
+HOLDOUT_BUCKETS = 10000
+
+def holdout_mask(chunk: pd.DataFrame, test_size: float) -> np.ndarray:
+    """Deterministic test-set membership from a hash of each row's contents"""
+    hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    return (hashes % HOLDOUT_BUCKETS) < int(test_size * HOLDOUT_BUCKETS)
+
+def fitted_label_encoder(classes) -> LabelEncoder:
+    """LabelEncoder with precomputed (sorted) classes"""
+    encoder = LabelEncoder()
+    encoder.classes_ = np.asarray(sorted(classes), dtype=object)
+    return encoder
+
+def streaming_metrics(model_type: str, totals: Dict) -> Dict:
+    """Holdout metrics from accumulated confusion counts or error sums"""
+    if model_type != ModelType.CLASSIFICATION:
+        n = totals["n"]
+        mse = totals["sq_error"] / n
+        variance = totals["y_sq"] / n - (totals["y"] / n) ** 2
+        return {"mse": mse, "r2": 1 - mse / variance if variance else 0.0}
+
+    cm = totals["confusion"]
+    true_counts = cm.sum(axis=1)
+    pred_counts = cm.sum(axis=0)
+    hits = np.diag(cm)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(pred_counts > 0, hits / pred_counts, 0.0)
+        recall = np.where(true_counts > 0, hits / true_counts, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    weights = true_counts / true_counts.sum()
+    return {
+        "accuracy": float(hits.sum() / cm.sum()),
+        "precision": float((precision * weights).sum()),
+        "recall": float((recall * weights).sum()),
+        "f1": float((f1 * weights).sum())
+    }
+
+# Bump when preprocess_data changes so old cache entries stop matching
+PREPROCESSING_VERSION = 1
+DEFAULT_CACHE_BYTES = 10 * 1024 ** 3
+
+def memmappable(array) -> np.ndarray:
+    """Object arrays cannot be memory-mapped; store labels as fixed-width strings"""
+    array = np.asarray(array)
+    return array.astype(str) if array.dtype == object else array
+
+def file_content_hash(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class DatasetCache:
+    """Preprocessed train/test arrays stored as .npy files and memory-mapped on load"""
+
+    ARRAYS = ("X_train", "X_test", "y_train", "y_test")
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(exist_ok=True)
+
+    @staticmethod
+    def key(content_hash: str, params: Dict) -> str:
+        payload = json.dumps([content_hash, params, PREPROCESSING_VERSION], sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def has(self, key: str) -> bool:
+        return (self.cache_dir / key / "meta.json").exists()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict]]:
+        """Memory-map a cached entry; arrays are read-only views of the files"""
+        entry = self.cache_dir / key
+        if not (entry / "meta.json").exists():
+            return None
+        with open(entry / "meta.json", 'r') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(entry / f"{name}.npy", mmap_mode='r') for name in self.ARRAYS}
+        meta["last_used"] = time.time()
+        self._write_meta(entry, meta)
+        return arrays, meta
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray], meta: Dict) -> List[str]:
+        """Store an entry atomically and return the keys evicted to stay under max_bytes"""
+        staging = self.cache_dir / f".{key}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        size = 0
+        for name in self.ARRAYS:
+            np.save(staging / f"{name}.npy", memmappable(arrays[name]))
+            size += (staging / f"{name}.npy").stat().st_size
+        meta = dict(meta, bytes=size, created=time.time(), last_used=time.time())
+        self._write_meta(staging, meta)
+
+        shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+        staging.rename(self.cache_dir / key)
+        return self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self.entries(), key=lambda meta: meta["last_used"])
+        total = sum(meta["bytes"] for meta in entries)
+        evicted = []
+        for meta in entries:
+            if total <= self.max_bytes:
+                break
+            if meta["key"] == keep:
+                continue
+            shutil.rmtree(self.cache_dir / meta["key"], ignore_errors=True)
+            total -= meta["bytes"]
+            evicted.append(meta["key"])
+        return evicted
+
+    def entries(self) -> List[Dict]:
+        entries = []
+        for meta_file in self.cache_dir.glob("*/meta.json"):
+            with open(meta_file, 'r') as f:
+                entries.append(dict(json.load(f), key=meta_file.parent.name))
+        return entries
+
+    @staticmethod
+    def _write_meta(entry: Path, meta: Dict):
+        tmp = entry / "meta.json.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        tmp.replace(entry / "meta.json")
+
+class SearchStrategy:
+    GRID = "grid"
+    RANDOM = "random"
+    HALVING = "halving"
+
+# Search workers memory-map the shared training arrays once per process
+_search_arrays: Dict[str, np.ndarray] = {}
+
+def _init_search_worker(search_dir: str):
+    for name in ("X_fit", "y_fit", "X_val", "y_val"):
+        _search_arrays[name] = np.load(Path(search_dir) / f"{name}.npy", mmap_mode='r')
+
+def _run_trial(estimator: Any, params: Dict, n_samples: int) -> Dict:
+    """Fit one candidate on the first n_samples (pre-shuffled) rows and score it on the validation split"""
+    model = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    model.fit(_search_arrays["X_fit"][:n_samples], _search_arrays["y_fit"][:n_samples])
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    score = model.score(_search_arrays["X_val"], _search_arrays["y_val"])
+    return {
+        "params": {key: value.item() if isinstance(value, np.generic) else value
+                   for key, value in params.items()},
+        "n_samples": n_samples,
+        "score": float(score),
+        "fit_time": fit_time,
+        "score_time": time.perf_counter() - start
+    }
+
 class ModelManager:
-    def __init__(self):
+    def __init__(self, cache_max_bytes: int = DEFAULT_CACHE_BYTES):
         self.models_dir = Path("models")
         self.data_dir = Path("datasets")
         self.config_file = Path("model_config.json")
@@ -26,6 +198,7 @@ class ModelManager:
         self.setup_directories()
         self.setup_logging()
         self.load_config()
+        self.dataset_cache = DatasetCache(Path("dataset_cache"), cache_max_bytes)
         self.current_model = None
         self.current_data = None
         self.current_scaler = None
@@ -63,35 +236,81 @@ class ModelManager:
         with open(self.config_file, 'w') as f:
             json.dump(self.config, f, indent=4)
 
-    def load_data(self, file_path: str, target_column: str) -> bool:
-        """Load dataset from file"""
+    def _read_file(self, file_path: Path) -> Optional[pd.DataFrame]:
+        if file_path.suffix.lower() == '.csv':
+            return pd.read_csv(file_path)
+        elif file_path.suffix.lower() in ['.xlsx', '.xls']:
+            return pd.read_excel(file_path)
+        logging.error("Unsupported file format")
+        return None
+
+    def _content_hash(self, file_path: Path) -> str:
+        """Content hash of a dataset, reused while its size and mtime are unchanged"""
+        info = self.config["datasets"].get(file_path.name, {})
+        stat = file_path.stat()
+        if info.get("file_size") == stat.st_size and info.get("file_mtime") == stat.st_mtime:
+            return info["content_hash"]
+        return file_content_hash(file_path)
+
+    def load_data(self, file_path: str, target_column: str, use_cache: bool = True) -> bool:
+        """Load dataset from file; parsing is deferred when a preprocessed copy is cached"""
         try:
             file_path = Path(file_path)
-            if file_path.suffix.lower() == '.csv':
-                data = pd.read_csv(file_path)
-            elif file_path.suffix.lower() in ['.xlsx', '.xls']:
-                data = pd.read_excel(file_path)
-            else:
+            if file_path.suffix.lower() not in ['.csv', '.xlsx', '.xls']:
                 logging.error("Unsupported file format")
                 return False
 
-            if target_column not in data.columns:
-                logging.error(f"Target column '{target_column}' not found")
-                return False
+            content_hash = self._content_hash(file_path)
+            info = self.config["datasets"].get(file_path.name, {})
+            cache_entries = {}
+            if info.get("content_hash") == content_hash and info.get("target") == target_column:
+                cache_entries = {key: entry for key, entry in info.get("cache", {}).items()
+                                 if self.dataset_cache.has(key)}
 
-            self.current_data = {
-                'X': data.drop(columns=[target_column]),
-                'y': data[target_column],
-                'file_name': file_path.name
-            }
+            if use_cache and cache_entries:
+                # Only the column names are needed until preprocess_data misses the cache
+                self.current_data = {
+                    'X': pd.DataFrame(columns=info["features"]),
+                    'y': None,
+                    'file_name': file_path.name
+                }
+                rows, columns = info["rows"], info["columns"]
+                logging.info(f"Dataset {file_path.name} unchanged; using preprocessed cache")
+            else:
+                data = self._read_file(file_path)
+                if data is None:
+                    return False
+
+                if target_column not in data.columns:
+                    logging.error(f"Target column '{target_column}' not found")
+                    return False
+
+                self.current_data = {
+                    'X': data.drop(columns=[target_column]),
+                    'y': data[target_column],
+                    'file_name': file_path.name
+                }
+                rows, columns = len(data), len(data.columns)
+
+            self.current_data.update({
+                'file_path': file_path,
+                'target': target_column,
+                'content_hash': content_hash,
+                'use_cache': use_cache
+            })
 
             # Save dataset info
+            stat = file_path.stat()
             self.config["datasets"][file_path.name] = {
                 "features": list(self.current_data['X'].columns),
                 "target": target_column,
-                "rows": len(data),
-                "columns": len(data.columns),
-                "loaded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "rows": rows,
+                "columns": columns,
+                "loaded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "content_hash": content_hash,
+                "file_size": stat.st_size,
+                "file_mtime": stat.st_mtime,
+                "cache": cache_entries
             }
             self.save_config()
 
@@ -109,6 +328,23 @@ class ModelManager:
                 logging.error("No data loaded")
                 return False
 
+            params = {
+                "target": self.current_data.get('target'),
+                "test_size": test_size,
+                "random_state": random_state
+            }
+            cache_key = None
+            if self.current_data.get('use_cache'):
+                cache_key = self.dataset_cache.key(self.current_data['content_hash'], params)
+                if self._load_cached(cache_key):
+                    return True
+
+            if self.current_data['y'] is None:
+                # Loaded from cache metadata but these parameters are not cached yet
+                data = self._read_file(self.current_data['file_path'])
+                self.current_data['X'] = data.drop(columns=[self.current_data['target']])
+                self.current_data['y'] = data[self.current_data['target']]
+
             X = self.current_data['X']
             y = self.current_data['y']
 
@@ -134,6 +370,9 @@ class ModelManager:
                 'y_test': y_test
             })
 
+            if cache_key:
+                self._store_cached(cache_key, params)
+
             logging.info("Data preprocessing completed")
             return True
 
@@ -141,6 +380,327 @@ class ModelManager:
             logging.error(f"Error preprocessing data: {e}")
             return False
 
+    def _load_cached(self, cache_key: str) -> bool:
+        """Restore split arrays, scaler and encoders from the dataset cache"""
+        cached = self.dataset_cache.get(cache_key)
+        if cached is None:
+            return False
+        arrays, meta = cached
+
+        scaler = StandardScaler()
+        scaler.mean_ = np.array(meta["scaler"]["mean"])
+        scaler.var_ = np.array(meta["scaler"]["var"])
+        scaler.scale_ = np.array(meta["scaler"]["scale"])
+        scaler.n_samples_seen_ = meta["scaler"]["n_samples_seen"]
+        scaler.n_features_in_ = len(meta["features"])
+        self.current_scaler = scaler
+        self.label_encoders = {column: fitted_label_encoder(classes)
+                               for column, classes in meta["encoders"].items()}
+
+        self.current_data.update(arrays)
+        logging.info(f"Loaded preprocessed data from cache entry {cache_key}")
+        return True
+
+    def _store_cached(self, cache_key: str, params: Dict):
+        meta = {
+            "params": params,
+            "features": list(self.current_data['X'].columns),
+            "scaler": {
+                "mean": self.current_scaler.mean_.tolist(),
+                "var": self.current_scaler.var_.tolist(),
+                "scale": self.current_scaler.scale_.tolist(),
+                "n_samples_seen": int(self.current_scaler.n_samples_seen_)
+            },
+            "encoders": {column: [str(c) for c in encoder.classes_]
+                         for column, encoder in self.label_encoders.items()}
+        }
+        arrays = {name: self.current_data[name] for name in DatasetCache.ARRAYS}
+        evicted = self.dataset_cache.put(cache_key, arrays, meta)
+
+        dataset = self.config["datasets"][self.current_data['file_name']]
+        dataset.setdefault("cache", {})[cache_key] = dict(
+            params, bytes=sum(np.asarray(a).nbytes for a in arrays.values()),
+            created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        for info in self.config["datasets"].values():
+            for key in evicted:
+                info.get("cache", {}).pop(key, None)
+        self.save_config()
+        if evicted:
+            logging.info(f"Evicted {len(evicted)} dataset cache entries")
+
+    def infer_dtypes(self, file_path: Path, target_column: str, sample_rows: int = 10000) -> Dict[str, str]:
+        """Explicit column dtypes from a sample so every chunk parses the same way"""
+        sample = pd.read_csv(file_path, nrows=sample_rows)
+        dtypes = {}
+        for column in sample.columns:
+            if column != target_column and pd.api.types.is_numeric_dtype(sample[column]):
+                dtypes[column] = 'float64'
+            else:
+                dtypes[column] = 'object'
+        if pd.api.types.is_numeric_dtype(sample[target_column]):
+            dtypes[target_column] = str(sample[target_column].dtype)
+        return dtypes
+
+    def encode_features(self, X: pd.DataFrame) -> np.ndarray:
+        """Vectorized label encoding and scaling; unseen categories map to -1"""
+        columns = []
+        for column in X.columns:
+            if column in self.label_encoders:
+                categories = self.label_encoders[column].classes_
+                columns.append(pd.Categorical(X[column], categories=categories).codes.astype(np.float64))
+            else:
+                columns.append(X[column].to_numpy(dtype=np.float64))
+        features = np.column_stack(columns)
+        if self.current_scaler is not None:
+            features = self.current_scaler.transform(features)
+        return features
+
+    def fit_streaming_preprocessing(self, file_path: Path, target_column: str, dtypes: Dict[str, str],
+                                    test_size: float, chunk_size: int) -> Dict:
+        """One pass over the file: collect categories, fit the scaler on training rows"""
+        numeric_scaler = StandardScaler()
+        categories: Dict[str, set] = {}
+        # Per-category training row counts give the mean/variance of the final (sorted) codes
+        category_counts: Dict[str, pd.Series] = {}
+        classes = set()
+        rows = holdout_rows = 0
+        features = None
+
+        for chunk in pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_size):
+            test_mask = holdout_mask(chunk, test_size)
+            X = chunk.drop(columns=[target_column])
+            if features is None:
+                features = list(X.columns)
+                categorical = [c for c in features if dtypes[c] == 'object']
+                numeric = [c for c in features if c not in categorical]
+
+            train = X[~test_mask]
+            if numeric and len(train):
+                numeric_scaler.partial_fit(train[numeric].to_numpy(dtype=np.float64))
+            for column in categorical:
+                categories.setdefault(column, set()).update(X[column].dropna().unique())
+                counts = train[column].value_counts()
+                category_counts[column] = category_counts[column].add(counts, fill_value=0) \
+                    if column in category_counts else counts
+            classes.update(chunk[target_column].unique())
+            rows += len(chunk)
+            holdout_rows += int(test_mask.sum())
+
+        self.label_encoders = {column: fitted_label_encoder(values)
+                               for column, values in categories.items()}
+
+        # Assemble a single scaler over all features in column order
+        means, variances = [], []
+        for column in features:
+            if column in self.label_encoders:
+                counts = category_counts[column].reindex(self.label_encoders[column].classes_,
+                                                         fill_value=0).to_numpy(dtype=np.float64)
+                codes = np.arange(len(counts))
+                mean = (codes * counts).sum() / counts.sum()
+                means.append(mean)
+                variances.append((counts * (codes - mean) ** 2).sum() / counts.sum())
+            else:
+                index = numeric.index(column)
+                means.append(numeric_scaler.mean_[index])
+                variances.append(numeric_scaler.var_[index])
+
+        scaler = StandardScaler()
+        scaler.mean_ = np.array(means)
+        scaler.var_ = np.array(variances)
+        scaler.scale_ = np.where(scaler.var_ > 0, np.sqrt(scaler.var_), 1.0)
+        scaler.n_samples_seen_ = rows - holdout_rows
+        scaler.n_features_in_ = len(features)
+        self.current_scaler = scaler
+
+        return {"features": features, "classes": sorted(classes), "rows": rows,
+                "holdout_rows": holdout_rows}
+
+    def train_streaming(self, file_path: str, target_column: str, model_type: str, model_name: str,
+                        model_instance: Any, test_size: float = 0.2, epochs: int = 1,
+                        chunk_size: int = STREAM_CHUNK_ROWS, dtypes: Optional[Dict[str, str]] = None) -> Dict:
+        """Out-of-core training: chunked CSV reads, incremental preprocessing, partial_fit per batch"""
+        try:
+            file_path = Path(file_path)
+            if file_path.suffix.lower() != '.csv':
+                logging.error("Streaming mode supports CSV files only")
+                return {}
+            if not hasattr(model_instance, 'partial_fit'):
+                logging.error(f"{type(model_instance).__name__} does not support partial_fit")
+                return {}
+
+            dtypes = dtypes or self.infer_dtypes(file_path, target_column)
+            info = self.fit_streaming_preprocessing(file_path, target_column, dtypes, test_size, chunk_size)
+            classification = model_type == ModelType.CLASSIFICATION
+            classes = np.array(info["classes"])
+
+            for epoch in range(epochs):
+                for chunk in pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_size):
+                    train = ~holdout_mask(chunk, test_size)
+                    if not train.any():
+                        continue
+                    X = self.encode_features(chunk.drop(columns=[target_column])[train])
+                    y = chunk[target_column].to_numpy()[train]
+                    if classification:
+                        model_instance.partial_fit(X, y, classes=classes)
+                    else:
+                        model_instance.partial_fit(X, y)
+                logging.info(f"Streaming epoch {epoch + 1}/{epochs} completed")
+
+            # Evaluate on the holdout rows without materialising them
+            if classification:
+                totals = {"confusion": np.zeros((len(classes), len(classes)), dtype=np.int64)}
+            else:
+                totals = {"n": 0, "sq_error": 0.0, "y": 0.0, "y_sq": 0.0}
+            for chunk in pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_size):
+                test = holdout_mask(chunk, test_size)
+                if not test.any():
+                    continue
+                y_true = chunk[target_column].to_numpy()[test]
+                y_pred = model_instance.predict(self.encode_features(chunk.drop(columns=[target_column])[test]))
+                if classification:
+                    totals["confusion"] += confusion_matrix(y_true, y_pred, labels=classes)
+                else:
+                    totals["n"] += len(y_true)
+                    totals["sq_error"] += float(((y_true - y_pred) ** 2).sum())
+                    totals["y"] += float(y_true.sum())
+                    totals["y_sq"] += float((y_true ** 2).sum())
+            metrics = streaming_metrics(model_type, totals) if info["holdout_rows"] else {}
+
+            self.current_model = model_instance
+            self.current_data = None
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # Merge so the content hash and preprocessed cache entries from load_data survive
+            self.config["datasets"].setdefault(file_path.name, {}).update({
+                "features": info["features"],
+                "target": target_column,
+                "rows": info["rows"],
+                "columns": len(info["features"]) + 1,
+                "dtypes": dtypes,
+                "mode": "streaming",
+                "loaded_at": timestamp
+            })
+            self.config["models"][model_name] = {
+                "type": model_type,
+                "name": model_name,
+                "hyperparameters": model_instance.get_params(),
+                "features": info["features"],
+                "trained_at": timestamp,
+                "dataset": file_path.name,
+                "epochs": epochs
+            }
+            self.config["metrics"][model_name] = {
+                "metrics": metrics,
+                "holdout_rows": info["holdout_rows"],
+                "evaluated_at": timestamp
+            }
+            self.save_config()
+
+            joblib.dump(model_instance, self.models_dir / f"{model_name}.joblib")
+            self._save_preprocessing(model_name, info["features"])
+            logging.info(f"Model {model_name} trained in streaming mode on {info['rows']} rows")
+            return metrics
+
+        except Exception as e:
+            logging.error(f"Error in streaming training: {e}")
+            return {}
+
+    def search_hyperparameters(self, model_type: str, model_name: str, estimator: Any, param_space: Dict,
+                               strategy: str = SearchStrategy.GRID, n_iter: int = 20, factor: int = 3,
+                               validation_size: float = 0.2, workers: Optional[int] = None,
+                               random_state: int = 42) -> Dict:
+        """Parallel grid/random/successive-halving search; the best candidate is refit and saved"""
+        try:
+            # A halving factor below 2 never narrows the field (and 1 is not a valid log base)
+            if factor < 2:
+                logging.error(f"Halving factor must be at least 2, got {factor}")
+                return {}
+
+            if self.current_data is None or 'X_train' not in self.current_data:
+                logging.error("Data not preprocessed")
+                return {}
+
+            if strategy == SearchStrategy.RANDOM:
+                candidates = list(ParameterSampler(param_space, n_iter, random_state=random_state))
+            else:
+                candidates = list(ParameterGrid(param_space))
+
+            X = np.asarray(self.current_data['X_train'])
+            y = memmappable(self.current_data['y_train'])
+            order = np.random.default_rng(random_state).permutation(len(X))
+            n_val = max(1, int(len(X) * validation_size))
+            n_fit = len(X) - n_val
+
+            if strategy == SearchStrategy.HALVING:
+                rounds = max(1, math.ceil(math.log(len(candidates), factor)))
+                budgets = [max(min(n_fit, 50), n_fit // factor ** (rounds - 1 - r)) for r in range(rounds)]
+            else:
+                budgets = [n_fit]
+
+            trials = []
+            start = time.perf_counter()
+            with tempfile.TemporaryDirectory(dir=self.models_dir) as search_dir:
+                # One shuffled on-disk copy shared by every worker through mmap
+                np.save(Path(search_dir) / "X_fit.npy", X[order[:n_fit]])
+                np.save(Path(search_dir) / "y_fit.npy", y[order[:n_fit]])
+                np.save(Path(search_dir) / "X_val.npy", X[order[n_fit:]])
+                np.save(Path(search_dir) / "y_val.npy", y[order[n_fit:]])
+
+                with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                         initializer=_init_search_worker,
+                                         initargs=(search_dir,)) as pool:
+                    for round_index, n_samples in enumerate(budgets):
+                        futures = [pool.submit(_run_trial, estimator, params, n_samples)
+                                   for params in candidates]
+                        results = []
+                        for future in as_completed(futures):
+                            trial = future.result()
+                            trial.update(round=round_index, strategy=strategy)
+                            results.append(trial)
+                        results.sort(key=lambda trial: trial["score"], reverse=True)
+
+                        # Successive halving keeps the top 1/factor for a larger budget
+                        keep = max(1, len(results) // factor) \
+                            if round_index < len(budgets) - 1 else len(results)
+                        for rank, trial in enumerate(results):
+                            trial["status"] = "completed" if rank < keep else "pruned"
+                        trials.extend(results)
+                        candidates = [trial["params"] for trial in results[:keep]]
+                        logging.info(f"Search round {round_index + 1}/{len(budgets)}: "
+                                     f"{len(results)} candidates on {n_samples} samples")
+
+            wall_time = time.perf_counter() - start
+            final_round = [trial for trial in trials if trial["round"] == len(budgets) - 1]
+            best = max(final_round, key=lambda trial: trial["score"])
+
+            summary = {
+                "strategy": strategy,
+                "best_params": best["params"],
+                "best_score": best["score"],
+                "trials": trials,
+                "wall_time": wall_time,
+                "sequential_time": sum(trial["fit_time"] + trial["score_time"] for trial in trials),
+                "searched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+            best_model = clone(estimator).set_params(**best["params"])
+            if not self.train_model(model_type, model_name, best_model, best["params"]):
+                return {}
+            self.config["metrics"].setdefault(model_name, {})["search"] = summary
+            self.save_config()
+
+            logging.info(f"Search for {model_name}: {len(trials)} trials in {wall_time:.2f}s, "
+                         f"best score {best['score']:.4f}")
+            return summary
+
+        except Exception as e:
+            logging.error(f"Error in hyperparameter search: {e}")
+            return {}
+
+    def _save_preprocessing(self, model_name: str, features: List[str]):
+        """Store the scaler and encoders next to the model so it can be served on its own"""
+        joblib.dump({"features": features, "scaler": self.current_scaler, "encoders": self.label_encoders},
+                    self.models_dir / f"{model_name}.preprocess.joblib")
+
     def train_model(self, model_type: str, model_name: str, model_instance: Any,
                    hyperparameters: Dict = None) -> bool:
         """Train a machine learning model"""
@@ -173,6 +733,7 @@ class ModelManager:
             # Save model file
             model_path = self.models_dir / f"{model_name}.joblib"
             joblib.dump(model_instance, model_path)
+            self._save_preprocessing(model_name, list(self.current_data['X'].columns))
 
             logging.info(f"Model {model_name} trained and saved")
             return True
@@ -201,10 +762,11 @@ class ModelManager:
                 "f1": f1_score(self.current_data['y_test'], y_pred, average='weighted')
             }
 
-            self.config["metrics"][model_name] = {
+            # Keep other entries such as search trials recorded for this model
+            self.config["metrics"].setdefault(model_name, {}).update({
                 "metrics": metrics,
                 "evaluated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            })
             self.save_config()
 
             logging.info(f"Model {model_name} evaluated")
@@ -223,6 +785,11 @@ class ModelManager:
                 return False
 
             self.current_model = joblib.load(model_path)
+            preprocess_path = self.models_dir / f"{model_name}.preprocess.joblib"
+            if preprocess_path.exists():
+                preprocessing = joblib.load(preprocess_path)
+                self.current_scaler = preprocessing["scaler"]
+                self.label_encoders = preprocessing["encoders"]
             logging.info(f"Model {model_name} loaded")
             return True
 
@@ -237,15 +804,8 @@ class ModelManager:
                 logging.error("No model loaded")
                 return None
 
-            # Preprocess input data
-            for column in data.select_dtypes(include=['object']).columns:
-                if column in self.label_encoders:
-                    data[column] = self.label_encoders[column].transform(data[column])
-
-            if self.current_scaler is not None:
-                data = self.current_scaler.transform(data)
-
-            predictions = self.current_model.predict(data)
+            # Vectorized preprocessing into a new array; the caller's DataFrame is left as is
+            predictions = self.current_model.predict(self.encode_features(data))
             return predictions
 
         except Exception as e:
@@ -310,8 +870,242 @@ class ModelManager:
         except Exception as e:
             logging.error(f"Error plotting confusion matrix: {e}")
 
+class ServedModel:
+    """A loaded model with its preprocessing reduced to array lookups and arithmetic"""
+
+    def __init__(self, model: Any, preprocessing: Optional[Dict]):
+        self.model = model
+        self.features: Optional[List[str]] = None
+        self.categories: Dict[str, pd.Index] = {}
+        self.mean = self.scale = None
+        if preprocessing:
+            self.features = preprocessing["features"]
+            self.categories = {column: pd.Index(encoder.classes_)
+                               for column, encoder in preprocessing["encoders"].items()}
+            if preprocessing["scaler"] is not None:
+                self.mean = preprocessing["scaler"].mean_
+                self.scale = preprocessing["scaler"].scale_
+
+    def transform(self, rows: List[Dict]) -> np.ndarray:
+        """Feature matrix from a list of {feature: value} rows; unseen categories become -1"""
+        features = self.features or list(rows[0].keys())
+        matrix = np.empty((len(rows), len(features)))
+        for index, column in enumerate(features):
+            values = [row[column] for row in rows]
+            if column in self.categories:
+                matrix[:, index] = self.categories[column].get_indexer(values)
+            else:
+                matrix[:, index] = values
+        if self.mean is not None:
+            matrix -= self.mean
+            matrix /= self.scale
+        return matrix
+
+class _PendingRequest:
+    def __init__(self, model_name: str, rows: List[Dict]):
+        self.model_name = model_name
+        self.rows = rows
+        self.future: Future = Future()
+
+class ModelServer:
+    """Serves saved models with an LRU of loaded models and micro-batched predictions"""
+
+    def __init__(self, models_dir: Path, cache_size: int = 4, batch_window: float = 0.002,
+                 max_batch: int = 512, mmap: bool = False):
+        self.models_dir = models_dir
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.mmap = mmap
+        self.models: "OrderedDict[str, ServedModel]" = OrderedDict()
+        self.models_lock = threading.Lock()
+        self.requests: "queue.Queue[Optional[_PendingRequest]]" = queue.Queue()
+        self.batches = 0
+        self.batched_rows = 0
+        self.http_server = None
+        self.worker = threading.Thread(target=self._batch_loop, daemon=True)
+        self.worker.start()
+
+    def get_model(self, model_name: str) -> ServedModel:
+        """Loaded model from the LRU, loading (optionally memory-mapped) on a miss"""
+        # Held across the load so concurrent misses load a model only once
+        with self.models_lock:
+            served = self.models.get(model_name)
+            if served is not None:
+                self.models.move_to_end(model_name)
+                return served
+
+            model_path = self.models_dir / f"{model_name}.joblib"
+            if not model_path.exists():
+                raise FileNotFoundError(f"Model {model_name} not found")
+            model = joblib.load(model_path, mmap_mode='r' if self.mmap else None)
+            preprocess_path = self.models_dir / f"{model_name}.preprocess.joblib"
+            preprocessing = joblib.load(preprocess_path) if preprocess_path.exists() else None
+
+            served = ServedModel(model, preprocessing)
+            self.models[model_name] = served
+            if len(self.models) > self.cache_size:
+                evicted, _ = self.models.popitem(last=False)
+                logging.info(f"Evicted model {evicted} from serving cache")
+            return served
+
+    def predict(self, model_name: str, rows: List[Dict], timeout: Optional[float] = 30.0) -> List:
+        """Queue rows for the next micro-batch and wait for their predictions"""
+        request = _PendingRequest(model_name, rows)
+        self.requests.put(request)
+        return request.future.result(timeout)
+
+    def _batch_loop(self):
+        while True:
+            first = self.requests.get()
+            if first is None:
+                break
+            batch = [first]
+            size = len(first.rows)
+            deadline = time.perf_counter() + self.batch_window
+            # Collect requests that arrive within the window, up to max_batch rows
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self.requests.get(timeout=remaining) if remaining > 0 \
+                        else self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)
+                    break
+                batch.append(request)
+                size += len(request.rows)
+
+            by_model: Dict[str, List[_PendingRequest]] = {}
+            for request in batch:
+                by_model.setdefault(request.model_name, []).append(request)
+            for model_name, requests in by_model.items():
+                self._run_batch(model_name, requests)
+
+    def _run_batch(self, model_name: str, requests: List[_PendingRequest]):
+        try:
+            served = self.get_model(model_name)
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        # A malformed request fails on its own instead of failing the whole batch
+        valid, matrices = [], []
+        for request in requests:
+            try:
+                matrices.append(served.transform(request.rows))
+            except Exception as e:
+                request.future.set_exception(e)
+                continue
+            valid.append(request)
+        if not valid:
+            return
+
+        try:
+            predictions = served.model.predict(np.vstack(matrices)).tolist()
+        except Exception as e:
+            for request in valid:
+                request.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.batched_rows += len(predictions)
+        offset = 0
+        for request in valid:
+            request.future.set_result(predictions[offset:offset + len(request.rows)])
+            offset += len(request.rows)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8080) -> str:
+        """Start the HTTP endpoint: POST /predict/<model> with {"rows": [{feature: value}, ...]}"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                try:
+                    if not self.path.startswith("/predict/"):
+                        raise FileNotFoundError(f"Unknown path {self.path}")
+                    length = int(self.headers.get("Content-Length") or 0)
+                    payload = json.loads(self.rfile.read(length))
+                    predictions = server.predict(self.path[len("/predict/"):], payload["rows"])
+                    status, body = 200, {"predictions": predictions}
+                except FileNotFoundError as e:
+                    status, body = 404, {"error": str(e)}
+                except Exception as e:
+                    status, body = 400, {"error": str(e)}
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.http_server = ThreadingHTTPServer((host, port), Handler)
+        self.http_server.daemon_threads = True
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+        url = f"http://{host}:{self.http_server.server_address[1]}"
+        logging.info(f"Prediction server listening on {url}")
+        return url
+
+    def close(self):
+        if self.http_server:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+        self.requests.put(None)
+        self.worker.join()
+
+    def benchmark(self, model_name: str, sample_rows: List[Dict],
+                  windows: Tuple[float, ...] = (0.0, 0.001, 0.002, 0.005, 0.01),
+                  clients: int = 16, requests_per_client: int = 100) -> List[Dict]:
+        """Throughput and tail latency of single-row requests from concurrent clients per batch window"""
+        self.get_model(model_name)
+        results = []
+        for window in windows:
+            self.batch_window = window
+            self.batches = self.batched_rows = 0
+            latencies: List[float] = []
+            lock = threading.Lock()
+
+            def client(offset: int):
+                local = []
+                for i in range(requests_per_client):
+                    row = sample_rows[(offset + i) % len(sample_rows)]
+                    start = time.perf_counter()
+                    self.predict(model_name, [row])
+                    local.append(time.perf_counter() - start)
+                with lock:
+                    latencies.extend(local)
+
+            threads = [threading.Thread(target=client, args=(n * requests_per_client,))
+                       for n in range(clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            latencies.sort()
+            results.append({
+                "batch_window_ms": window * 1000,
+                "requests": len(latencies),
+                "throughput": len(latencies) / elapsed,
+                "mean_batch": self.batched_rows / self.batches if self.batches else 0.0,
+                "p50_ms": latencies[len(latencies) // 2] * 1000,
+                "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            })
+        return results
+
 def main():
     manager = ModelManager()
+    server = None
     
     while True:
         print("\nMachine Learning Model Manager")
@@ -323,9 +1117,13 @@ def main():
         print("6. Make Predictions")
         print("7. Plot Feature Importance")
         print("8. Plot Confusion Matrix")
-        print("9. Exit")
+        print("9. Train on Large CSV (streaming)")
+        print("10. Hyperparameter Search")
+        print("11. Start Prediction Server")
+        print("12. Benchmark Prediction Serving")
+        print("13. Exit")
         
-        choice = input("\nEnter your choice (1-9): ")
+        choice = input("\nEnter your choice (1-13): ")
         
         if choice == "1":
             file_path = input("Enter dataset path: ")
@@ -404,6 +1202,82 @@ def main():
                 manager.plot_confusion_matrix(model_name)
         
         elif choice == "9":
+            file_path = input("Enter CSV path: ")
+            target = input("Enter target column name: ")
+            model_name = input("Enter model name: ")
+            test_size = float(input("Enter test size (0-1, default 0.2): ") or "0.2")
+            epochs = int(input("Enter number of passes over the data (default 1): ") or "1")
+
+            from sklearn.linear_model import SGDClassifier
+            model = SGDClassifier()
+
+            metrics = manager.train_streaming(file_path, target, ModelType.CLASSIFICATION, model_name,
+                                              model, test_size=test_size, epochs=epochs)
+            if metrics:
+                print("\nHoldout Metrics:")
+                for metric, value in metrics.items():
+                    print(f"{metric}: {value:.4f}")
+            else:
+                print("Failed to train model!")
+
+        elif choice == "10":
+            model_name = input("Enter model name: ")
+            print("\nSearch Strategies:")
+            print("1. Grid")
+            print("2. Random")
+            print("3. Successive Halving")
+            strategies = {"1": SearchStrategy.GRID, "2": SearchStrategy.RANDOM, "3": SearchStrategy.HALVING}
+            strategy = strategies.get(input("Choose strategy (1-3): "), SearchStrategy.GRID)
+
+            # This is a simplified version - a fixed search space for a random forest
+            from sklearn.ensemble import RandomForestClassifier
+            param_space = {
+                "n_estimators": [50, 100, 200],
+                "max_depth": [None, 10, 20],
+                "min_samples_leaf": [1, 5]
+            }
+            result = manager.search_hyperparameters(ModelType.CLASSIFICATION, model_name,
+                                                    RandomForestClassifier(), param_space, strategy)
+            if result:
+                print(f"\nBest Parameters: {result['best_params']}")
+                print(f"Best Score: {result['best_score']:.4f}")
+                print(f"Trials: {len(result['trials'])} in {result['wall_time']:.1f}s "
+                      f"({result['sequential_time']:.1f}s of fitting)")
+            else:
+                print("Failed to run search!")
+
+        elif choice == "11":
+            if server is None:
+                server = ModelServer(manager.models_dir)
+            port = int(input("Enter port (default 8080): ") or "8080")
+            url = server.serve(port=port)
+            print(f"Serving POST {url}/predict/<model name> with JSON {{\"rows\": [...]}}")
+
+        elif choice == "12":
+            model_name = input("Enter model name: ")
+            if manager.current_data is None:
+                print("Please load the model's dataset first!")
+                continue
+            # Raw rows from the file; the loaded copy may already be encoded in place
+            file_path = manager.current_data['file_path']
+            sample = pd.read_csv(file_path, nrows=1000) if file_path.suffix.lower() == '.csv' \
+                else manager._read_file(file_path).head(1000)
+            sample_rows = sample.drop(columns=[manager.current_data['target']]).to_dict('records')
+            if server is None:
+                server = ModelServer(manager.models_dir)
+            try:
+                results = server.benchmark(model_name, sample_rows)
+            except Exception as e:
+                print(f"Benchmark failed: {e}")
+                continue
+            print(f"\n{'Window (ms)':>12} {'Req/s':>10} {'Avg batch':>10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+            for row in results:
+                print(f"{row['batch_window_ms']:>12.1f} {row['throughput']:>10.0f} {row['mean_batch']:>10.1f} "
+                      f"{row['p50_ms']:>10.2f} {row['p99_ms']:>10.2f}")
+
+        elif choice == "13":
+            if server is not None:
+                server.close()
             print("Thank you for using Machine Learning Model Manager!")
             break
         
@@ -4,13 +4,20 @@ from pathlib import Path
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 import threading
 import queue
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
+import numpy as np
 import time
+import socket
+import struct
+import random
+import multiprocessing
+from typing import Iterator
+from collections import OrderedDict
 
 class PacketType:
     TCP = "TCP"
@@ -21,20 +28,782 @@ class PacketType:
     DNS = "DNS"
     OTHER = "OTHER"
 
+class SizeHistogram:
+    """Fixed-bucket packet size histogram with exact count/min/max/sum"""
+
+    BUCKET_WIDTH = 32
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def add(self, size: int, count: int = 1):
+        bucket = size // self.BUCKET_WIDTH
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += count
+        self.total += size * count
+        self.min = size if self.min is None else min(self.min, size)
+        self.max = size if self.max is None else max(self.max, size)
+
+    def merge(self, other: 'SizeHistogram'):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating inside the matching bucket"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            count = self.buckets[bucket]
+            if seen + count >= target:
+                low = bucket * self.BUCKET_WIDTH
+                value = low + (target - seen) / count * self.BUCKET_WIDTH
+                return min(max(value, self.min), self.max)
+            seen += count
+        return float(self.max)
+
+    def items(self) -> List[Tuple[int, int]]:
+        """(bucket start, count) pairs in size order"""
+        return [(bucket * self.BUCKET_WIDTH, self.buckets[bucket]) for bucket in sorted(self.buckets)]
+
+    def to_dict(self) -> dict:
+        return {"bucket_width": self.BUCKET_WIDTH, "buckets": self.buckets, "count": self.count,
+                "total": self.total, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SizeHistogram':
+        hist = cls()
+        hist.buckets = {int(bucket): count for bucket, count in data["buckets"].items()}
+        hist.count = data["count"]
+        hist.total = data["total"]
+        hist.min = data["min"]
+        hist.max = data["max"]
+        return hist
+
+class RingCounter:
+    """Packet counts per time slot, keeping only the most recent slots"""
+
+    def __init__(self, slot_seconds: int, slots: int):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.counts = [0] * slots
+        self.epochs = [-1] * slots
+
+    def add(self, timestamp: float, count: int = 1):
+        self._add_slot(int(timestamp // self.slot_seconds), count)
+
+    def _add_slot(self, slot: int, count: int):
+        index = slot % self.slots
+        if self.epochs[index] != slot:
+            if self.epochs[index] > slot:
+                return  # older than the retained window
+            self.epochs[index] = slot
+            self.counts[index] = 0
+        self.counts[index] += count
+
+    def merge(self, other: 'RingCounter'):
+        for slot, count in zip(other.epochs, other.counts):
+            if slot >= 0:
+                self._add_slot(slot, count)
+
+    def items(self) -> List[Tuple[float, int]]:
+        """(slot start timestamp, count) pairs in time order"""
+        return sorted((slot * self.slot_seconds, count)
+                      for slot, count in zip(self.epochs, self.counts) if slot >= 0)
+
+    def to_dict(self) -> dict:
+        return {"slot_seconds": self.slot_seconds, "slots": self.slots,
+                "items": [[slot, count] for slot, count in zip(self.epochs, self.counts) if slot >= 0]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RingCounter':
+        ring = cls(data["slot_seconds"], data["slots"])
+        for slot, count in data["items"]:
+            ring._add_slot(slot, count)
+        return ring
+
+class SpaceSaving:
+    """Top-k heavy hitters in bounded memory; counts may overestimate by at most 'floor'"""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts: Dict = {}
+        self.floor = 0
+
+    def add(self, key, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+            return
+        self.counts[key] = self.floor + count
+        # Prune in batches so eviction is amortised O(log k) per insert
+        if len(self.counts) >= 2 * self.capacity:
+            self._prune()
+
+    def _prune(self):
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        self.floor = max(self.floor, ranked[self.capacity][1])
+        self.counts = dict(ranked[:self.capacity])
+
+    def merge(self, other: 'SpaceSaving'):
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, self.floor) + count
+        self.floor += other.floor
+        if len(self.counts) > self.capacity:
+            self._prune()
+
+    def top(self, n: Optional[int] = None) -> Dict:
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return dict(ranked[:n or self.capacity])
+
+    def to_dict(self) -> dict:
+        return {"capacity": self.capacity, "floor": self.floor, "counts": self.top()}
+
+    @classmethod
+    def from_dict(cls, data: dict, key_type=str) -> 'SpaceSaving':
+        sketch = cls(data["capacity"])
+        sketch.floor = data["floor"]
+        sketch.counts = {key_type(key): count for key, count in data["counts"].items()}
+        return sketch
+
+class TrafficStats:
+    """Constant-memory streaming aggregates of captured traffic"""
+
+    def __init__(self):
+        self.total_packets = 0
+        self.protocols: Dict[str, int] = {}
+        self.ip_addresses = SpaceSaving()
+        self.ports = SpaceSaving()
+        self.packet_sizes = SizeHistogram()
+        self.per_second = RingCounter(1, 3600)
+        self.per_minute = RingCounter(60, 1440)
+
+    def record(self, protocol: str, size: int, timestamp: float):
+        self.total_packets += 1
+        self.protocols[protocol] = self.protocols.get(protocol, 0) + 1
+        self.packet_sizes.add(size)
+        self.per_second.add(timestamp)
+        self.per_minute.add(timestamp)
+
+    def record_batch(self, columns: Dict):
+        """Fold a decoded batch into the aggregates with vectorized group-bys"""
+        stats = self
+        sizes = columns["size"]
+        if not sizes.size:
+            return
+        stats.total_packets += int(sizes.size)
+
+        for code, count in enumerate(np.bincount(columns["protocol"], minlength=len(PROTOCOL_CODES))):
+            if count:
+                protocol = PROTOCOL_CODES[code]
+                stats.protocols[protocol] = stats.protocols.get(protocol, 0) + int(count)
+
+        hist = SizeHistogram()
+        bucket_counts = np.bincount(sizes // SizeHistogram.BUCKET_WIDTH)
+        hist.buckets = {int(bucket): int(bucket_counts[bucket]) for bucket in np.flatnonzero(bucket_counts)}
+        hist.count = int(sizes.size)
+        hist.total = int(sizes.sum())
+        hist.min = int(sizes.min())
+        hist.max = int(sizes.max())
+        stats.packet_sizes.merge(hist)
+
+        for ring in (stats.per_second, stats.per_minute):
+            slots, counts = np.unique((columns["ts"] // ring.slot_seconds).astype(np.int64),
+                                      return_counts=True)
+            for slot, count in zip(slots.tolist(), counts.tolist()):
+                ring._add_slot(slot, count)
+
+    def record_flow(self, flow: 'FlowRecord'):
+        """Fold a finished flow into the IP and port counts"""
+        self.ip_addresses.add(flow.src_ip, flow.packets)
+        self.ip_addresses.add(flow.dst_ip, flow.packets)
+        if flow.proto == 6:
+            self.ports.add(flow.src_port, flow.packets)
+            self.ports.add(flow.dst_port, flow.packets)
+
+    def merge(self, other: 'TrafficStats'):
+        self.total_packets += other.total_packets
+        for protocol, count in other.protocols.items():
+            self.protocols[protocol] = self.protocols.get(protocol, 0) + count
+        self.ip_addresses.merge(other.ip_addresses)
+        self.ports.merge(other.ports)
+        self.packet_sizes.merge(other.packet_sizes)
+        self.per_second.merge(other.per_second)
+        self.per_minute.merge(other.per_minute)
+
+    def to_dict(self) -> dict:
+        return {
+            "total_packets": self.total_packets,
+            "protocols": self.protocols,
+            "ip_addresses": self.ip_addresses.to_dict(),
+            "ports": self.ports.to_dict(),
+            "packet_sizes": self.packet_sizes.to_dict(),
+            "per_second": self.per_second.to_dict(),
+            "per_minute": self.per_minute.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TrafficStats':
+        stats = cls()
+        stats.total_packets = data["total_packets"]
+        stats.protocols = data["protocols"]
+
+        if isinstance(data["packet_sizes"], list):
+            # Older stats files kept every packet size and timestamp
+            for ip, count in data["ip_addresses"].items():
+                stats.ip_addresses.add(ip, count)
+            for port, count in data["ports"].items():
+                stats.ports.add(int(port), count)
+            for size in data["packet_sizes"]:
+                stats.packet_sizes.add(size)
+            for timestamp in data.get("timestamps", []):
+                ts = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").timestamp()
+                stats.per_second.add(ts)
+                stats.per_minute.add(ts)
+            return stats
+
+        stats.ip_addresses = SpaceSaving.from_dict(data["ip_addresses"])
+        stats.ports = SpaceSaving.from_dict(data["ports"], int)
+        stats.packet_sizes = SizeHistogram.from_dict(data["packet_sizes"])
+        stats.per_second = RingCounter.from_dict(data["per_second"])
+        stats.per_minute = RingCounter.from_dict(data["per_minute"])
+        return stats
+
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
+class FlowRecord:
+    """Counters for one bidirectional 5-tuple flow; src is the side that sent first"""
+
+    __slots__ = ("src_ip", "dst_ip", "src_port", "dst_port", "proto", "first_seen",
+                 "last_seen", "packets", "bytes", "tcp_flags", "syn_time", "rtt")
+
+    def __init__(self, src_ip: str, dst_ip: str, src_port: int, dst_port: int,
+                 proto: int, timestamp: float):
+        self.src_ip = src_ip
+        self.dst_ip = dst_ip
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self.proto = proto
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.packets = 0
+        self.bytes = 0
+        self.tcp_flags = 0
+        self.syn_time: Optional[float] = None
+        self.rtt: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return self.last_seen - self.first_seen
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != "syn_time"}
+
+class FlowTable:
+    """Connection tracking table with idle/active timeouts and LRU eviction"""
+
+    def __init__(self, on_export, max_flows: int = 1000000, idle_timeout: float = 30.0,
+                 active_timeout: float = 300.0, closed_linger: float = 2.0):
+        self.on_export = on_export
+        self.max_flows = max_flows
+        self.idle_timeout = idle_timeout
+        self.active_timeout = active_timeout
+        self.closed_linger = closed_linger
+        # Least recently seen flow first
+        self.flows: "OrderedDict[tuple, FlowRecord]" = OrderedDict()
+        self.closed: Set[tuple] = set()
+        self.last_sweep = 0.0
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(src_ip: str, dst_ip: str, src_port: int, dst_port: int, proto: int) -> tuple:
+        a, b = (src_ip, src_port), (dst_ip, dst_port)
+        return (a + b if a <= b else b + a) + (proto,)
+
+    def add(self, src_ip: str, dst_ip: str, src_port: int, dst_port: int, proto: int,
+            first_seen: float, last_seen: float, packets: int, size: int, tcp_flags: int = 0):
+        """Account packets of one flow; a single packet passes first_seen == last_seen"""
+        key = self._key(src_ip, dst_ip, src_port, dst_port, proto)
+        with self.lock:
+            flow = self.flows.get(key)
+            if flow is not None and first_seen - flow.first_seen >= self.active_timeout:
+                self._export(key)
+                flow = None
+            if flow is None:
+                if len(self.flows) >= self.max_flows:
+                    self._export(next(iter(self.flows)))
+                    self.evicted += 1
+                flow = FlowRecord(src_ip, dst_ip, src_port, dst_port, proto, first_seen)
+                self.flows[key] = flow
+            else:
+                self.flows.move_to_end(key)
+
+            flow.packets += packets
+            flow.bytes += size
+            flow.last_seen = max(flow.last_seen, last_seen)
+            flow.tcp_flags |= tcp_flags
+            if tcp_flags & (TCP_FIN | TCP_RST):
+                self.closed.add(key)
+
+        if last_seen - self.last_sweep >= 1.0:
+            self.expire(last_seen)
+
+    def track_handshake(self, src_ip: str, dst_ip: str, src_port: int, dst_port: int,
+                        timestamp: float, tcp_flags: int):
+        """Estimate RTT as the time between a SYN and the matching SYN-ACK"""
+        with self.lock:
+            flow = self.flows.get(self._key(src_ip, dst_ip, src_port, dst_port, 6))
+            if flow is None or flow.rtt is not None:
+                return
+            initiator = (src_ip, src_port) == (flow.src_ip, flow.src_port)
+            if tcp_flags & TCP_SYN and not tcp_flags & TCP_ACK and initiator:
+                flow.syn_time = timestamp
+            elif tcp_flags & TCP_SYN and tcp_flags & TCP_ACK and not initiator \
+                    and flow.syn_time is not None:
+                flow.rtt = timestamp - flow.syn_time
+
+    def expire(self, now: float):
+        """Export flows that went idle or were closed"""
+        with self.lock:
+            self.last_sweep = now
+            while self.flows:
+                key, flow = next(iter(self.flows.items()))
+                if flow.last_seen + self.idle_timeout > now:
+                    break
+                self._export(key)
+            for key in [key for key in self.closed
+                        if self.flows[key].last_seen + self.closed_linger <= now]:
+                self._export(key)
+
+    def flush(self):
+        """Export every active flow"""
+        with self.lock:
+            while self.flows:
+                self._export(next(iter(self.flows)))
+
+    def _export(self, key: tuple):
+        flow = self.flows.pop(key)
+        self.closed.discard(key)
+        self.on_export(flow)
+
+    def snapshot(self) -> List[FlowRecord]:
+        with self.lock:
+            return list(self.flows.values())
+
+def add_flow_batch(flows: FlowTable, columns: Dict):
+    """Group a decoded batch by 5-tuple and update the flow table once per flow"""
+    ipv4 = columns["ipv4"]
+    if not ipv4.any():
+        return
+    src = (columns["src_ip"][ipv4].astype(np.uint64) << 16) | columns["src_port"][ipv4].astype(np.uint64)
+    dst = (columns["dst_ip"][ipv4].astype(np.uint64) << 16) | columns["dst_port"][ipv4].astype(np.uint64)
+    proto = columns["proto"][ipv4].astype(np.uint64)
+    keys = np.stack([np.minimum(src, dst), np.maximum(src, dst), proto], axis=1)
+    _, first, inverse, packets = np.unique(keys, axis=0, return_index=True,
+                                           return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+
+    ts = columns["ts"][ipv4]
+    sizes = columns["size"][ipv4]
+    flags = columns["tcp_flags"][ipv4]
+    groups = packets.size
+    size_sum = np.bincount(inverse, weights=sizes, minlength=groups)
+    first_seen = np.full(groups, np.inf)
+    last_seen = np.full(groups, -np.inf)
+    flag_or = np.zeros(groups, dtype=np.int64)
+    np.minimum.at(first_seen, inverse, ts)
+    np.maximum.at(last_seen, inverse, ts)
+    np.bitwise_or.at(flag_or, inverse, flags)
+
+    src_ip = columns["src_ip"][ipv4]
+    dst_ip = columns["dst_ip"][ipv4]
+    sport = columns["src_port"][ipv4]
+    dport = columns["dst_port"][ipv4]
+    for group, index in enumerate(first.tolist()):
+        # The first packet of the group decides the flow's direction
+        flows.add(socket.inet_ntoa(int(src_ip[index]).to_bytes(4, 'big')),
+                  socket.inet_ntoa(int(dst_ip[index]).to_bytes(4, 'big')),
+                  int(sport[index]), int(dport[index]), int(proto[index]),
+                  float(first_seen[group]), float(last_seen[group]),
+                  int(packets[group]), int(size_sum[group]), int(flag_or[group]))
+
+    for index in np.flatnonzero((proto == 6) & ((flags & TCP_SYN) != 0)).tolist():
+        flows.track_handshake(socket.inet_ntoa(int(src_ip[index]).to_bytes(4, 'big')),
+                              socket.inet_ntoa(int(dst_ip[index]).to_bytes(4, 'big')),
+                              int(sport[index]), int(dport[index]),
+                              float(ts[index]), int(flags[index]))
+
+FLOW_RECORD = struct.Struct('<16s16sHHBBddQQf')
+FLOW_FILE_MAGIC = b'FLOW\x01'
+
+class FlowExporter:
+    """Appends expired flows to a compact fixed-size binary file"""
+
+    def __init__(self, path: Path, buffer_records: int = 4096):
+        self.path = Path(path)
+        self.buffer_records = buffer_records
+        self.buffer: List[bytes] = []
+        self.exported = 0
+
+    def write(self, flow: FlowRecord):
+        self.buffer.append(FLOW_RECORD.pack(
+            socket.inet_pton(socket.AF_INET6, '::ffff:' + flow.src_ip),
+            socket.inet_pton(socket.AF_INET6, '::ffff:' + flow.dst_ip),
+            flow.src_port, flow.dst_port, flow.proto, flow.tcp_flags & 0xFF,
+            flow.first_seen, flow.last_seen, flow.packets, flow.bytes,
+            -1.0 if flow.rtt is None else flow.rtt))
+        self.exported += 1
+        if len(self.buffer) >= self.buffer_records:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        new_file = not self.path.exists()
+        with open(self.path, 'ab') as f:
+            if new_file:
+                f.write(FLOW_FILE_MAGIC)
+            f.write(b''.join(self.buffer))
+        self.buffer = []
+
+def read_flow_records(path: str) -> Iterator[dict]:
+    """Read flows written by FlowExporter"""
+    with open(path, 'rb') as f:
+        if f.read(len(FLOW_FILE_MAGIC)) != FLOW_FILE_MAGIC:
+            raise ValueError(f"Not a flow export file: {path}")
+        while True:
+            data = f.read(FLOW_RECORD.size)
+            if len(data) < FLOW_RECORD.size:
+                break
+            src, dst, sport, dport, proto, flags, first, last, packets, size, rtt = FLOW_RECORD.unpack(data)
+            yield {
+                "src_ip": socket.inet_ntop(socket.AF_INET, src[12:]),
+                "dst_ip": socket.inet_ntop(socket.AF_INET, dst[12:]),
+                "src_port": sport, "dst_port": dport, "proto": proto, "tcp_flags": flags,
+                "first_seen": first, "last_seen": last, "packets": packets, "bytes": size,
+                "rtt": None if rtt < 0 else rtt
+            }
+
+# Protocol order used for the vectorized classification codes
+PROTOCOL_CODES = [PacketType.OTHER, PacketType.ICMP, PacketType.UDP, PacketType.DNS,
+                  PacketType.TCP, PacketType.HTTPS, PacketType.HTTP]
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = (101, 228, 229)
+
+class PcapFileReader:
+    """Minimal pcap/pcapng reader that yields batches of packet offsets into large read windows"""
+
+    def __init__(self, path: str, chunk_size: int = 32 * 1024 * 1024):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.endian = '<'
+        self.scale = 1e-6
+        self.linktype = LINKTYPE_ETHERNET
+        self.interfaces: List[Tuple[int, float]] = []  # pcapng (linktype, seconds per unit)
+        self.header_read = False
+
+    def batches(self) -> Iterator[dict]:
+        with open(self.path, 'rb') as f:
+            pcapng = f.read(4) == b'\x0a\x0d\x0d\x0a'
+            f.seek(0)
+            parse = self._parse_pcapng if pcapng else self._parse_pcap
+
+            buf = b''
+            while True:
+                data = f.read(self.chunk_size)
+                if data:
+                    buf = buf + data if buf else data
+                consumed, offsets, caplens, timestamps, linktypes = parse(buf)
+                if offsets:
+                    yield {
+                        "data": np.frombuffer(buf, dtype=np.uint8),
+                        "offsets": np.array(offsets, dtype=np.int64),
+                        "caplen": np.array(caplens, dtype=np.int64),
+                        "ts": np.array(timestamps, dtype=np.float64),
+                        "linktype": np.array(linktypes, dtype=np.int64)
+                    }
+                buf = buf[consumed:]
+                if not data:
+                    break
+
+    def _parse_pcap(self, buf: bytes):
+        """Parse every complete record in buf; returns bytes consumed and columns"""
+        pos = 0
+        if not self.header_read:
+            if len(buf) < 24:
+                return 0, [], [], [], []
+            formats = {
+                b'\xd4\xc3\xb2\xa1': ('<', 1e-6), b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+                b'\x4d\x3c\xb2\xa1': ('<', 1e-9), b'\xa1\xb2\x3c\x4d': ('>', 1e-9)
+            }
+            if buf[:4] not in formats:
+                raise ValueError(f"Not a pcap file: {self.path}")
+            self.endian, self.scale = formats[buf[:4]]
+            self.linktype = struct.unpack_from(self.endian + 'I', buf, 20)[0]
+            self.header_read = True
+            pos = 24
+
+        record = struct.Struct(self.endian + 'IIII')
+        scale = self.scale
+        size = len(buf)
+        offsets, caplens, timestamps = [], [], []
+        while pos + 16 <= size:
+            ts_sec, ts_frac, caplen, _ = record.unpack_from(buf, pos)
+            if pos + 16 + caplen > size:
+                break  # record continues in the next window
+            offsets.append(pos + 16)
+            caplens.append(caplen)
+            timestamps.append(ts_sec + ts_frac * scale)
+            pos += 16 + caplen
+        return pos, offsets, caplens, timestamps, [self.linktype] * len(offsets)
+
+    def _parse_pcapng(self, buf: bytes):
+        """Parse every complete block in buf; returns bytes consumed and columns"""
+        size = len(buf)
+        pos = 0
+        offsets, caplens, timestamps, linktypes = [], [], [], []
+
+        while pos + 12 <= size:
+            block_type = struct.unpack_from(self.endian + 'I', buf, pos)[0]
+            if block_type == 0x0A0D0D0A:
+                self.endian = '<' if buf[pos + 8:pos + 12] == b'\x4d\x3c\x2b\x1a' else '>'
+                self.interfaces = []
+            block_len = struct.unpack_from(self.endian + 'I', buf, pos + 4)[0]
+            if block_len < 12:
+                raise ValueError(f"Corrupt pcapng block in {self.path}")
+            if pos + block_len > size:
+                break  # block continues in the next window
+
+            if block_type == 1:
+                linktype = struct.unpack_from(self.endian + 'H', buf, pos + 8)[0]
+                self.interfaces.append(
+                    (linktype, self._tsresol(buf, self.endian, pos + 16, pos + block_len - 4)))
+            elif block_type == 6:
+                iface, ts_high, ts_low, caplen = struct.unpack_from(self.endian + 'IIII', buf, pos + 8)
+                linktype, resolution = (self.interfaces[iface] if iface < len(self.interfaces)
+                                        else (LINKTYPE_ETHERNET, 1e-6))
+                offsets.append(pos + 28)
+                caplens.append(caplen)
+                timestamps.append(((ts_high << 32) | ts_low) * resolution)
+                linktypes.append(linktype)
+            elif block_type == 3:
+                orig_len = struct.unpack_from(self.endian + 'I', buf, pos + 8)[0]
+                offsets.append(pos + 12)
+                caplens.append(min(orig_len, block_len - 16))
+                timestamps.append(0.0)
+                linktypes.append(self.interfaces[0][0] if self.interfaces else LINKTYPE_ETHERNET)
+            pos += block_len
+        return pos, offsets, caplens, timestamps, linktypes
+
+    @staticmethod
+    def _tsresol(buf: bytes, endian: str, pos: int, end: int) -> float:
+        """Read the if_tsresol option of an interface description block"""
+        while pos + 4 <= end:
+            code, length = struct.unpack_from(endian + 'HH', buf, pos)
+            if code == 0:
+                break
+            if code == 9 and length >= 1:
+                value = buf[pos + 4]
+                return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+            pos += 4 + (length + 3) // 4 * 4
+        return 1e-6
+
+def decode_batch(batch: dict) -> dict:
+    """Decode Ethernet/IP/TCP/UDP header fields of a batch into columnar arrays"""
+    buf = batch["data"]
+    last = buf.size - 1
+    off = batch["offsets"]
+    end = off + batch["caplen"]
+
+    def u8(idx):
+        return buf[np.minimum(idx, last)].astype(np.uint32)
+
+    def u16(idx):
+        return (u8(idx) << 8) | u8(idx + 1)
+
+    def u32(idx):
+        return (u16(idx) << 16) | u16(idx + 2)
+
+    ethernet = batch["linktype"] == LINKTYPE_ETHERNET
+    raw = np.isin(batch["linktype"], LINKTYPE_RAW)
+    ethertype = np.where(ethernet & (off + 14 <= end), u16(off + 12), 0)
+    vlan = ethernet & (ethertype == 0x8100) & (off + 18 <= end)
+    ethertype = np.where(vlan, u16(off + 16), ethertype)
+    l3 = off + np.where(vlan, 18, np.where(ethernet, 14, 0))
+
+    version = u8(l3) >> 4
+    ethertype = np.where(raw & (version == 4), 0x0800, np.where(raw & (version == 6), 0x86DD, ethertype))
+    ipv4 = (ethertype == 0x0800) & (l3 + 20 <= end)
+    ipv6 = (ethertype == 0x86DD) & (l3 + 40 <= end)
+
+    proto = np.where(ipv4, u8(l3 + 9), np.where(ipv6, u8(l3 + 6), 0))
+    l4 = np.where(ipv4, l3 + (u8(l3) & 0x0F) * 4, l3 + 40)
+    has_ports = (ipv4 | ipv6) & (l4 + 4 <= end)
+    tcp = has_ports & (proto == 6)
+    udp = has_ports & (proto == 17)
+    sport = np.where(has_ports, u16(l4), 0)
+    dport = np.where(has_ports, u16(l4 + 2), 0)
+    tcp_flags = np.where(tcp & (l4 + 14 <= end), u8(l4 + 13), 0)
+
+    code = np.zeros(off.size, dtype=np.int64)
+    code[ipv4 & (proto == 1)] = PROTOCOL_CODES.index(PacketType.ICMP)
+    code[udp] = PROTOCOL_CODES.index(PacketType.UDP)
+    code[udp & ((sport == 53) | (dport == 53))] = PROTOCOL_CODES.index(PacketType.DNS)
+    code[tcp] = PROTOCOL_CODES.index(PacketType.TCP)
+    code[tcp & ((sport == 443) | (dport == 443))] = PROTOCOL_CODES.index(PacketType.HTTPS)
+    code[tcp & ((sport == 80) | (dport == 80))] = PROTOCOL_CODES.index(PacketType.HTTP)
+
+    return {
+        "ts": batch["ts"],
+        "size": batch["caplen"],
+        "protocol": code,
+        "ipv4": ipv4,
+        "src_ip": np.where(ipv4, u32(l3 + 12), 0),
+        "dst_ip": np.where(ipv4, u32(l3 + 16), 0),
+        "tcp": tcp,
+        "udp": udp,
+        "proto": proto,
+        "src_port": sport,
+        "dst_port": dport,
+        "tcp_flags": tcp_flags
+    }
+
+def write_synthetic_pcap(path: str, packet_count: int = 200000, seed: int = 42):
+    """Write an Ethernet/IPv4 TCP+UDP capture for benchmarking"""
+    rng = random.Random(seed)
+    hosts = [bytes([10, 0, rng.randrange(256), rng.randrange(1, 255)]) for _ in range(500)]
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, LINKTYPE_ETHERNET))
+        start = 1700000000.0
+        for i in range(packet_count):
+            udp = rng.random() < 0.2
+            payload = bytes(rng.randrange(0, 1400))
+            sport = rng.choice([53, 5353]) if udp else rng.randrange(1024, 65536)
+            dport = rng.choice([53, 123]) if udp else rng.choice([80, 443, 22, 8080])
+            if udp:
+                l4 = struct.pack('!HHHH', sport, dport, 8 + len(payload), 0)
+            else:
+                l4 = struct.pack('!HHIIBBHHH', sport, dport, i, 0, 0x50, 0x18, 65535, 0, 0)
+            total = 20 + len(l4) + len(payload)
+            ip = struct.pack('!BBHHHBBH4s4s', 0x45, 0, total, 0, 0, 64, 17 if udp else 6, 0,
+                             rng.choice(hosts), rng.choice(hosts))
+            frame = b'\x00' * 12 + b'\x08\x00' + ip + l4 + payload
+            ts = start + i * 0.0005
+            f.write(struct.pack('<IIII', int(ts), int(ts % 1 * 1e6), len(frame), len(frame)))
+            f.write(frame)
+
+def flow_shard(frame: bytes, linktype: int, shards: int) -> int:
+    """Pick a shard from the direction-independent 5-tuple of a raw frame"""
+    l3 = 0
+    ethertype = 0
+    if linktype == LINKTYPE_ETHERNET:
+        if len(frame) < 14:
+            return 0
+        ethertype = struct.unpack_from('!H', frame, 12)[0]
+        l3 = 14
+        if ethertype == 0x8100 and len(frame) >= 18:
+            ethertype = struct.unpack_from('!H', frame, 16)[0]
+            l3 = 18
+    elif frame:
+        ethertype = 0x0800 if frame[0] >> 4 == 4 else 0x86DD
+
+    if ethertype == 0x0800 and len(frame) >= l3 + 20:
+        proto = frame[l3 + 9]
+        src, dst = frame[l3 + 12:l3 + 16], frame[l3 + 16:l3 + 20]
+        l4 = l3 + (frame[l3] & 0x0F) * 4
+    elif ethertype == 0x86DD and len(frame) >= l3 + 40:
+        proto = frame[l3 + 6]
+        src, dst = frame[l3 + 8:l3 + 24], frame[l3 + 24:l3 + 40]
+        l4 = l3 + 40
+    else:
+        return 0
+
+    sport = dport = 0
+    if proto in (6, 17) and len(frame) >= l4 + 4:
+        sport, dport = struct.unpack_from('!HH', frame, l4)
+    # Both directions of a flow land on the same shard
+    key = min((src, sport), (dst, dport)) + max((src, sport), (dst, dport)) + (proto,)
+    return hash(key) % shards
+
+def frames_to_batch(frames: List[Tuple[bytes, float, int]]) -> dict:
+    """Pack (raw frame, timestamp, linktype) tuples into a decode_batch input"""
+    caplens = np.array([len(frame) for frame, _, _ in frames], dtype=np.int64)
+    offsets = np.zeros(len(frames), dtype=np.int64)
+    np.cumsum(caplens[:-1], out=offsets[1:])
+    return {
+        "data": np.frombuffer(b''.join(frame for frame, _, _ in frames), dtype=np.uint8),
+        "offsets": offsets,
+        "caplen": caplens,
+        "ts": np.array([ts for _, ts, _ in frames], dtype=np.float64),
+        "linktype": np.array([linktype for _, _, linktype in frames], dtype=np.int64)
+    }
+
+def _shard_worker(in_queue, out_queue, merge_interval: float):
+    """Analysis worker: keeps local aggregates and ships them for merging periodically"""
+    stats = TrafficStats()
+    expired: List[FlowRecord] = []
+
+    def export(flow: FlowRecord):
+        stats.record_flow(flow)
+        expired.append(flow)
+
+    # Shards own whole flows because packets are routed by 5-tuple
+    flows = FlowTable(export)
+    last_merge = time.monotonic()
+    while True:
+        try:
+            frames = in_queue.get(timeout=0.5)
+        except queue.Empty:
+            frames = []
+
+        if frames is None:
+            break
+        if frames:
+            columns = decode_batch(frames_to_batch(frames))
+            stats.record_batch(columns)
+            add_flow_batch(flows, columns)
+        if stats.total_packets and time.monotonic() - last_merge >= merge_interval:
+            out_queue.put((stats, expired))
+            stats = TrafficStats()
+            expired = []
+            last_merge = time.monotonic()
+
+    flows.flush()
+    if stats.total_packets or expired:
+        out_queue.put((stats, expired))
+    out_queue.put(None)
+
+# Bounded queue sizes between the capture and analysis stages
+PACKET_QUEUE_CAPACITY = 100000
+SHARD_QUEUE_CAPACITY = 256
+SHARD_BATCH_SIZE = 256
+SHARD_FLUSH_SECONDS = 0.1
+
 class NetworkAnalyzer:
     def __init__(self):
         self.log_file = Path("network_analysis.log")
         self.stats_file = Path("traffic_stats.json")
         self.capture_active = False
-        self.packet_queue = queue.Queue()
-        self.stats = {
-            "total_packets": 0,
-            "protocols": {},
-            "ip_addresses": {},
-            "ports": {},
-            "packet_sizes": [],
-            "timestamps": []
-        }
+        self.packet_queue = queue.Queue(maxsize=PACKET_QUEUE_CAPACITY)
+        self.stats = TrafficStats()
+        self.workers = 0
+        self.captured_packets = 0
+        self.dropped_packets: Dict[str, int] = {}
+        self.flow_exporter = FlowExporter(Path("flows.bin"))
+        self.flows = FlowTable(self._export_flow)
         self.setup_logging()
         self.load_stats()
 
@@ -51,44 +820,170 @@ class NetworkAnalyzer:
         if self.stats_file.exists():
             try:
                 with open(self.stats_file, 'r') as f:
-                    self.stats = json.load(f)
-            except json.JSONDecodeError:
+                    self.stats = TrafficStats.from_dict(json.load(f))
+            except (json.JSONDecodeError, KeyError):
                 logging.error("Error loading statistics file")
 
     def save_stats(self):
         """Save traffic statistics"""
         with open(self.stats_file, 'w') as f:
-            json.dump(self.stats, f, indent=4)
+            json.dump(self.stats.to_dict(), f)
 
-    def start_capture(self, interface: str = None):
-        """Start packet capture"""
+    def start_capture(self, interface: str = None, workers: int = 0,
+                      merge_interval: float = 1.0):
+        """Start packet capture; with workers > 0 analysis is sharded across processes"""
         self.capture_active = True
+        self.workers = workers
+        self.captured_packets = 0
+        self.dropped_packets = {"analysis": 0} if workers <= 0 else {
+            f"shard_{i}": 0 for i in range(workers)}
+
+        if workers > 0:
+            self._start_shards(workers, merge_interval)
+            self.analysis_thread = threading.Thread(target=self._collect_shards)
+            on_packet = self._dispatch_packet
+        else:
+            self.analysis_thread = threading.Thread(target=self._analyze_packets)
+            on_packet = self._enqueue_packet
+
         self.capture_thread = threading.Thread(
             target=self._capture_packets,
-            args=(interface,)
+            args=(interface, on_packet)
         )
         self.capture_thread.start()
-        self.analysis_thread = threading.Thread(
-            target=self._analyze_packets
-        )
         self.analysis_thread.start()
-        logging.info("Packet capture started")
+        logging.info(f"Packet capture started ({workers or 'no'} analysis workers)")
 
     def stop_capture(self):
         """Stop packet capture"""
         self.capture_active = False
         self.capture_thread.join()
+        if self.workers > 0:
+            self._stop_shards()
         self.analysis_thread.join()
+        if self.workers > 0:
+            for process in self.shard_processes:
+                process.join()
+        self.flows.flush()
+        self.flow_exporter.flush()
         self.save_stats()
-        logging.info("Packet capture stopped")
+        logging.info(f"Packet capture stopped: {self.captured_packets} captured, "
+                     f"{sum(self.dropped_packets.values())} dropped")
+
+    def _enqueue_packet(self, packet):
+        """Hand a packet to the analysis thread, dropping it if the queue is full"""
+        self.captured_packets += 1
+        try:
+            self.packet_queue.put_nowait(packet)
+        except queue.Full:
+            self.dropped_packets["analysis"] += 1
+
+    def _start_shards(self, workers: int, merge_interval: float):
+        self.shard_queues = [multiprocessing.Queue(maxsize=SHARD_QUEUE_CAPACITY) for _ in range(workers)]
+        self.merge_queue = multiprocessing.Queue()
+        self.shard_pending: List[List[Tuple[bytes, float, int]]] = [[] for _ in range(workers)]
+        self.last_flush = time.monotonic()
+        # The capture thread fills batches; the collector thread also flushes them on a quiet link
+        self.shard_lock = threading.Lock()
+        self.shards_stopped = False
+        self.shard_processes = [
+            multiprocessing.Process(target=_shard_worker,
+                                    args=(shard_queue, self.merge_queue, merge_interval),
+                                    daemon=True)
+            for shard_queue in self.shard_queues
+        ]
+        for process in self.shard_processes:
+            process.start()
+
+    def _dispatch_packet(self, packet):
+        """Route a packet to its flow's shard in small batches"""
+        self.captured_packets += 1
+        linktype = LINKTYPE_ETHERNET if isinstance(packet, scapy.Ether) else LINKTYPE_RAW[0]
+        frame = bytes(packet)
+        shard = flow_shard(frame, linktype, self.workers)
+        with self.shard_lock:
+            pending = self.shard_pending[shard]
+            pending.append((frame, float(packet.time), linktype))
+            if len(pending) >= SHARD_BATCH_SIZE:
+                self._flush_shard(shard)
+        self._flush_stale_shards()
 
-    def _capture_packets(self, interface: Optional[str]):
+    def _flush_stale_shards(self):
+        """Send partial batches once they are SHARD_FLUSH_SECONDS old"""
+        with self.shard_lock:
+            if self.shards_stopped or time.monotonic() - self.last_flush < SHARD_FLUSH_SECONDS:
+                return
+            for i in range(self.workers):
+                self._flush_shard(i)
+            self.last_flush = time.monotonic()
+
+    def _flush_shard(self, shard: int):
+        frames = self.shard_pending[shard]
+        if not frames:
+            return
+        self.shard_pending[shard] = []
+        try:
+            self.shard_queues[shard].put_nowait(frames)
+        except queue.Full:
+            self.dropped_packets[f"shard_{shard}"] += len(frames)
+
+    def _stop_shards(self):
+        with self.shard_lock:
+            self.shards_stopped = True
+            for i in range(self.workers):
+                self._flush_shard(i)
+        for shard_queue in self.shard_queues:
+            shard_queue.put(None)
+
+    def _collect_shards(self):
+        """Merge worker aggregates into the shared stats; the only writer of self.stats"""
+        finished = 0
+        while finished < self.workers:
+            try:
+                partial = self.merge_queue.get(timeout=SHARD_FLUSH_SECONDS)
+            except queue.Empty:
+                # No packet may arrive to flush the last partial batches, so do it here
+                self._flush_stale_shards()
+                continue
+            if partial is None:
+                finished += 1
+                continue
+            stats, expired = partial
+            # _flow_totals reads the talker and port counters under the flow lock
+            with self.flows.lock:
+                self.stats.merge(stats)
+            for flow in expired:
+                self.flow_exporter.write(flow)
+
+    def _export_flow(self, flow: FlowRecord):
+        """Fold an expired flow into the totals and append it to the export file"""
+        self.stats.record_flow(flow)
+        self.flow_exporter.write(flow)
+
+    def get_pipeline_stats(self) -> Dict:
+        """Captured/dropped packet counters and current queue depths"""
+        if self.workers > 0 and self.capture_active:
+            depths = {}
+            for i, shard_queue in enumerate(self.shard_queues):
+                try:
+                    depths[f"shard_{i}"] = shard_queue.qsize()
+                except NotImplementedError:
+                    depths[f"shard_{i}"] = None
+        else:
+            depths = {"analysis": self.packet_queue.qsize()}
+        return {
+            "captured": self.captured_packets,
+            "dropped": dict(self.dropped_packets),
+            "queue_depths": depths
+        }
+
+    def _capture_packets(self, interface: Optional[str], on_packet):
         """Capture network packets"""
         try:
             scapy.sniff(
                 iface=interface,
                 store=False,
-                prn=lambda x: self.packet_queue.put(x),
+                prn=on_packet,
                 stop_filter=lambda x: not self.capture_active
             )
         except Exception as e:
@@ -108,30 +1003,90 @@ class NetworkAnalyzer:
 
     def _process_packet(self, packet):
         """Process individual packet"""
-        self.stats["total_packets"] += 1
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.stats["timestamps"].append(timestamp)
+        timestamp = float(getattr(packet, "time", time.time()))
 
         # Get protocol
         protocol = self._get_protocol(packet)
-        self.stats["protocols"][protocol] = self.stats["protocols"].get(protocol, 0) + 1
 
-        # Get IP addresses
+        self.stats.record(protocol, len(packet), timestamp)
+
+        # IP addresses and ports are counted through the flow table
         if scapy.IP in packet:
             src_ip = packet[scapy.IP].src
             dst_ip = packet[scapy.IP].dst
-            self.stats["ip_addresses"][src_ip] = self.stats["ip_addresses"].get(src_ip, 0) + 1
-            self.stats["ip_addresses"][dst_ip] = self.stats["ip_addresses"].get(dst_ip, 0) + 1
+            src_port = dst_port = flags = 0
+            if scapy.TCP in packet:
+                src_port = packet[scapy.TCP].sport
+                dst_port = packet[scapy.TCP].dport
+                flags = int(packet[scapy.TCP].flags)
+            elif scapy.UDP in packet:
+                src_port = packet[scapy.UDP].sport
+                dst_port = packet[scapy.UDP].dport
+            proto = packet[scapy.IP].proto
+            self.flows.add(src_ip, dst_ip, src_port, dst_port, proto,
+                           timestamp, timestamp, 1, len(packet), flags)
+            if flags & TCP_SYN:
+                self.flows.track_handshake(src_ip, dst_ip, src_port, dst_port, timestamp, flags)
 
-        # Get ports
-        if scapy.TCP in packet:
-            src_port = packet[scapy.TCP].sport
-            dst_port = packet[scapy.TCP].dport
-            self.stats["ports"][src_port] = self.stats["ports"].get(src_port, 0) + 1
-            self.stats["ports"][dst_port] = self.stats["ports"].get(dst_port, 0) + 1
+    def analyze_pcap(self, path: str) -> Dict:
+        """Analyse a pcap/pcapng file offline using vectorized batch decoding"""
+        packets = 0
+        total_bytes = 0
+        start = time.perf_counter()
+        for batch in PcapFileReader(path).batches():
+            columns = decode_batch(batch)
+            self.stats.record_batch(columns)
+            add_flow_batch(self.flows, columns)
+            packets += columns["size"].size
+            total_bytes += int(columns["size"].sum())
+        self.flows.flush()
+        self.flow_exporter.flush()
+        elapsed = time.perf_counter() - start
+
+        self.save_stats()
+        logging.info(f"Analysed {packets} packets from {path} in {elapsed:.2f}s")
+        return {
+            "packets": packets,
+            "bytes": total_bytes,
+            "seconds": elapsed,
+            "mb_per_second": total_bytes / elapsed / (1024 * 1024) if elapsed else 0.0
+        }
+
+    def benchmark_pcap(self, path: str) -> Dict:
+        """Compare offline batch analysis against the per-packet _process_packet path"""
+        saved_stats, saved_flows = self.stats, self.flows
+        try:
+            self.stats = TrafficStats()
+            self.flows = FlowTable(self.stats.record_flow)
+            start = time.perf_counter()
+            for batch in PcapFileReader(path).batches():
+                columns = decode_batch(batch)
+                self.stats.record_batch(columns)
+                add_flow_batch(self.flows, columns)
+            self.flows.flush()
+            batch_seconds = time.perf_counter() - start
+            packets = self.stats.total_packets
+
+            self.stats = TrafficStats()
+            self.flows = FlowTable(self.stats.record_flow)
+            start = time.perf_counter()
+            with scapy.PcapReader(path) as reader:
+                for packet in reader:
+                    self._process_packet(packet)
+            self.flows.flush()
+            packet_seconds = time.perf_counter() - start
+        finally:
+            self.stats, self.flows = saved_stats, saved_flows
 
-        # Get packet size
-        self.stats["packet_sizes"].append(len(packet))
+        size = Path(path).stat().st_size
+        return {
+            "packets": packets,
+            "batch": {"seconds": batch_seconds,
+                      "mb_per_second": size / batch_seconds / (1024 * 1024)},
+            "per_packet": {"seconds": packet_seconds,
+                           "mb_per_second": size / packet_seconds / (1024 * 1024)},
+            "speedup": packet_seconds / batch_seconds if batch_seconds else 0.0
+        }
 
     def _get_protocol(self, packet) -> str:
         """Determine packet protocol"""
@@ -151,25 +1106,44 @@ class NetworkAnalyzer:
 
     def get_protocol_stats(self) -> Dict:
         """Get protocol statistics"""
-        return self.stats["protocols"]
+        return self.stats.protocols
+
+    def _flow_totals(self) -> TrafficStats:
+        """Expired-flow totals plus the flows that are still active"""
+        totals = TrafficStats()
+        # Exports and shard merges write these under the same lock, so the view is consistent
+        with self.flows.lock:
+            totals.ip_addresses.merge(self.stats.ip_addresses)
+            totals.ports.merge(self.stats.ports)
+            for flow in self.flows.flows.values():
+                totals.record_flow(flow)
+        return totals
 
     def get_ip_stats(self) -> Dict:
-        """Get IP address statistics"""
-        return self.stats["ip_addresses"]
+        """Get IP address statistics (top talkers), derived from the flow table"""
+        return self._flow_totals().ip_addresses.top()
 
     def get_port_stats(self) -> Dict:
-        """Get port statistics"""
-        return self.stats["ports"]
+        """Get port statistics (top ports), derived from the flow table"""
+        return self._flow_totals().ports.top()
+
+    def get_top_flows(self, n: int = 10) -> List[Dict]:
+        """Active flows with the most bytes"""
+        flows = sorted(self.flows.snapshot(), key=lambda flow: flow.bytes, reverse=True)
+        return [flow.to_dict() for flow in flows[:n]]
 
     def get_packet_size_stats(self) -> Dict:
         """Get packet size statistics"""
-        sizes = self.stats["packet_sizes"]
-        if not sizes:
+        sizes = self.stats.packet_sizes
+        if not sizes.count:
             return {}
         return {
-            "min": min(sizes),
-            "max": max(sizes),
-            "avg": sum(sizes) / len(sizes)
+            "min": sizes.min,
+            "max": sizes.max,
+            "avg": sizes.total / sizes.count,
+            "p50": sizes.quantile(0.5),
+            "p90": sizes.quantile(0.9),
+            "p99": sizes.quantile(0.99)
         }
 
     def plot_protocol_distribution(self, output_path: Optional[str] = None):
@@ -191,14 +1165,13 @@ class NetworkAnalyzer:
 
     def plot_traffic_over_time(self, output_path: Optional[str] = None):
         """Plot traffic volume over time"""
-        if not self.stats["timestamps"]:
+        series = self.stats.per_minute.items()
+        if not series:
             return
 
-        df = pd.DataFrame({
-            'timestamp': pd.to_datetime(self.stats["timestamps"]),
-            'count': 1
-        })
-        df = df.set_index('timestamp').resample('1min').count()
+        df = pd.DataFrame(series, columns=['timestamp', 'count'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        df = df.set_index('timestamp').resample('1min').sum()
 
         plt.figure(figsize=(12, 6))
         plt.plot(df.index, df['count'])
@@ -217,11 +1190,13 @@ class NetworkAnalyzer:
 
     def plot_packet_sizes(self, output_path: Optional[str] = None):
         """Plot packet size distribution"""
-        if not self.stats["packet_sizes"]:
+        buckets = self.stats.packet_sizes.items()
+        if not buckets:
             return
 
         plt.figure(figsize=(10, 6))
-        plt.hist(self.stats["packet_sizes"], bins=50)
+        plt.bar([start for start, _ in buckets], [count for _, count in buckets],
+                width=SizeHistogram.BUCKET_WIDTH, align='edge')
         plt.title("Packet Size Distribution")
         plt.xlabel("Packet Size (bytes)")
         plt.ylabel("Frequency")
@@ -247,9 +1222,13 @@ def main():
         print("7. Plot Protocol Distribution")
         print("8. Plot Traffic Over Time")
         print("9. Plot Packet Sizes")
-        print("10. Exit")
+        print("10. Analyze Capture File")
+        print("11. Benchmark Capture Analysis")
+        print("12. Show Pipeline Stats")
+        print("13. Show Top Flows")
+        print("14. Exit")
         
-        choice = input("\nEnter your choice (1-10): ")
+        choice = input("\nEnter your choice (1-14): ")
         
         if choice == "1":
             if analyzer.capture_active:
@@ -257,7 +1236,11 @@ def main():
                 continue
             
             interface = input("Enter interface name (leave empty for default): ").strip()
-            analyzer.start_capture(interface if interface else None)
+            try:
+                workers = int(input("Analysis worker processes (0 = single thread): ") or 0)
+            except ValueError:
+                workers = 0
+            analyzer.start_capture(interface if interface else None, workers)
             print("Packet capture started...")
         
         elif choice == "2":
@@ -304,6 +1287,9 @@ def main():
                 print(f"Minimum: {stats['min']} bytes")
                 print(f"Maximum: {stats['max']} bytes")
                 print(f"Average: {stats['avg']:.2f} bytes")
+                print(f"Median: {stats['p50']:.0f} bytes")
+                print(f"90th percentile: {stats['p90']:.0f} bytes")
+                print(f"99th percentile: {stats['p99']:.0f} bytes")
             else:
                 print("No packet size statistics available!")
         
@@ -332,6 +1318,50 @@ def main():
                 analyzer.plot_packet_sizes()
         
         elif choice == "10":
+            path = input("Enter pcap/pcapng file path: ")
+            try:
+                result = analyzer.analyze_pcap(path)
+                print(f"\nAnalysed {result['packets']:,} packets ({result['bytes']:,} bytes)")
+                print(f"Time taken: {result['seconds']:.2f} seconds ({result['mb_per_second']:.1f} MB/s)")
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+
+        elif choice == "11":
+            path = input("Enter pcap file path (leave empty for a synthetic capture): ").strip()
+            if not path:
+                path = "synthetic_capture.pcap"
+                write_synthetic_pcap(path)
+            try:
+                result = analyzer.benchmark_pcap(path)
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+                continue
+
+            print(f"\nPackets: {result['packets']:,}")
+            print(f"Batch:      {result['batch']['seconds']:.2f}s ({result['batch']['mb_per_second']:.1f} MB/s)")
+            print(f"Per-packet: {result['per_packet']['seconds']:.2f}s ({result['per_packet']['mb_per_second']:.1f} MB/s)")
+            print(f"Speedup: {result['speedup']:.1f}x")
+
+        elif choice == "12":
+            pipeline = analyzer.get_pipeline_stats()
+            print(f"\nCaptured packets: {pipeline['captured']:,}")
+            for stage, dropped in pipeline["dropped"].items():
+                depth = pipeline["queue_depths"].get(stage)
+                print(f"{stage}: {dropped:,} dropped, queue depth {depth if depth is not None else 'n/a'}")
+
+        elif choice == "13":
+            flows = analyzer.get_top_flows()
+            if flows:
+                print("\nTop Active Flows:")
+                for flow in flows:
+                    rtt = f"{flow['rtt'] * 1000:.1f} ms" if flow['rtt'] is not None else "n/a"
+                    print(f"{flow['src_ip']}:{flow['src_port']} -> {flow['dst_ip']}:{flow['dst_port']} "
+                          f"proto {flow['proto']}: {flow['packets']} packets, {flow['bytes']:,} bytes, "
+                          f"{flow['last_seen'] - flow['first_seen']:.1f}s, RTT {rtt}")
+            else:
+                print("No active flows!")
+
+        elif choice == "14":
             if analyzer.capture_active:
                 analyzer.stop_capture()
             print("Thank you for using Network Traffic Analyzer!")
@@ -1,16 +1,27 @@
 import requests
+import aiohttp
+import asyncio
 import json
+import threading
+import heapq
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 from pathlib import Path
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from collections import deque
 import yaml
 import jsonschema
-from concurrent.futures import ThreadPoolExecutor
 import time
 import csv
 from jinja2 import Template
 
+# Connection pool defaults shared by the sync session and the async engine
+DEFAULT_CONCURRENCY = 20
+DEFAULT_CONNECTIONS_PER_HOST = 10
+
 class TestStatus:
     PASSED = "PASSED"
     FAILED = "FAILED"
@@ -72,7 +83,9 @@ class TestResult:
     def __init__(self, test: APITest):
         self.test = test
         self.status = TestStatus.SKIPPED
-        self.response: Optional[requests.Response] = None
+        # Only status, size and latency are kept; response bodies are dropped after validation
+        self.status_code: Optional[int] = None
+        self.response_size: int = 0
         self.error_message: str = ""
         self.duration: float = 0.0
         self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -81,16 +94,512 @@ class TestResult:
         return {
             "test_name": self.test.name,
             "status": self.status,
-            "response_status": self.response.status_code if self.response else None,
+            "response_status": self.status_code,
+            "response_size": self.response_size,
             "error_message": self.error_message,
             "duration": self.duration,
             "timestamp": self.timestamp
         }
 
+def dependency_order(tests: Dict[str, APITest]) -> Tuple[List[str], List[str]]:
+    """Topologically order tests (Kahn's algorithm); returns (order, tests stuck in or behind a cycle)"""
+    waiting = {name: {dep for dep in test.dependencies if dep in tests}
+               for name, test in tests.items()}
+    dependents: Dict[str, List[str]] = {name: [] for name in tests}
+    for name, deps in waiting.items():
+        for dep in deps:
+            dependents[dep].append(name)
+
+    ready = deque(name for name, deps in waiting.items() if not deps)
+    order = []
+    while ready:
+        name = ready.popleft()
+        order.append(name)
+        for dependent in dependents[name]:
+            waiting[dependent].discard(name)
+            if not waiting[dependent]:
+                ready.append(dependent)
+
+    placed = set(order)
+    return order, [name for name in tests if name not in placed]
+
+def blocked_by(test: APITest, tests: Dict[str, APITest], results: Dict[str, 'TestResult']) -> Optional[str]:
+    """Reason to skip a test whose dependencies are missing or did not pass"""
+    for dep in test.dependencies:
+        if dep not in tests:
+            return f"Unknown dependency: {dep}"
+        if results[dep].status != TestStatus.PASSED:
+            return f"Dependency {dep} {results[dep].status.lower()}"
+    return None
+
+def critical_path(tests: Dict[str, APITest], results: Dict[str, 'TestResult']) -> float:
+    """Longest chain of test durations through the dependency graph"""
+    finish: Dict[str, float] = {}
+    order, _ = dependency_order(tests)
+    for name in order:
+        start = max((finish[dep] for dep in tests[name].dependencies if dep in finish), default=0.0)
+        finish[name] = start + (results[name].duration if name in results else 0.0)
+    return max(finish.values(), default=0.0)
+
+class AhoCorasick:
+    """Multi-pattern matcher that finds every pattern in one pass over the text"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # Bitmask of the pattern indexes that end at each node
+        self.output: List[int] = [0]
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(0)
+                    self.goto[node][char] = child
+                node = child
+            self.output[node] |= 1 << index
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] |= self.output[self.fail[child]]
+        self.all_found = (1 << len(patterns)) - 1
+
+    def missing(self, text: str) -> List[int]:
+        """Indexes of the patterns that do not occur in text"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = output[0]
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found |= output[node]
+                if found == self.all_found:
+                    return []
+        return [index for index in range(len(self.patterns)) if not found >> index & 1]
+
+# Below this many patterns, one C-level substring scan per pattern beats a Python automaton
+AHO_CORASICK_MIN_PATTERNS = 128
+
+class CompiledTest:
+    """Per-test artifacts built once: schema validator, script code objects and content matcher"""
+
+    def __init__(self, test: APITest):
+        self.fingerprint = test_fingerprint(test)
+        self.validator = None
+        if test.expected_schema:
+            validator_class = jsonschema.validators.validator_for(test.expected_schema)
+            validator_class.check_schema(test.expected_schema)
+            self.validator = validator_class(test.expected_schema)
+        self.setup_code = [compile(script, f"<setup:{test.name}>", "exec")
+                           for script in test.setup_scripts]
+        self.cleanup_code = [compile(script, f"<cleanup:{test.name}>", "exec")
+                             for script in test.cleanup_scripts]
+        self.expected_contains = list(test.expected_contains)
+        self.lowered = [text.lower() for text in test.expected_contains]
+        self.matcher = AhoCorasick(self.lowered) \
+            if len(self.lowered) >= AHO_CORASICK_MIN_PATTERNS else None
+
+    def first_missing(self, response_text: str) -> Optional[str]:
+        """First expected string not found in the lowercased response text"""
+        if self.matcher:
+            missing = self.matcher.missing(response_text)
+            return self.expected_contains[missing[0]] if missing else None
+        for original, lowered in zip(self.expected_contains, self.lowered):
+            if lowered not in response_text:
+                return original
+        return None
+
+def test_fingerprint(test: APITest) -> str:
+    return json.dumps([test.expected_schema, test.expected_contains,
+                       test.setup_scripts, test.cleanup_scripts], sort_keys=True, default=str)
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class RateLimiter:
+    """Spaces request starts so that at most `rate` begin per second (0 = unlimited)"""
+
+    def __init__(self, rate: float = 0.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(self.next_slot, now)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class AsyncEngine:
+    """Runs tests on asyncio over one keep-alive connection pool per host"""
+
+    def __init__(self, runner: 'APITestRunner', concurrency: int = DEFAULT_CONCURRENCY,
+                 connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST, rate: float = 0.0):
+        self.runner = runner
+        self.concurrency = concurrency
+        self.connections_per_host = connections_per_host
+        self.rate = rate
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncEngine':
+        connector = aiohttp.TCPConnector(limit=self.concurrency,
+                                         limit_per_host=self.connections_per_host,
+                                         keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.limiter = RateLimiter(self.rate)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def run_test(self, test: APITest) -> TestResult:
+        """Async counterpart of APITestRunner.run_test"""
+        async with self.semaphore:
+            await self.limiter.acquire()
+            result = TestResult(test)
+            start_time = time.time()
+            compiled = None
+
+            try:
+                compiled = self.runner.compiled_for(test)
+                for code in compiled.setup_code:
+                    exec(code)
+
+                async with self.session.request(
+                    test.method,
+                    test.endpoint,
+                    headers=test.headers,
+                    params=test.params,
+                    json=test.body,
+                    timeout=aiohttp.ClientTimeout(total=test.timeout)
+                ) as response:
+                    body = await response.read()
+                    text = body.decode(response.charset or 'utf-8', errors='replace')
+                    result.status_code = response.status
+                    result.response_size = len(body)
+
+                self.runner._validate_response(test, result, response.status, text)
+
+            except Exception as e:
+                result.status = TestStatus.ERROR
+                result.error_message = str(e) or type(e).__name__
+
+            finally:
+                if compiled:
+                    for code in compiled.cleanup_code:
+                        try:
+                            exec(code)
+                        except Exception as e:
+                            logging.error(f"Cleanup script error: {e}")
+
+                result.duration = time.time() - start_time
+
+            return result
+
+    async def run_graph(self, tests: Dict[str, APITest], order: List[str],
+                        on_result=None) -> Dict[str, TestResult]:
+        """Start each test as soon as its dependencies finish; independent branches overlap"""
+        tasks: Dict[str, asyncio.Task] = {}
+        results: Dict[str, TestResult] = {}
+
+        async def run_node(test: APITest) -> TestResult:
+            for dep in test.dependencies:
+                if dep in tasks:
+                    await tasks[dep]
+            reason = blocked_by(test, tests, results)
+            if reason:
+                result = TestResult(test)
+                result.error_message = reason
+            else:
+                result = await self.run_test(test)
+            results[test.name] = result
+            if on_result:
+                on_result(result)
+            return result
+
+        # Topological order guarantees every dependency task exists before its dependents
+        for name in order:
+            tasks[name] = asyncio.create_task(run_node(tests[name]))
+        await asyncio.gather(*tasks.values())
+        return results
+
+    async def run_load(self, test: APITest, rps: float, duration: float, on_result=None) -> Dict:
+        """Replay a test open-loop at a target rate and summarise latency and errors"""
+        loop = asyncio.get_running_loop()
+        latencies: List[float] = []
+        status_codes: Dict[str, int] = {}
+        failures = 0
+
+        async def fire(scheduled: float):
+            nonlocal failures
+            result = await self.run_test(test)
+            if on_result:
+                on_result(result)
+            # Measured from the scheduled start so queueing behind slow requests counts
+            latencies.append(loop.time() - scheduled)
+            code = str(result.status_code) if result.status_code is not None else "error"
+            status_codes[code] = status_codes.get(code, 0) + 1
+            if result.status != TestStatus.PASSED:
+                failures += 1
+
+        total = max(1, int(rps * duration))
+        start = loop.time()
+        # Only in-flight requests are referenced; finished ones are released
+        tasks = set()
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(fire(scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+
+        latencies.sort()
+        return {
+            "test_name": test.name,
+            "target_rps": rps,
+            "duration": elapsed,
+            "requests": total,
+            "throughput": total / elapsed if elapsed else 0.0,
+            "errors": failures,
+            "error_rate": failures / total,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "status_codes": status_codes
+        }
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open many connections at once; the default backlog of 5 stalls them
+    request_queue_size = 1024
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if "delay" in query:
+            time.sleep(float(query["delay"][0]))
+        status = int(query.get("status", ["200"])[0])
+        body = json.dumps({"status": "ok", "method": self.command, "path": url.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(port: int = 0):
+    """Start a local keep-alive JSON server; ?delay=<s> and ?status=<code> shape the reply"""
+    server = _StubServer(("127.0.0.1", port), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+REPORT_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>API Test Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #f2f2f2; }
+        .PASSED { color: green; }
+        .FAILED { color: red; }
+        .ERROR { color: orange; }
+        .SKIPPED { color: gray; }
+    </style>
+</head>
+<body>
+    <h1>API Test Report</h1>
+    <h3>Generated: {{ timestamp }}{% if not complete %} (incomplete run){% endif %}</h3>
+
+    <h2>Summary</h2>
+    <p>Total Tests: {{ total_tests }}</p>
+    <p>Passed: {{ passed_tests }}</p>
+    <p>Failed: {{ failed_tests }}</p>
+    <p>Errors: {{ error_tests }}</p>
+    <p>Skipped: {{ skipped_tests }}</p>
+    <p>Duration avg/p50/p95/p99/max (s): {{ "%.3f"|format(avg_duration) }} /
+       {{ "%.3f"|format(p50) }} / {{ "%.3f"|format(p95) }} / {{ "%.3f"|format(p99) }} /
+       {{ "%.3f"|format(max_duration) }}</p>
+    <p>Response bytes: {{ response_bytes }}</p>
+    <p>Full results: {{ jsonl_file }}, {{ csv_file }}</p>
+
+    <h2>Slowest Tests</h2>
+    <table>
+        <tr><th>Test Name</th><th>Status</th><th>Duration (s)</th></tr>
+        {% for row in slowest %}
+        <tr>
+            <td>{{ row.test_name }}</td>
+            <td class="{{ row.status }}">{{ row.status }}</td>
+            <td>{{ "%.2f"|format(row.duration) }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+
+    <h2>Failures{% if failures_truncated %} (first {{ failures|length }}){% endif %}</h2>
+    <table>
+        <tr>
+            <th>Test Name</th>
+            <th>Status</th>
+            <th>Duration (s)</th>
+            <th>Error Message</th>
+        </tr>
+        {% for row in failures %}
+        <tr>
+            <td>{{ row.test_name }}</td>
+            <td class="{{ row.status }}">{{ row.status }}</td>
+            <td>{{ "%.2f"|format(row.duration) }}</td>
+            <td>{{ row.error_message }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+</body>
+</html>
+""")
+
+class ReportWriter:
+    """Streams results to JSONL and CSV as they complete; the HTML summary uses running aggregates"""
+
+    MAX_FAILURES = 200
+    SLOWEST = 20
+    # Reservoir of durations for the summary percentiles
+    SAMPLE_SIZE = 10000
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, report_dir: Path, prefix: str = "test_report"):
+        # Microseconds keep back-to-back runs from overwriting each other
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.jsonl_path = report_dir / f"{prefix}_{timestamp}.jsonl"
+        self.csv_path = report_dir / f"{prefix}_{timestamp}.csv"
+        self.html_path = report_dir / f"{prefix}_{timestamp}.html"
+        self.jsonl_file = open(self.jsonl_path, 'w')
+        self.csv_file = open(self.csv_path, 'w', newline='')
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(['Test Name', 'Status', 'Duration', 'Error Message', 'Timestamp',
+                                  'Response Status', 'Response Size'])
+
+        self.counts = {status: 0 for status in
+                       (TestStatus.PASSED, TestStatus.FAILED, TestStatus.ERROR, TestStatus.SKIPPED)}
+        self.total = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.response_bytes = 0
+        self.samples: List[float] = []
+        self.slowest: List[Tuple[float, int, dict]] = []
+        self.failures: List[dict] = []
+        self.random = random.Random(0)
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def write(self, result: TestResult):
+        row = result.to_dict()
+        with self.lock:
+            self.jsonl_file.write(json.dumps(row) + "\n")
+            self.csv_writer.writerow([row["test_name"], row["status"], f"{result.duration:.2f}",
+                                      row["error_message"], row["timestamp"],
+                                      row["response_status"], row["response_size"]])
+
+            self.total += 1
+            self.counts[result.status] = self.counts.get(result.status, 0) + 1
+            self.total_duration += result.duration
+            self.max_duration = max(self.max_duration, result.duration)
+            self.response_bytes += result.response_size
+            if len(self.samples) < self.SAMPLE_SIZE:
+                self.samples.append(result.duration)
+            else:
+                slot = self.random.randrange(self.total)
+                if slot < self.SAMPLE_SIZE:
+                    self.samples[slot] = result.duration
+            entry = (result.duration, self.total, row)
+            if len(self.slowest) < self.SLOWEST:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+            if result.status != TestStatus.PASSED and len(self.failures) < self.MAX_FAILURES:
+                self.failures.append(row)
+
+            if time.monotonic() - self.last_flush >= self.FLUSH_INTERVAL:
+                self.jsonl_file.flush()
+                self.csv_file.flush()
+                self.last_flush = time.monotonic()
+
+    def close(self, complete: bool = True):
+        """Flush the streams and render the HTML summary"""
+        with self.lock:
+            self.jsonl_file.close()
+            self.csv_file.close()
+            samples = sorted(self.samples)
+            context = {
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "complete": complete,
+                "total_tests": self.total,
+                "passed_tests": self.counts[TestStatus.PASSED],
+                "failed_tests": self.counts[TestStatus.FAILED],
+                "error_tests": self.counts[TestStatus.ERROR],
+                "skipped_tests": self.counts[TestStatus.SKIPPED],
+                "avg_duration": self.total_duration / self.total if self.total else 0.0,
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+                "max_duration": self.max_duration,
+                "response_bytes": self.response_bytes,
+                "jsonl_file": self.jsonl_path.name,
+                "csv_file": self.csv_path.name,
+                "slowest": [row for _, _, row in sorted(self.slowest, reverse=True)],
+                "failures": self.failures,
+                "failures_truncated": self.total - self.counts[TestStatus.PASSED] > len(self.failures)
+            }
+            with open(self.html_path, 'w') as f:
+                f.write(REPORT_TEMPLATE.render(context))
+        logging.info(f"Reports generated: {self.html_path}, {self.csv_path}, {self.jsonl_path}")
+
 class APITestRunner:
     def __init__(self):
         self.tests: Dict[str, APITest] = {}
         self.results: List[TestResult] = []
+        self.compiled: Dict[str, CompiledTest] = {}
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=DEFAULT_CONCURRENCY,
+                                                pool_maxsize=DEFAULT_CONNECTIONS_PER_HOST)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.config_file = Path("test_config.yaml")
         self.log_file = Path("test_execution.log")
         self.report_dir = Path("test_reports")
@@ -121,7 +630,12 @@ class APITestRunner:
             logging.error(f"Error loading config: {e}")
 
     def save_config(self):
-        """Save test configuration to YAML file"""
+        """Save test configuration to YAML file and drop stale compiled artifacts"""
+        for name in list(self.compiled):
+            test = self.tests.get(name)
+            if test is None or test_fingerprint(test) != self.compiled[name].fingerprint:
+                del self.compiled[name]
+
         config = {
             "tests": [test.to_dict() for test in self.tests.values()]
         }
@@ -135,6 +649,12 @@ class APITestRunner:
             return False
 
         self.tests[test.name] = test
+        _, cyclic = dependency_order(self.tests)
+        if test.name in cyclic:
+            del self.tests[test.name]
+            logging.error(f"Test {test.name} would create a dependency cycle")
+            return False
+
         self.save_config()
         logging.info(f"Added test: {test.name}")
         return True
@@ -154,14 +674,16 @@ class APITestRunner:
         """Run a single test case"""
         result = TestResult(test)
         start_time = time.time()
+        compiled = None
 
         try:
             # Run setup scripts
-            for script in test.setup_scripts:
-                exec(script)
+            compiled = self.compiled_for(test)
+            for code in compiled.setup_code:
+                exec(code)
 
-            # Make the API request
-            response = requests.request(
+            # Make the API request over the pooled session
+            response = self.session.request(
                 method=test.method,
                 url=test.endpoint,
                 headers=test.headers,
@@ -169,32 +691,9 @@ class APITestRunner:
                 json=test.body,
                 timeout=test.timeout
             )
-            result.response = response
-
-            # Validate status code
-            if response.status_code != test.expected_status:
-                result.status = TestStatus.FAILED
-                result.error_message = f"Expected status {test.expected_status}, got {response.status_code}"
-                return result
-
-            # Validate response schema
-            if test.expected_schema:
-                try:
-                    jsonschema.validate(response.json(), test.expected_schema)
-                except jsonschema.exceptions.ValidationError as e:
-                    result.status = TestStatus.FAILED
-                    result.error_message = f"Schema validation failed: {str(e)}"
-                    return result
-
-            # Validate response content
-            response_text = response.text.lower()
-            for expected_text in test.expected_contains:
-                if expected_text.lower() not in response_text:
-                    result.status = TestStatus.FAILED
-                    result.error_message = f"Response does not contain: {expected_text}"
-                    return result
-
-            result.status = TestStatus.PASSED
+            result.status_code = response.status_code
+            result.response_size = len(response.content)
+            self._validate_response(test, result, response.status_code, response.text)
 
         except Exception as e:
             result.status = TestStatus.ERROR
@@ -202,123 +701,183 @@ class APITestRunner:
 
         finally:
             # Run cleanup scripts
-            for script in test.cleanup_scripts:
-                try:
-                    exec(script)
-                except Exception as e:
-                    logging.error(f"Cleanup script error: {e}")
+            if compiled:
+                for code in compiled.cleanup_code:
+                    try:
+                        exec(code)
+                    except Exception as e:
+                        logging.error(f"Cleanup script error: {e}")
 
             result.duration = time.time() - start_time
 
         return result
 
-    def run_all_tests(self, parallel: bool = False) -> List[TestResult]:
-        """Run all test cases"""
-        self.results = []
-        tests_to_run = list(self.tests.values())
+    def _validate_response(self, test: APITest, result: TestResult, status_code: int, text: str):
+        """Set the result status from the status code, schema and content checks"""
+        # Validate status code
+        if status_code != test.expected_status:
+            result.status = TestStatus.FAILED
+            result.error_message = f"Expected status {test.expected_status}, got {status_code}"
+            return
 
-        if parallel:
-            with ThreadPoolExecutor() as executor:
-                self.results = list(executor.map(self.run_test, tests_to_run))
-        else:
-            for test in tests_to_run:
-                self.results.append(self.run_test(test))
+        compiled = self.compiled_for(test)
 
-        self.generate_report()
-        return self.results
+        # Validate response schema
+        if compiled.validator:
+            try:
+                compiled.validator.validate(json.loads(text))
+            except jsonschema.exceptions.ValidationError as e:
+                result.status = TestStatus.FAILED
+                result.error_message = f"Schema validation failed: {str(e)}"
+                return
 
-    def generate_report(self):
-        """Generate test execution report"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Generate HTML report
-        html_report = self.report_dir / f"test_report_{timestamp}.html"
-        self._generate_html_report(html_report)
-        
-        # Generate CSV report
-        csv_report = self.report_dir / f"test_report_{timestamp}.csv"
-        self._generate_csv_report(csv_report)
-        
-        logging.info(f"Reports generated: {html_report}, {csv_report}")
-
-    def _generate_html_report(self, output_path: Path):
-        """Generate HTML test report"""
-        template_str = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>API Test Report</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; }
-                table { border-collapse: collapse; width: 100%; }
-                th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-                th { background-color: #f2f2f2; }
-                .PASSED { color: green; }
-                .FAILED { color: red; }
-                .ERROR { color: orange; }
-                .SKIPPED { color: gray; }
-            </style>
-        </head>
-        <body>
-            <h1>API Test Report</h1>
-            <h3>Generated: {{ timestamp }}</h3>
-            
-            <h2>Summary</h2>
-            <p>Total Tests: {{ total_tests }}</p>
-            <p>Passed: {{ passed_tests }}</p>
-            <p>Failed: {{ failed_tests }}</p>
-            <p>Errors: {{ error_tests }}</p>
-            <p>Skipped: {{ skipped_tests }}</p>
-            
-            <h2>Test Results</h2>
-            <table>
-                <tr>
-                    <th>Test Name</th>
-                    <th>Status</th>
-                    <th>Duration (s)</th>
-                    <th>Error Message</th>
-                </tr>
-                {% for result in results %}
-                <tr>
-                    <td>{{ result.test.name }}</td>
-                    <td class="{{ result.status }}">{{ result.status }}</td>
-                    <td>{{ "%.2f"|format(result.duration) }}</td>
-                    <td>{{ result.error_message }}</td>
-                </tr>
-                {% endfor %}
-            </table>
-        </body>
-        </html>
-        """
-
-        template = Template(template_str)
-        
-        context = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "total_tests": len(self.results),
-            "passed_tests": sum(1 for r in self.results if r.status == TestStatus.PASSED),
-            "failed_tests": sum(1 for r in self.results if r.status == TestStatus.FAILED),
-            "error_tests": sum(1 for r in self.results if r.status == TestStatus.ERROR),
-            "skipped_tests": sum(1 for r in self.results if r.status == TestStatus.SKIPPED),
-            "results": self.results
+        # Validate response content
+        if compiled.expected_contains:
+            missing = compiled.first_missing(text.lower())
+            if missing is not None:
+                result.status = TestStatus.FAILED
+                result.error_message = f"Response does not contain: {missing}"
+                return
+
+        result.status = TestStatus.PASSED
+
+    def compiled_for(self, test: APITest) -> CompiledTest:
+        """Cached compiled artifacts for a test, built on first use"""
+        compiled = self.compiled.get(test.name)
+        if compiled is None:
+            compiled = CompiledTest(test)
+            self.compiled[test.name] = compiled
+        return compiled
+
+    def benchmark_validation(self, iterations: int = 2000, patterns: int = 20) -> Dict:
+        """Per-test validation overhead with and without the compiled cache"""
+        body = json.dumps({"items": [{"id": i, "name": f"Item {i}", "tags": ["alpha", "beta"]}
+                                     for i in range(20)], "status": "ok"})
+        test = APITest("benchmark", "http://localhost/")
+        test.expected_schema = {
+            "type": "object",
+            "required": ["items", "status"],
+            "properties": {"items": {"type": "array", "items": {
+                "type": "object", "required": ["id", "name"],
+                "properties": {"id": {"type": "integer"}, "name": {"type": "string"}}}}}
         }
+        test.expected_contains = [f"item {i % 20}" for i in range(patterns)]
+        test.setup_scripts = ["token = 'abc' * 4"]
+        test.cleanup_scripts = ["token = None"]
 
-        with open(output_path, 'w') as f:
-            f.write(template.render(context))
-
-    def _generate_csv_report(self, output_path: Path):
-        """Generate CSV test report"""
-        with open(output_path, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Test Name', 'Status', 'Duration', 'Error Message', 'Timestamp'])
-            for result in self.results:
-                writer.writerow([
-                    result.test.name,
-                    result.status,
-                    f"{result.duration:.2f}",
-                    result.error_message,
-                    result.timestamp
-                ])
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for script in test.setup_scripts:
+                exec(script)
+            jsonschema.validate(json.loads(body), test.expected_schema)
+            response_text = body.lower()
+            for expected_text in test.expected_contains:
+                if expected_text.lower() not in response_text:
+                    break
+            for script in test.cleanup_scripts:
+                exec(script)
+        uncached = (time.perf_counter() - start) / iterations
+
+        self.compiled.pop(test.name, None)
+        result = TestResult(test)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            compiled = self.compiled_for(test)
+            for code in compiled.setup_code:
+                exec(code)
+            self._validate_response(test, result, 200, body)
+            for code in compiled.cleanup_code:
+                exec(code)
+        cached = (time.perf_counter() - start) / iterations
+        self.compiled.pop(test.name, None)
+
+        return {
+            "iterations": iterations,
+            "patterns": patterns,
+            "uncached_us": uncached * 1e6,
+            "cached_us": cached * 1e6,
+            "speedup": uncached / cached if cached else 0.0,
+            "passed": result.status == TestStatus.PASSED
+        }
+
+    def run_all_tests(self, parallel: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+                      rate: float = 0.0) -> List[TestResult]:
+        """Run all test cases in dependency order, streaming each result to the report"""
+        tests = dict(self.tests)
+        order, cyclic = dependency_order(tests)
+        start_time = time.time()
+        writer = ReportWriter(self.report_dir)
+        results: Dict[str, TestResult] = {}
+        complete = False
+
+        try:
+            for name in cyclic:
+                logging.error(f"Test {name} is part of or depends on a dependency cycle")
+                results[name] = TestResult(tests[name])
+                results[name].status = TestStatus.ERROR
+                results[name].error_message = "Dependency cycle among: " + ", ".join(cyclic)
+                writer.write(results[name])
+
+            if parallel:
+                results.update(asyncio.run(self._run_async(tests, order, concurrency, rate,
+                                                           writer.write)))
+            else:
+                for name in order:
+                    reason = blocked_by(tests[name], tests, results)
+                    if reason:
+                        results[name] = TestResult(tests[name])
+                        results[name].error_message = reason
+                    else:
+                        results[name] = self.run_test(tests[name])
+                    writer.write(results[name])
+            complete = True
+        finally:
+            # An interrupted run still leaves a consistent partial report
+            writer.close(complete)
+
+        self.results = [results[name] for name in order + cyclic]
+        logging.info(f"Suite finished in {time.time() - start_time:.2f}s "
+                     f"(critical path {critical_path(tests, results):.2f}s)")
+        return self.results
+
+    async def _run_async(self, tests: Dict[str, APITest], order: List[str], concurrency: int,
+                         rate: float, on_result=None) -> Dict[str, TestResult]:
+        async with AsyncEngine(self, concurrency=concurrency, rate=rate) as engine:
+            return await engine.run_graph(tests, order, on_result)
+
+    def run_load_test(self, test_name: str, rps: float, duration: float,
+                      concurrency: int = 100) -> Optional[Dict]:
+        """Replay one test at `rps` requests per second for `duration` seconds"""
+        if test_name not in self.tests:
+            logging.error(f"Test {test_name} not found")
+            return None
+        if not (0 < rps < float("inf")) or not (0 < duration < float("inf")):
+            logging.error(f"Invalid load test parameters: rps={rps}, duration={duration}")
+            return None
+
+        writer = ReportWriter(self.report_dir, prefix=f"load_report_{test_name}")
+
+        async def load():
+            async with AsyncEngine(self, concurrency=concurrency,
+                                   connections_per_host=concurrency) as engine:
+                return await engine.run_load(self.tests[test_name], rps, duration, writer.write)
+
+        complete = False
+        try:
+            report = asyncio.run(load())
+            complete = True
+        finally:
+            writer.close(complete)
+        logging.info(f"Load test {test_name}: {report['requests']} requests, "
+                     f"p99 {report['p99_ms']:.1f} ms, error rate {report['error_rate']:.2%}")
+        return report
+
+    def generate_report(self):
+        """Generate test execution report from the last run's results"""
+        writer = ReportWriter(self.report_dir)
+        for result in self.results:
+            writer.write(result)
+        writer.close()
 
 def main():
     runner = APITestRunner()
@@ -331,9 +890,12 @@ def main():
         print("4. Run Single Test")
         print("5. Run All Tests")
         print("6. View Test Results")
-        print("7. Exit")
+        print("7. Load Test")
+        print("8. Start Local Stub Server")
+        print("9. Benchmark Validation Overhead")
+        print("10. Exit")
         
-        choice = input("\nEnter your choice (1-7): ")
+        choice = input("\nEnter your choice (1-10): ")
         
         if choice == "1":
             name = input("Enter test name: ")
@@ -362,6 +924,9 @@ def main():
                     continue
             
             test.expected_status = int(input("Enter expected status code (default 200): ") or "200")
+
+            dependencies = input("Enter dependencies (comma-separated test names, optional): ")
+            test.dependencies = [dep.strip() for dep in dependencies.split(",") if dep.strip()]
             
             if runner.add_test(test):
                 print("Test added successfully!")
@@ -386,6 +951,8 @@ def main():
                 print(f"Endpoint: {test.endpoint}")
                 print(f"Method: {test.method}")
                 print(f"Expected Status: {test.expected_status}")
+                if test.dependencies:
+                    print("Depends On:", ", ".join(test.dependencies))
                 if test.headers:
                     print("Headers:", test.headers)
                 if test.body:
@@ -405,7 +972,12 @@ def main():
         
         elif choice == "5":
             parallel = input("Run tests in parallel? (y/n): ").lower() == 'y'
-            results = runner.run_all_tests(parallel)
+            concurrency, rate = DEFAULT_CONCURRENCY, 0.0
+            if parallel:
+                concurrency = int(input(f"Max concurrent requests (default {DEFAULT_CONCURRENCY}): ")
+                                  or DEFAULT_CONCURRENCY)
+                rate = float(input("Max requests per second (0 = unlimited): ") or "0")
+            results = runner.run_all_tests(parallel, concurrency, rate)
             
             print("\nTest Results:")
             for result in results:
@@ -442,6 +1014,41 @@ def main():
                     print(f"Error: {result.error_message}")
         
         elif choice == "7":
+            name = input("Enter test name: ")
+            if name not in runner.tests:
+                print("Test not found!")
+                continue
+
+            try:
+                rps = float(input("Target requests per second: "))
+                duration = float(input("Duration in seconds: "))
+            except ValueError:
+                print("Invalid number!")
+                continue
+
+            report = runner.run_load_test(name, rps, duration)
+            if report is None:
+                print("Requests per second and duration must be positive numbers!")
+                continue
+            print(f"\nRequests: {report['requests']} in {report['duration']:.1f}s "
+                  f"({report['throughput']:.1f} req/s)")
+            print(f"Latency p50/p95/p99: {report['p50_ms']:.1f} / {report['p95_ms']:.1f} / "
+                  f"{report['p99_ms']:.1f} ms")
+            print(f"Errors: {report['errors']} ({report['error_rate']:.2%})")
+            print("Status codes:", report['status_codes'])
+
+        elif choice == "8":
+            _, url = start_stub_server()
+            print(f"Stub server listening on {url} (stops on exit)")
+
+        elif choice == "9":
+            result = runner.benchmark_validation()
+            print(f"\nPer-test validation overhead ({result['patterns']} content checks, "
+                  f"{result['iterations']} iterations):")
+            print(f"Uncached: {result['uncached_us']:.1f} us")
+            print(f"Compiled: {result['cached_us']:.1f} us ({result['speedup']:.1f}x faster)")
+
+        elif choice == "10":
             print("Thank you for using API Testing Framework!")
             break
         